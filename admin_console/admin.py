@@ -9,7 +9,7 @@ class AdminActivityAdmin(admin.ModelAdmin):
     list_display = ('user', 'activity_type', 'created_at')
     list_filter = ('activity_type', 'created_at')
     search_fields = ('user__email', 'description')
-    readonly_fields = ('user', 'activity_type', 'description', 'ip_address', 'created_at')
+    readonly_fields = ('user', 'activity_type', 'description', 'ip_address', 'changes', 'created_at')
 
 @admin.register(DashboardMetrics)
 class DashboardMetricsAdmin(admin.ModelAdmin):
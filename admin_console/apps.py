@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AdminConsoleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admin_console'
+
+    def ready(self):
+        # Import signals to ensure they are registered
+        from . import signals  # noqa: F401
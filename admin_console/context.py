@@ -0,0 +1,66 @@
+# admin_console/context.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Holds the Actor for the request (or management command) currently running
+_current_actor = ContextVar('admin_activity_actor', default=None)
+
+
+class Actor:
+    """
+    The user responsible for model changes made in the current context.
+
+    When bound to a request the user is resolved lazily, so DRF authentication
+    (which runs inside the view) is picked up by the time a signal fires.
+    """
+    __slots__ = ('_request', '_user', 'ip_address')
+
+    def __init__(self, request=None, user=None, ip_address=None):
+        self._request = request
+        self._user = user
+        self.ip_address = ip_address
+
+    @property
+    def user(self):
+        if self._request is not None:
+            return getattr(self._request, 'user', None)
+        return self._user
+
+
+def bind_request(request):
+    """
+    Bind the actor context to a request, returning a token for reset_actor()
+    """
+    return _current_actor.set(
+        Actor(request=request, ip_address=request.META.get('REMOTE_ADDR') or None)
+    )
+
+
+def reset_actor(token):
+    _current_actor.reset(token)
+
+
+@contextmanager
+def acting_as(user, ip_address=None):
+    """
+    Attribute model changes made inside the block to the given user
+    (for management commands and background jobs)
+    """
+    token = _current_actor.set(Actor(user=user, ip_address=ip_address))
+    try:
+        yield
+    finally:
+        _current_actor.reset(token)
+
+
+def get_staff_actor():
+    """
+    Return the current Actor if it is a staff user, otherwise None
+    """
+    actor = _current_actor.get()
+    if actor is None:
+        return None
+    user = actor.user
+    if user is None or not getattr(user, 'is_staff', False):
+        return None
+    return actor
@@ -0,0 +1,37 @@
+# admin_console/management/commands/archive_admin_activity.py
+from django.core.management.base import BaseCommand
+
+from admin_console.models import AdminActivity
+from admin_console.retention import archive_month, archive_path, expired_months, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Archive admin activity partitions older than the retention window to compressed JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months', type=int, default=None,
+            help='Months of activity to keep in the database (default: ADMIN_ACTIVITY_RETENTION_MONTHS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived')
+
+    def handle(self, *args, **options):
+        retention_months = options['retention_months']
+        months = expired_months(retention_months)
+        cutoff = retention_cutoff(retention_months)
+
+        if not months:
+            self.stdout.write(f'No activity older than {cutoff:%Y-%m}.')
+            return
+
+        for month in months:
+            if options['dry_run']:
+                count = AdminActivity.objects.filter(month=month).count()
+                self.stdout.write(f'{month:%Y-%m}: {count} rows would be archived to {archive_path(month)}')
+                continue
+            archived = archive_month(month, batch_size=options['batch_size'])
+            self.stdout.write(f'{month:%Y-%m}: archived {archived} rows to {archive_path(month)}')
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Archived {len(months)} partition(s) older than {cutoff:%Y-%m}.'))
@@ -0,0 +1,38 @@
+# admin_console/management/commands/compact_admin_activity.py
+import glob
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from admin_console.retention import compact_archive, get_archive_dir, reclaim_space
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply the admin activity retention policy, merge archive files into a single '
+        'deduplicated member per month and reclaim database space'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-months', type=int, default=None)
+        parser.add_argument('--skip-archive', action='store_true', help='Do not archive expired partitions first')
+        parser.add_argument('--skip-vacuum', action='store_true', help='Do not reclaim database space')
+
+    def handle(self, *args, **options):
+        if not options['skip_archive']:
+            call_command(
+                'archive_admin_activity',
+                retention_months=options['retention_months'],
+                stdout=self.stdout
+            )
+
+        for path in sorted(glob.glob(os.path.join(get_archive_dir(), 'admin_activity-*.jsonl.gz'))):
+            before, after = compact_archive(path)
+            self.stdout.write(f'{os.path.basename(path)}: {before} rows -> {after} rows')
+
+        if not options['skip_vacuum']:
+            reclaim_space()
+            self.stdout.write('Reclaimed database space.')
+
+        self.stdout.write(self.style.SUCCESS('Admin activity compaction complete.'))
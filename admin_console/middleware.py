@@ -0,0 +1,17 @@
+# admin_console/middleware.py
+from .context import bind_request, reset_actor
+
+
+class AdminActivityMiddleware:
+    """
+    Make the current request available to the admin activity signal receivers
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = bind_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_actor(token)
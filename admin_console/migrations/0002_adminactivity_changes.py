@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 22:30
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_console', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminactivity',
+            name='changes',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+    ]
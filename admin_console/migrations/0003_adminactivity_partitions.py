@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 22:31
+
+import admin_console.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def backfill_month(apps, schema_editor):
+    AdminActivity = apps.get_model('admin_console', 'AdminActivity')
+    AdminActivity.objects.update(
+        month=TruncMonth('created_at', output_field=models.DateField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_console', '0002_adminactivity_changes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminactivity',
+            name='month',
+            field=models.DateField(default=admin_console.models.current_month, editable=False),
+        ),
+        migrations.RunPython(backfill_month, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='adminactivity',
+            index=models.Index(fields=['-created_at'], name='adminactivity_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminactivity',
+            index=models.Index(fields=['activity_type', '-created_at'], name='adminactivity_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminactivity',
+            index=models.Index(fields=['month', 'id'], name='adminactivity_month_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_console', '0004_activity_products_imported'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adminactivity',
+            name='activity_type',
+            field=models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('user_created', 'User Created'), ('user_updated', 'User Updated'), ('user_deleted', 'User Deleted'), ('product_created', 'Product Created'), ('product_updated', 'Product Updated'), ('product_deleted', 'Product Deleted'), ('products_imported', 'Products Imported'), ('products_bulk_updated', 'Products Bulk Updated'), ('order_status_updated', 'Order Status Updated'), ('coupon_created', 'Coupon Created'), ('coupon_updated', 'Coupon Updated')], max_length=50),
+        ),
+    ]
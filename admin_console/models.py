@@ -1,10 +1,20 @@
 # admin_console/models.py
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from core.models import TimestampedModel
 
 User = get_user_model()
 
+
+def current_month():
+    """
+    First day of the current month, used as the AdminActivity partition key
+    """
+    return timezone.now().date().replace(day=1)
+
+
 class AdminActivity(TimestampedModel):
     """
     Log admin activities for tracking and audit purposes
@@ -18,6 +28,8 @@ class AdminActivity(TimestampedModel):
         ('product_created', 'Product Created'),
         ('product_updated', 'Product Updated'),
         ('product_deleted', 'Product Deleted'),
+        ('products_imported', 'Products Imported'),
+        ('products_bulk_updated', 'Products Bulk Updated'),
         ('order_status_updated', 'Order Status Updated'),
         ('coupon_created', 'Coupon Created'),
         ('coupon_updated', 'Coupon Updated'),
@@ -27,9 +39,18 @@ class AdminActivity(TimestampedModel):
     activity_type = models.CharField(max_length=50, choices=ACTIVITY_TYPES)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Changed fields for updates, as {field: [old, new]}
+    changes = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    # Monthly partition key; retention archives and prunes whole months
+    month = models.DateField(default=current_month, editable=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='adminactivity_created_idx'),
+            models.Index(fields=['activity_type', '-created_at'], name='adminactivity_type_created_idx'),
+            models.Index(fields=['month', 'id'], name='adminactivity_month_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.activity_type}"
@@ -0,0 +1,124 @@
+# admin_console/retention.py
+import gzip
+import json
+import os
+from datetime import date
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .models import AdminActivity, current_month
+
+ARCHIVE_FIELDS = (
+    'id', 'user_id', 'user__email', 'activity_type', 'description',
+    'ip_address', 'changes', 'month', 'created_at', 'updated_at'
+)
+
+
+def get_archive_dir():
+    return os.fspath(settings.ADMIN_ACTIVITY_ARCHIVE_DIR)
+
+
+def archive_path(month):
+    """
+    Archive file for a monthly partition, e.g. admin_activity-2025-04.jsonl.gz
+    """
+    return os.path.join(get_archive_dir(), f'admin_activity-{month:%Y-%m}.jsonl.gz')
+
+
+def retention_cutoff(retention_months=None):
+    """
+    First month that is kept in the database; older partitions are archived
+    """
+    if retention_months is None:
+        retention_months = settings.ADMIN_ACTIVITY_RETENTION_MONTHS
+    month = current_month()
+    total = month.year * 12 + (month.month - 1) - retention_months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def expired_months(retention_months=None):
+    """
+    Monthly partitions that fall outside the retention window
+    """
+    cutoff = retention_cutoff(retention_months)
+    return list(
+        AdminActivity.objects.filter(month__lt=cutoff)
+        .order_by('month').values_list('month', flat=True).distinct()
+    )
+
+
+def archive_month(month, batch_size=1000):
+    """
+    Move one monthly partition into its compressed JSONL archive.
+
+    Rows are written and deleted a batch at a time, so memory stays flat and an
+    interrupted run can simply be repeated. Each run appends a gzip member;
+    compact_archive() folds them back into one file.
+    """
+    os.makedirs(get_archive_dir(), exist_ok=True)
+    archived = 0
+    last_id = 0
+    with gzip.open(archive_path(month), 'at', encoding='utf-8') as archive:
+        while True:
+            rows = list(
+                AdminActivity.objects.filter(month=month, id__gt=last_id)
+                .order_by('id').values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            for row in rows:
+                row['user_email'] = row.pop('user__email')
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            archive.flush()
+            last_id = rows[-1]['id']
+            with transaction.atomic():
+                AdminActivity.objects.filter(
+                    month=month, id__lte=last_id, id__gte=rows[0]['id']
+                ).delete()
+            archived += len(rows)
+    return archived
+
+
+def read_archive(path):
+    """
+    Yield archived rows from a (possibly multi-member) archive file
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            if line.strip():
+                yield json.loads(line)
+
+
+def compact_archive(path):
+    """
+    Rewrite an archive as a single gzip member, sorted by id and without duplicates.
+
+    Returns (rows_before, rows_after).
+    """
+    rows = {}
+    total = 0
+    for row in read_archive(path):
+        rows[row['id']] = row
+        total += 1
+    tmp_path = f'{path}.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive:
+        for row_id in sorted(rows):
+            archive.write(json.dumps(rows[row_id]) + '\n')
+    os.replace(tmp_path, path)
+    return total, len(rows)
+
+
+def reclaim_space():
+    """
+    Return space freed by pruned partitions to the operating system
+    """
+    table = connection.ops.quote_name(AdminActivity._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('VACUUM')
+        elif connection.vendor == 'mysql':
+            cursor.execute(f'OPTIMIZE TABLE {table}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'VACUUM ANALYZE {table}')
@@ -3,7 +3,9 @@ from rest_framework import serializers
 from .models import AdminActivity, DashboardMetrics
 from users.models import User
 from products.models import Product
+from products.inventory import count_low_stock_products
 from orders.models import Order, Coupon
+from core.media_urls import MediaURLSerializerMixin
 
 class AdminActivitySerializer(serializers.ModelSerializer):
     """
@@ -15,9 +17,9 @@ class AdminActivitySerializer(serializers.ModelSerializer):
         model = AdminActivity
         fields = (
             'id', 'user', 'user_email', 'activity_type', 
-            'description', 'ip_address', 'created_at'
+            'description', 'ip_address', 'changes', 'created_at'
         )
-        read_only_fields = ('created_at',)
+        read_only_fields = ('changes', 'created_at')
 
 
 class DashboardMetricsSerializer(serializers.ModelSerializer):
@@ -27,7 +29,7 @@ class DashboardMetricsSerializer(serializers.ModelSerializer):
     class Meta:
         model = DashboardMetrics
         fields = '__all__'
-        read_only_fields = fields
+        read_only_fields = [field.name for field in DashboardMetrics._meta.fields]
 
 
 class AdminDashboardSerializer(serializers.Serializer):
@@ -74,7 +76,7 @@ class AdminDashboardSerializer(serializers.Serializer):
         # Product metrics
         total_products = Product.objects.count()
         active_products = Product.objects.filter(is_active=True).count()
-        low_stock_products = Product.objects.filter(stock_quantity__lte=5).count()
+        low_stock_products = count_low_stock_products()
         
         # Order metrics
         total_orders = Order.objects.count()
@@ -102,7 +104,7 @@ class AdminDashboardSerializer(serializers.Serializer):
         ).order_by('-total_sales')[:5]
         
         # Recent admin activities
-        recent_activities = AdminActivity.objects.order_by('-created_at')[:10]
+        recent_activities = AdminActivity.objects.select_related('user').order_by('-created_at')[:10]
         
         return {
             'total_users': total_users,
@@ -123,19 +125,46 @@ class AdminDashboardSerializer(serializers.Serializer):
 
 # admin_console/serializers.py - Update this part
 
+from decimal import Decimal
 from django.contrib.auth import get_user_model
+from django.db.models import Count, DecimalField, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 
 User = get_user_model()
 
-class AdminUserSerializer(serializers.ModelSerializer):
+
+def with_order_stats(queryset):
+    """
+    Annotate users with orders_count, last_order_at and total_spent.
+
+    Correlated subqueries rather than a join + GROUP BY, so only the rows on
+    the requested page are aggregated.
+    """
+    user_orders = Order.objects.filter(user=OuterRef('pk')).order_by().values('user')
+    return queryset.annotate(
+        orders_count=Coalesce(Subquery(user_orders.annotate(n=Count('id')).values('n')), 0),
+        last_order_at=Subquery(user_orders.annotate(last=Max('created_at')).values('last')),
+        total_spent=Coalesce(
+            Subquery(
+                user_orders.filter(order_status='delivered')
+                .annotate(spent=Sum('total')).values('spent')
+            ),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        ),
+    )
+
+class AdminUserSerializer(MediaURLSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for admin user management
     """
     password = serializers.CharField(write_only=True, required=False, validators=[validate_password])
     confirm_password = serializers.CharField(write_only=True, required=False)
     orders_count = serializers.SerializerMethodField()
+    last_order_at = serializers.SerializerMethodField()
+    total_spent = serializers.SerializerMethodField()
     last_login_display = serializers.SerializerMethodField()
     role = serializers.SerializerMethodField()
     
@@ -146,15 +175,43 @@ class AdminUserSerializer(serializers.ModelSerializer):
             'is_active', 'is_staff', 'is_superuser', 'phone_number',
             'date_joined', 'last_login', 'last_login_display',
             'profile_picture', 'is_email_verified', 'password',
-            'confirm_password', 'orders_count', 'role'
+            'confirm_password', 'orders_count', 'last_order_at', 'total_spent', 'role'
         )
-        read_only_fields = ('date_joined', 'last_login', 'orders_count', 'role')
+        read_only_fields = ('date_joined', 'last_login', 'orders_count', 'last_order_at', 'total_spent', 'role')
+
+    def _order_stats(self, obj):
+        """
+        Order statistics from the view's annotations (see with_order_stats),
+        or one aggregate query when the instance was not annotated
+        """
+        if hasattr(obj, 'orders_count'):
+            return obj.orders_count, obj.last_order_at, obj.total_spent
+        if not hasattr(obj, '_order_stats'):
+            stats = obj.orders.aggregate(
+                orders_count=Count('id'),
+                last_order_at=Max('created_at'),
+                total_spent=Sum('total', filter=Q(order_status='delivered'))
+            )
+            obj._order_stats = (stats['orders_count'], stats['last_order_at'], stats['total_spent'])
+        return obj._order_stats
 
     def get_orders_count(self, obj):
         """
         Get the number of orders placed by the user
         """
-        return obj.orders.count() if hasattr(obj, 'orders') else 0
+        return self._order_stats(obj)[0] or 0
+    
+    def get_last_order_at(self, obj):
+        """
+        Get when the user last placed an order
+        """
+        return self._order_stats(obj)[1]
+    
+    def get_total_spent(self, obj):
+        """
+        Get the total of the user's delivered orders
+        """
+        return Decimal(self._order_stats(obj)[2] or 0).quantize(Decimal('0.01'))
     
     def get_last_login_display(self, obj):
         """
@@ -1,14 +1,20 @@
 # admin_console/signals.py
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from products.models import Product
 from orders.models import Order, Coupon
+from .context import get_staff_actor
 from .models import AdminActivity
 
 User = get_user_model()
 
-def log_admin_activity(user, activity_type, description, ip_address=None):
+# Fields that change on every save and carry no audit value
+UNTRACKED_FIELDS = {'created_at', 'updated_at'}
+_MISSING = object()
+
+
+def log_admin_activity(user, activity_type, description, ip_address=None, changes=None):
     """
     Helper function to log admin activities
     """
@@ -17,40 +23,89 @@ def log_admin_activity(user, activity_type, description, ip_address=None):
             user=user,
             activity_type=activity_type,
             description=description,
-            ip_address=ip_address
+            ip_address=ip_address,
+            changes=changes or {}
         )
 
+
+def _tracked_values(instance):
+    """
+    Current values of the concrete fields loaded on the instance (deferred fields are skipped)
+    """
+    values = {}
+    for field in instance._meta.concrete_fields:
+        if field.attname in UNTRACKED_FIELDS:
+            continue
+        value = instance.__dict__.get(field.attname, _MISSING)
+        if value is not _MISSING:
+            values[field.attname] = value
+    return values
+
+
+def get_changed_fields(instance):
+    """
+    Diff the instance against the values it was loaded with.
+
+    Returns {field: [old, new]}, or None when no snapshot was taken.
+    """
+    snapshot = getattr(instance, '_activity_snapshot', None)
+    if snapshot is None:
+        return None
+    changes = {}
+    for attname, new_value in _tracked_values(instance).items():
+        old_value = snapshot.get(attname, _MISSING)
+        if old_value is not _MISSING and old_value != new_value:
+            changes[attname] = [old_value, new_value]
+    return changes
+
+
+@receiver(post_init, sender=Product)
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=Coupon)
+def snapshot_tracked_fields(sender, instance, **kwargs):
+    """
+    Remember loaded field values so saves can be diffed without a SELECT.
+    Only done while a staff user is acting; other requests pay a single lookup.
+    """
+    if get_staff_actor() is None:
+        return
+    instance._activity_snapshot = _tracked_values(instance)
+
+
 # User activity signals
 @receiver(post_save, sender=User)
 def log_user_creation(sender, instance, created, **kwargs):
     """
     Log user creation/update activities
     """
-    if instance.is_staff:
-        if created:
-            log_admin_activity(
-                instance, 
-                'user_created', 
-                f'User account created: {instance.email}'
-            )
-        else:
-            log_admin_activity(
-                instance, 
-                'user_updated', 
-                f'User account updated: {instance.email}'
-            )
+    # Admin views log user changes themselves with the acting admin
+    if not instance.is_staff or get_staff_actor() is not None:
+        return
+    if created:
+        log_admin_activity(
+            instance,
+            'user_created',
+            f'User account created: {instance.email}'
+        )
+    else:
+        log_admin_activity(
+            instance,
+            'user_updated',
+            f'User account updated: {instance.email}'
+        )
 
 @receiver(post_delete, sender=User)
 def log_user_deletion(sender, instance, **kwargs):
     """
     Log user deletion activities
     """
-    if instance.is_staff:
-        log_admin_activity(
-            instance, 
-            'user_deleted', 
-            f'User account deleted: {instance.email}'
-        )
+    if not instance.is_staff or get_staff_actor() is not None:
+        return
+    log_admin_activity(
+        instance,
+        'user_deleted',
+        f'User account deleted: {instance.email}'
+    )
 
 # Product activity signals
 @receiver(post_save, sender=Product)
@@ -58,28 +113,43 @@ def log_product_activity(sender, instance, created, **kwargs):
     """
     Log product creation/update activities
     """
+    actor = get_staff_actor()
+    if actor is None:
+        return
+
     if created:
         log_admin_activity(
-            kwargs.get('user', None), 
-            'product_created', 
-            f'Product created: {instance.name}'
+            actor.user,
+            'product_created',
+            f'Product created: {instance.name}',
+            ip_address=actor.ip_address
         )
     else:
+        changes = get_changed_fields(instance)
+        if changes == {}:
+            return
         log_admin_activity(
-            kwargs.get('user', None), 
-            'product_updated', 
-            f'Product updated: {instance.name}'
+            actor.user,
+            'product_updated',
+            f'Product updated: {instance.name}',
+            ip_address=actor.ip_address,
+            changes=changes
         )
+    instance._activity_snapshot = _tracked_values(instance)
 
 @receiver(post_delete, sender=Product)
 def log_product_deletion(sender, instance, **kwargs):
     """
     Log product deletion activities
     """
+    actor = get_staff_actor()
+    if actor is None:
+        return
     log_admin_activity(
-        kwargs.get('user', None), 
-        'product_deleted', 
-        f'Product deleted: {instance.name}'
+        actor.user,
+        'product_deleted',
+        f'Product deleted: {instance.name}',
+        ip_address=actor.ip_address
     )
 
 # Order status change logging
@@ -88,12 +158,23 @@ def log_order_status_change(sender, instance, created, **kwargs):
     """
     Log order status updates
     """
-    if not created and instance.order_status:
-        log_admin_activity(
-            kwargs.get('user', None), 
-            'order_status_updated', 
-            f'Order {instance.order_number} status changed to {instance.order_status}'
-        )
+    if created or not instance.order_status:
+        return
+    actor = get_staff_actor()
+    if actor is None:
+        return
+
+    changes = get_changed_fields(instance)
+    if changes is not None and 'order_status' not in changes:
+        return
+    log_admin_activity(
+        actor.user,
+        'order_status_updated',
+        f'Order {instance.order_number} status changed to {instance.order_status}',
+        ip_address=actor.ip_address,
+        changes=changes
+    )
+    instance._activity_snapshot = _tracked_values(instance)
 
 # Coupon activity signals
 @receiver(post_save, sender=Coupon)
@@ -101,15 +182,26 @@ def log_coupon_activity(sender, instance, created, **kwargs):
     """
     Log coupon creation/update activities
     """
+    actor = get_staff_actor()
+    if actor is None:
+        return
+
     if created:
         log_admin_activity(
-            kwargs.get('user', None), 
-            'coupon_created', 
-            f'Coupon created: {instance.code}'
+            actor.user,
+            'coupon_created',
+            f'Coupon created: {instance.code}',
+            ip_address=actor.ip_address
         )
     else:
+        changes = get_changed_fields(instance)
+        if changes == {}:
+            return
         log_admin_activity(
-            kwargs.get('user', None), 
-            'coupon_updated', 
-            f'Coupon updated: {instance.code}'
-        )
\ No newline at end of file
+            actor.user,
+            'coupon_updated',
+            f'Coupon updated: {instance.code}',
+            ip_address=actor.ip_address,
+            changes=changes
+        )
+    instance._activity_snapshot = _tracked_values(instance)
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.db.models.functions import TruncMonth
 
 
@@ -15,6 +16,7 @@ from .serializers import (
 )
 from users.models import User
 from products.models import Product
+from products.inventory import low_stock_products
 from orders.models import Order
 from core.permissions import IsAdminUserOrReadOnly
 from products.serializers import ProductListSerializer
@@ -33,14 +35,12 @@ class LowStockProductsView(generics.ListAPIView):
         """
         Return products with low stock, filtered by various parameters
         """
-        # Default threshold value for what's considered "low stock"
-        threshold = int(self.request.query_params.get('threshold', 5))
+        # Low stock uses each product's own threshold; an explicit threshold narrows it
+        threshold = self.request.query_params.get('threshold')
+        threshold = int(threshold) if threshold else None
         
-        # Build the base queryset for low stock items
-        queryset = Product.objects.filter(
-            Q(stock_quantity__lte=threshold) | 
-            Q(productsize__stock_quantity__lte=threshold)
-        ).distinct()
+        # Build the base queryset from the materialized low stock index
+        queryset = low_stock_products(threshold).select_related('category').prefetch_related('images')
         
         # Filter by stock status if specified
         in_stock = self.request.query_params.get('in_stock')
@@ -54,7 +54,7 @@ class LowStockProductsView(generics.ListAPIView):
             queryset = queryset.filter(category__slug=category)
         
         # Return paginated, ordered results
-        return queryset.order_by('stock_quantity')
+        return queryset.order_by('lowest_stock', 'id')
 
 
 
@@ -66,7 +66,7 @@ class AdminActivityListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAdminUser]
     
     def get_queryset(self):
-        queryset = AdminActivity.objects.all()
+        queryset = AdminActivity.objects.select_related('user')
         
         # Filter by activity type
         activity_type = self.request.query_params.get('activity_type')
@@ -81,6 +81,13 @@ class AdminActivityListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(
                 created_at__range=[start_date, end_date]
             )
+            # Restrict to the monthly partitions covering the range
+            start = parse_date(start_date[:10])
+            end = parse_date(end_date[:10])
+            if start and end:
+                queryset = queryset.filter(
+                    month__range=[start.replace(day=1), end.replace(day=1)]
+                )
         
         return queryset.order_by('-created_at')
 
@@ -196,7 +203,8 @@ from django.contrib.auth import get_user_model
 from django.db.models import Q
 
 from .models import AdminActivity
-from .serializers import AdminUserSerializer
+from .serializers import AdminUserSerializer, with_order_stats
+from users.search import search_users
 
 User = get_user_model()
 
@@ -206,12 +214,15 @@ class AdminUserListCreateView(generics.ListCreateAPIView):
     """
     permission_classes = [permissions.IsAdminUser]
     serializer_class = AdminUserSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['email', 'username', 'first_name', 'last_name', 'phone_number']
-    ordering_fields = ['date_joined', 'email', 'username', 'last_name']
+    # Searching goes through the user search index (see get_queryset), not SearchFilter
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = [
+        'date_joined', 'email', 'username', 'last_name',
+        'orders_count', 'last_order_at', 'total_spent'
+    ]
     
     def get_queryset(self):
-        queryset = User.objects.all().order_by('-date_joined')
+        queryset = with_order_stats(User.objects.all()).order_by('-date_joined')
         
         # Filter by active status
         is_active = self.request.query_params.get('is_active')
@@ -235,15 +246,11 @@ class AdminUserListCreateView(generics.ListCreateAPIView):
             elif role == 'superadmin':
                 queryset = queryset.filter(is_superuser=True)
         
-        # Search by query parameter
-        query = self.request.query_params.get('q')
+        # Search by query parameter ('search' kept for clients of the old SearchFilter)
+        query = self.request.query_params.get('q') or self.request.query_params.get('search')
         if query:
-            queryset = queryset.filter(
-                Q(email__icontains=query) |
-                Q(username__icontains=query) |
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query)
-            )
+            fuzzy = self.request.query_params.get('fuzzy', '').lower() == 'true'
+            queryset = search_users(queryset, query, fuzzy=fuzzy)
         
         return queryset
     
@@ -280,10 +287,16 @@ class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a user (admin only)
     """
-    queryset = User.objects.all()
     serializer_class = AdminUserSerializer
     permission_classes = [permissions.IsAdminUser]
     
+    def get_queryset(self):
+        queryset = User.objects.all()
+        # Deletes don't render the user, so skip the order statistics
+        if self.request.method != 'DELETE':
+            queryset = with_order_stats(queryset)
+        return queryset
+    
     def perform_update(self, serializer):
         # Check if role is provided in request data
         role = self.request.data.get('role')
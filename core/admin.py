@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import MediaBlob
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for MediaBlob model
+    """
+    list_display = ('name', 'size', 'ref_count', 'created_at')
+    search_fields = ('name', 'sha256')
+    readonly_fields = ('name', 'sha256', 'size', 'ref_count', 'created_at', 'updated_at')
@@ -0,0 +1,232 @@
+# core/images.py
+import base64
+import io
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps
+
+from .storage import is_content_addressed
+from .tasks import run_in_background
+
+# Pillow format names and file extensions for the derivative formats we emit
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+# Longest side of the inline blur placeholder
+PLACEHOLDER_SIZE = 16
+
+
+def open_image(field_file):
+    """
+    Open a stored image upright (EXIF orientation applied) and fully decoded
+    """
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+    return image
+
+
+def to_mode_for(image, image_format):
+    """
+    Convert to a mode the target format can store; JPEG has no alpha, so flatten onto white
+    """
+    if image_format == 'JPEG':
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB') if image.mode != 'RGB' else image
+    if image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def encode(image, format_key, quality=None):
+    """
+    Encode an image in one of FORMATS and return the bytes
+    """
+    image_format = FORMATS[format_key][0]
+    buffer = io.BytesIO()
+    to_mode_for(image, image_format).save(
+        buffer, image_format,
+        quality=quality or settings.IMAGE_DERIVATIVE_QUALITY,
+        optimize=True,
+        **({'progressive': True} if image_format == 'JPEG' else {'method': 4})
+    )
+    return buffer.getvalue()
+
+
+def derivative_name(source_name, width, format_key):
+    """
+    Storage name for a derivative, next to its source: productimage/<stem>-640w.webp
+    """
+    stem = os.path.splitext(source_name)[0]
+    return f'{stem}-{width}w.{FORMATS[format_key][1]}'
+
+
+def generate_derivatives(field_file, widths=None, formats=None, image=None):
+    """
+    Write resized copies of a stored image in each format and return
+    {'source': name, '<format>': {'<width>': name, ...}, ...}.
+
+    Widths above the original are skipped (never upscale); an image narrower
+    than every width gets a single derivative at its own width. Pass an
+    already opened image to avoid decoding the file again.
+    """
+    widths = sorted(set(widths or settings.IMAGE_DERIVATIVE_WIDTHS), reverse=True)
+    formats = formats or settings.IMAGE_DERIVATIVE_FORMATS
+    storage = field_file.storage
+
+    if image is None:
+        image = open_image(field_file)
+    original_width, original_height = image.size
+    targets = [width for width in widths if width <= original_width] or [original_width]
+
+    derivatives = {'source': field_file.name}
+    for format_key in formats:
+        derivatives[format_key] = {}
+
+    # Resize largest first and shrink each result further; much cheaper than
+    # resampling the full original for every width
+    current = image
+    for width in targets:
+        if width != current.size[0]:
+            height = max(1, round(original_height * width / original_width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+        for format_key in formats:
+            name = derivative_name(field_file.name, width, format_key)
+            if storage.exists(name):
+                storage.delete(name)
+            derivatives[format_key][str(width)] = storage.save(
+                name, ContentFile(encode(current, format_key))
+            )
+    return derivatives
+
+
+def derivative_names(derivatives):
+    return {
+        name
+        for format_key in FORMATS
+        for name in (derivatives or {}).get(format_key, {}).values()
+    }
+
+
+def avatar_names(variants):
+    """
+    Files a profile picture's variants map keeps besides the picture itself:
+    the avatar crops and, if kept, the uploaded original
+    """
+    names = set((variants or {}).get('avatars', {}).values())
+    if (variants or {}).get('original'):
+        names.add(variants['original'])
+    return names
+
+
+def delete_derivatives(storage, derivatives):
+    """
+    Remove the files listed in a derivatives map
+    """
+    for name in derivative_names(derivatives):
+        storage.delete(name)
+
+
+def release_replaced_derivatives(storage, old_derivatives, new_derivatives):
+    """
+    Delete the previous derivatives after regeneration. Names reused by the new
+    set were overwritten in place, except content-addressed ones: saving those
+    again added a reference, so the old one is released.
+    """
+    new_names = derivative_names(new_derivatives)
+    for name in derivative_names(old_derivatives):
+        if name not in new_names or is_content_addressed(name):
+            storage.delete(name)
+
+
+def dominant_color(thumbnail):
+    """
+    Most common colour of a small RGB image as '#rrggbb'
+    """
+    palette = thumbnail.quantize(colors=5)
+    _, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def blur_placeholder(thumbnail):
+    """
+    A tiny blurred WebP as a data URI, small enough to inline in API responses
+    """
+    placeholder = thumbnail.copy()
+    placeholder.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    placeholder = placeholder.filter(ImageFilter.GaussianBlur(1))
+    data = base64.b64encode(encode(placeholder, 'webp', quality=40)).decode('ascii')
+    return f'data:image/webp;base64,{data}'
+
+
+def extract_metadata(field_file, image=None):
+    """
+    Layout and placeholder data for a stored image:
+    {'source', 'width', 'height', 'bytes', 'dominant_color', 'placeholder'}
+    """
+    if image is None:
+        image = open_image(field_file)
+    # Work from a small copy; both values only need a few pixels
+    thumbnail = to_mode_for(image, 'JPEG').copy()
+    thumbnail.thumbnail((64, 64), reducing_gap=2.0)
+    return {
+        'source': field_file.name,
+        'width': image.width,
+        'height': image.height,
+        'bytes': field_file.size,
+        'dominant_color': dominant_color(thumbnail),
+        'placeholder': blur_placeholder(thumbnail),
+    }
+
+
+def current_metadata(field_file, metadata):
+    """
+    The recorded metadata for a file, without the bookkeeping key; None until the
+    background worker has processed the current file
+    """
+    if not field_file or (metadata or {}).get('source') != field_file.name:
+        return None
+    return {key: value for key, value in metadata.items() if key != 'source'}
+
+
+def build_image_metadata(model_label, pk, field_name, meta_field, force=False):
+    """
+    Record metadata for one model instance's image field
+    """
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).only(field_name, meta_field).first()
+    if instance is None:
+        return None
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return None
+    if not force and current_metadata(field_file, getattr(instance, meta_field)) is not None:
+        return getattr(instance, meta_field)
+    metadata = extract_metadata(field_file)
+    # Skip the write if the image was replaced while we were working
+    model._default_manager.filter(pk=pk, **{field_name: field_file.name}).update(**{meta_field: metadata})
+    return metadata
+
+
+def schedule_image_metadata(instance, field_name, meta_field):
+    """
+    Queue metadata extraction when an instance's image has no metadata for its current file
+    """
+    field_file = getattr(instance, field_name)
+    if field_file and current_metadata(field_file, getattr(instance, meta_field)) is None:
+        run_in_background(
+            build_image_metadata, instance._meta.label, instance.pk, field_name, meta_field
+        )
@@ -0,0 +1,289 @@
+# core/management/commands/benchmark_endpoints.py
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import modify_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Cart, CartItem, Coupon, Order
+from products.models import Category, Product, ProductColor, ProductSize
+from users.models import User
+
+BENCHMARK_COUPON = 'BENCHMARK10'
+# Products and categories the detail scenarios rotate through
+SAMPLE_SIZE = 50
+
+
+class Rollback(Exception):
+    pass
+
+
+class Scenario:
+    """
+    One request shape; request() returns (client, method, path, data) for the next iteration
+    """
+    def __init__(self, name, request):
+        self.name = name
+        self.request = request
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot API endpoints in process against the current database (fill it with '
+        'generate_synthetic_data first): p50/p95/p99 latency, queries and peak allocations per request. '
+        'Every request runs in a savepoint that is rolled back, and so does the setup.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario first')
+        parser.add_argument(
+            '--alloc-iterations', type=int, default=5,
+            help='Extra requests per scenario under tracemalloc; kept apart because tracing skews latency',
+        )
+        parser.add_argument('--scenario', action='append', help='Only run scenarios with this name (repeatable)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', help='Write the results to this file')
+        parser.add_argument('--baseline', help='Results JSON from an earlier run to compare against')
+        parser.add_argument(
+            '--tolerance', type=float, default=20.0,
+            help='Percent p95 slowdown against the baseline that counts as a regression',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('--iterations must be at least 2 to compute percentiles')
+        if not Product.objects.filter(is_active=True, in_stock=True).exists():
+            raise CommandError('No products to benchmark; run generate_synthetic_data first')
+        baseline = json.loads(Path(options['baseline']).read_text()) if options['baseline'] else None
+
+        results = {}
+        # Production-like request handling: no toolbar, no per-query debug logging
+        with modify_settings(MIDDLEWARE={'remove': 'debug_toolbar.middleware.DebugToolbarMiddleware'}), \
+                override_settings(DEBUG=False):
+            try:
+                with transaction.atomic():
+                    scenarios = self.scenarios(random.Random(options['seed']))
+                    unknown = set(options['scenario'] or ()) - {scenario.name for scenario in scenarios}
+                    if unknown:
+                        raise CommandError(f'Unknown scenario(s): {", ".join(sorted(unknown))}')
+                    for scenario in scenarios:
+                        if options['scenario'] and scenario.name not in options['scenario']:
+                            continue
+                        results[scenario.name] = self.run(scenario, options)
+                        self.report(scenario.name, results[scenario.name], baseline, options['tolerance'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+        output = {
+            'meta': {
+                'database': connection.vendor,
+                'products': Product.objects.count(),
+                'orders': Order.objects.count(),
+                'iterations': options['iterations'],
+                'created_at': timezone.now().isoformat(),
+            },
+            'scenarios': results,
+        }
+        if options['json']:
+            Path(options['json']).write_text(json.dumps(output, indent=2) + '\n')
+            self.stdout.write(f"Wrote results to {options['json']}")
+
+        failed = [name for name, result in results.items() if result['errors']]
+        if baseline:
+            failed += [name for name, result in results.items() if self.regressions(name, result, baseline, options['tolerance'])]
+        if failed:
+            raise CommandError(f'{len(set(failed))} scenario(s) failed or regressed: {", ".join(sorted(set(failed)))}')
+
+    def scenarios(self, rng):
+        """
+        Build the fixtures the write scenarios need (rolled back with the run) and the scenario list
+        """
+        product_ids = self.sample_ids(Product.objects.filter(is_active=True), rng)
+        product_slugs = list(Product.objects.filter(id__in=product_ids).values_list('slug', flat=True))
+        category_slugs = list(
+            Category.objects.filter(is_active=True, products__isnull=False).distinct()
+            .order_by('id').values_list('slug', flat=True)[:SAMPLE_SIZE]
+        )
+        variants = self.variants(product_ids)
+        if not variants:
+            raise CommandError('No sampled product has a size in stock with a color')
+
+        customer = (
+            User.objects.filter(is_staff=False, addresses__isnull=False, orders__isnull=False)
+            .order_by('id').first()
+        )
+        if customer is None:
+            raise CommandError('No customer with an address and orders; run generate_synthetic_data first')
+        address = customer.addresses.order_by('id').first()
+        cart, _ = Cart.objects.get_or_create(user=customer)
+        cart.items.all().delete()
+        for product_id, size_id, color_id in variants[:3]:
+            CartItem.objects.create(cart=cart, product_id=product_id, size_id=size_id, color_id=color_id)
+        now = timezone.now()
+        Coupon.objects.update_or_create(code=BENCHMARK_COUPON, defaults={
+            'discount_percentage': 10, 'is_active': True, 'usage_limit': 0,
+            'valid_from': now - timedelta(days=1), 'valid_to': now + timedelta(days=1),
+        })
+        staff = User.objects.create_user(
+            username='benchmark-staff', email='benchmark-staff@example.com', is_staff=True, is_superuser=True,
+        )
+
+        shopper, admin = Client(), Client()
+        shopper.force_login(customer)
+        admin.force_login(staff)
+
+        def get(client, name, **kwargs):
+            return lambda: (client, 'GET', reverse(name, kwargs=kwargs or None), None)
+
+        def rotating(client, name, key, values):
+            return lambda: (client, 'GET', reverse(name, kwargs={key: rng.choice(values)}), None)
+
+        def add_to_cart():
+            product_id, size_id, color_id = rng.choice(variants[3:] or variants)
+            return shopper, 'POST', reverse('cart-item-list'), {
+                'product': product_id, 'size': size_id, 'color': color_id, 'quantity': 1,
+            }
+
+        return [
+            Scenario('catalog-list', get(shopper, 'product-list')),
+            Scenario('catalog-list-sorted', lambda: (shopper, 'GET', reverse('product-list') + '?ordering=price_asc', None)),
+            Scenario('product-detail', rotating(shopper, 'product-detail', 'slug', product_slugs)),
+            Scenario('home-featured', get(shopper, 'product-featured')),
+            Scenario('home-bestsellers', get(shopper, 'product-bestsellers')),
+            Scenario('home-new-arrivals', get(shopper, 'product-new-arrivals')),
+            Scenario('category-list', get(shopper, 'category-list')),
+            Scenario('category-products', rotating(shopper, 'category-products', 'slug', category_slugs)),
+            Scenario('cart-view', get(shopper, 'cart')),
+            Scenario('cart-add', add_to_cart),
+            Scenario('coupon-validate', lambda: (shopper, 'POST', reverse('validate-coupon'), {'code': BENCHMARK_COUPON})),
+            Scenario('checkout', lambda: (shopper, 'POST', reverse('order-list'), {
+                'shipping_address_id': address.id, 'coupon_code': BENCHMARK_COUPON,
+            })),
+            Scenario('admin-dashboard', get(admin, 'admin-dashboard')),
+            Scenario('admin-report-sales', lambda: (admin, 'GET', reverse('admin-reporting') + '?type=sales', None)),
+            Scenario('admin-report-products', lambda: (
+                admin, 'GET', reverse('admin-reporting') + '?type=product_performance', None
+            )),
+            Scenario('admin-report-users', lambda: (admin, 'GET', reverse('admin-reporting') + '?type=user_activity', None)),
+        ]
+
+    def sample_ids(self, queryset, rng):
+        """
+        Up to SAMPLE_SIZE ids spread over the table, without ORDER BY RANDOM() on a big table
+        """
+        top = queryset.order_by('-id').values_list('id', flat=True).first() or 0
+        ids = []
+        for start in sorted(rng.sample(range(1, top + 1), min(top, SAMPLE_SIZE))):
+            found = queryset.filter(id__gte=start).order_by('id').values_list('id', flat=True).first()
+            if found is not None:
+                ids.append(found)
+        return sorted(set(ids))
+
+    def variants(self, product_ids):
+        """
+        (product id, size id, product color id) that pass the cart's stock checks
+        """
+        colors = dict(
+            ProductColor.objects.filter(product_id__in=product_ids, is_default=True).values_list('product_id', 'id')
+        )
+        return [
+            (product_id, size_id, colors[product_id])
+            for product_id, size_id in ProductSize.objects.filter(
+                product_id__in=product_ids, product__in_stock=True, is_available=True, stock_quantity__gte=1,
+            ).order_by('product_id', 'id').values_list('product_id', 'size_id')
+            if product_id in colors
+        ]
+
+    def request(self, scenario):
+        """
+        One request in a rolled back savepoint; returns (seconds, queries, status)
+        """
+        client, method, path, data = scenario.request()
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with transaction.atomic():
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                if method == 'GET':
+                    response = client.get(path)
+                else:
+                    response = client.post(path, data, content_type='application/json')
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return elapsed, len(queries), response.status_code
+
+    def run(self, scenario, options):
+        for _ in range(options['warmup']):
+            self.request(scenario)
+
+        timings, query_counts, errors = [], [], 0
+        for _ in range(options['iterations']):
+            elapsed, queries, status = self.request(scenario)
+            timings.append(elapsed * 1000)
+            query_counts.append(queries)
+            errors += status >= 400
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(options['alloc_iterations']):
+                tracemalloc.reset_peak()
+                baseline_memory = tracemalloc.get_traced_memory()[0]
+                self.request(scenario)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline_memory)
+        finally:
+            tracemalloc.stop()
+
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+        return {
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'p99_ms': round(percentiles[98], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': round(statistics.median(query_counts)),
+            'alloc_peak_kib': round(statistics.median(peaks) / 1024, 1) if peaks else None,
+            'errors': errors,
+        }
+
+    def regressions(self, name, result, baseline, tolerance):
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            return []
+        problems = []
+        if result['p95_ms'] > previous['p95_ms'] * (1 + tolerance / 100):
+            problems.append(f"p95 {previous['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result['queries'] > previous['queries']:
+            problems.append(f"queries {previous['queries']} -> {result['queries']}")
+        return problems
+
+    def report(self, name, result, baseline, tolerance):
+        peak = result['alloc_peak_kib']
+        line = (
+            f"{name:<24} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+            f"p99 {result['p99_ms']:8.2f} ms  {result['queries']:>4} queries  "
+            f"{'-' if peak is None else f'{peak:.1f}':>9} KiB peak"
+        )
+        problems = self.regressions(name, result, baseline, tolerance) if baseline else []
+        if result['errors']:
+            problems.insert(0, f"{result['errors']} error response(s)")
+        if problems:
+            self.stdout.write(self.style.ERROR(f'{line}  {"; ".join(problems)}'))
+        else:
+            self.stdout.write(line)
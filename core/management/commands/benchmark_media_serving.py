@@ -0,0 +1,72 @@
+# core/management/commands/benchmark_media_serving.py
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from core.views import serve_media
+
+SIZES = {'thumb': 20 * 1024, 'photo': 400 * 1024, 'large': 5 * 1024 * 1024}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark media serving: Django's static() serve view against serve_media's "
+        'streaming fallback (full, range and revalidation requests) and sendfile offload'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        root = tempfile.mkdtemp()
+        try:
+            for label, size in SIZES.items():
+                with open(os.path.join(root, f'{label}.jpg'), 'wb') as handle:
+                    handle.write(os.urandom(size))
+            with override_settings(MEDIA_ROOT=root, MEDIA_SENDFILE_BACKEND=None):
+                self._run(root, options['requests'])
+        finally:
+            shutil.rmtree(root)
+
+    def _run(self, root, count):
+        factory = RequestFactory()
+        for label, size in SIZES.items():
+            path = f'{label}.jpg'
+            etag = serve_media(factory.get('/'), path)['ETag']
+            self.stdout.write(f'{label} ({size // 1024} KB)')
+            self._time('static() serve', lambda: serve(factory.get('/'), path, document_root=root), count)
+            self._time('serve_media', lambda: serve_media(factory.get('/'), path), count)
+            self._time('serve_media range', lambda: serve_media(
+                factory.get('/', HTTP_RANGE='bytes=0-65535'), path
+            ), count)
+            self._time('serve_media 304', lambda: serve_media(
+                factory.get('/', HTTP_IF_NONE_MATCH=etag), path
+            ), count)
+            with override_settings(MEDIA_SENDFILE_BACKEND='x-accel-redirect'):
+                self._time('x-accel-redirect', lambda: serve_media(factory.get('/'), path), count)
+
+    def _time(self, label, make_response, count):
+        timings = []
+        transferred = 0
+        for _ in range(count):
+            start = time.perf_counter()
+            response = make_response()
+            # Drain the body the way the WSGI server would
+            if response.streaming:
+                for chunk in response.streaming_content:
+                    transferred += len(chunk)
+            else:
+                transferred += len(response.content)
+            response.close()
+            timings.append((time.perf_counter() - start) * 1000)
+        total = sum(timings) / 1000
+        self.stdout.write(
+            f'  {label:<18} {count / total:9.0f} req/s   p50 {statistics.median(timings):7.3f} ms   '
+            f'{transferred / total / (1024 * 1024):8.1f} MB/s'
+        )
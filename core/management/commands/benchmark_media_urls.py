@@ -0,0 +1,41 @@
+# core/management/commands/benchmark_media_urls.py
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from core.media_urls import MediaURLBuilder, media_url_builder
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark building absolute media URLs: build_absolute_uri(storage.url()) against MediaURLBuilder'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urls', type=int, default=100_000, help='URLs built per scenario')
+
+    def handle(self, *args, **options):
+        count = options['urls']
+        names = [f'productimage/{i % 256:02x}/{i % 97:02x}/{i:032x}.jpg' for i in range(count)]
+        request = RequestFactory().get('/api/v1/products/', HTTP_HOST='shop.fairfoul.com', secure=True)
+
+        def per_call():
+            return [request.build_absolute_uri(default_storage.url(name)) for name in names]
+
+        def builder():
+            urls = media_url_builder(request)
+            return [urls.url(name) for name in names]
+
+        results = {}
+        for label, build in (('build_absolute_uri', per_call), ('MediaURLBuilder', builder)):
+            start = time.perf_counter()
+            results[label] = build()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{label:<20} {elapsed * 1000:9.1f} ms   {elapsed / count * 1e6:6.2f} us/url   '
+                f'{count / elapsed:12,.0f} urls/s'
+            )
+
+        if results['build_absolute_uri'] != results['MediaURLBuilder']:
+            self.stderr.write('URL mismatch between the two strategies')
+        self.stdout.write(f'e.g. {MediaURLBuilder(request).url(names[0])}')
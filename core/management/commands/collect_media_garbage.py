@@ -0,0 +1,61 @@
+# core/management/commands/collect_media_garbage.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.media import ReferenceIndex, find_orphans, iter_referenced_names, remove_orphan
+
+
+class Command(BaseCommand):
+    help = (
+        'Find files under MEDIA_ROOT that no database row refers to and quarantine or delete them. '
+        'Referenced paths are spilled to a temporary SQLite index and the media tree is streamed, '
+        'so memory use does not grow with the number of files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report orphaned files')
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Delete orphans instead of moving them to MEDIA_QUARANTINE_DIR'
+        )
+        parser.add_argument(
+            '--min-age-hours', type=float, default=24,
+            help='Leave files younger than this alone; uploads are stored before their rows commit'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        quarantine_dir = None if options['delete'] else settings.MEDIA_QUARANTINE_DIR
+
+        with ReferenceIndex() as index:
+            referenced = index.add_all(iter_referenced_names())
+            self.stdout.write(f'{referenced} referenced file(s) indexed.')
+
+            orphans = reclaimed = failed = 0
+            for name, size in find_orphans(
+                index, min_age_seconds=options['min_age_hours'] * 3600, batch_size=options['batch_size']
+            ):
+                if options['dry_run']:
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'  {name} ({size} bytes)')
+                else:
+                    try:
+                        remove_orphan(name, quarantine_dir=quarantine_dir)
+                    except OSError as exc:
+                        failed += 1
+                        self.stderr.write(f'{name}: {exc}')
+                        continue
+                orphans += 1
+                reclaimed += size
+
+        megabytes = reclaimed / (1024 * 1024)
+        if options['dry_run']:
+            self.stdout.write(f'{orphans} orphaned file(s), {megabytes:.1f} MB would be reclaimed.')
+        elif quarantine_dir:
+            self.stdout.write(self.style.SUCCESS(
+                f'Moved {orphans} orphaned file(s), {megabytes:.1f} MB, to {quarantine_dir}; {failed} failed.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Deleted {orphans} orphaned file(s), {megabytes:.1f} MB; {failed} failed.'
+            ))
@@ -0,0 +1,40 @@
+# core/management/commands/explain_hot_queries.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.query_plans import SUPPORTED_VENDORS, explain, full_scans, hot_queries
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot read queries and fail when any of them scans a whole table. '
+        'Run against a database with realistic row counts: planners may prefer a scan on tiny tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just failing ones')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise CommandError(
+                f'Unsupported database backend {connection.vendor}; plans can be checked on '
+                f'{", ".join(SUPPORTED_VENDORS)}'
+            )
+        failures = []
+        for label, queryset in hot_queries():
+            plan = explain(queryset)
+            scanned = full_scans(plan)
+            if scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {label}: {", ".join(scanned)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'indexed    {label}'))
+            if scanned or options['verbose_plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} hot quer{"y" if len(failures) == 1 else "ies"} fall back to a full scan '
+                f'on {connection.vendor}: {", ".join(failures)}'
+            )
@@ -0,0 +1,44 @@
+# core/management/commands/generate_image_metadata.py
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import build_image_metadata
+
+# (model, image field, metadata field); product images are handled by
+# generate_image_derivatives and profile pictures by process_profile_pictures
+IMAGE_FIELDS = (
+    ('products.Category', 'image', 'image_meta'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Backfill image metadata (size, dominant colour, placeholder) for category images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompute metadata that already exists')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model_label, field_name, meta_field in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            processed = failed = 0
+            last_id = 0
+            while True:
+                batch = list(
+                    model._default_manager.filter(id__gt=last_id).exclude(**{field_name: ''})
+                    .exclude(**{f'{field_name}__isnull': True}).order_by('id')
+                    .values_list('id', field_name, meta_field)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                for pk, name, metadata in batch:
+                    if not options['force'] and metadata.get('source') == name:
+                        continue
+                    try:
+                        build_image_metadata(model_label, pk, field_name, meta_field, force=options['force'])
+                        processed += 1
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'{model_label} {pk}: {exc}')
+            self.stdout.write(f'{model_label}: {processed} processed, {failed} failed')
@@ -0,0 +1,217 @@
+# core/media.py
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.db.models import F
+
+from .images import avatar_names, derivative_names
+from .models import MediaBlob
+from .utils import shard_path, unshard_directory
+
+# JSON fields that hold storage names of generated files, as (model, field, name extractor)
+GENERATED_FILE_FIELDS = (
+    ('products.ProductImage', 'derivatives', derivative_names),
+    ('users.User', 'profile_picture_variants', avatar_names),
+)
+
+
+def sharded_name(name):
+    """
+    Where an unsharded storage name lives in the sharded layout
+    """
+    directory, filename = os.path.split(name)
+    return shard_path(unshard_directory(directory), filename)
+
+
+def relocate(storage, old_name, new_name):
+    """
+    Make old_name's file available at new_name without a window where neither
+    exists: hard link (or copy across devices) first; the caller removes the
+    old path once the database points at the new one.
+
+    Safe to repeat: returns False if the file is already only at new_name.
+    """
+    old_path, new_path = storage.path(old_name), storage.path(new_name)
+    if not os.path.exists(old_path):
+        if os.path.exists(new_path):
+            return False
+        raise FileNotFoundError(old_path)
+    if os.path.exists(new_path):
+        return True
+    os.makedirs(os.path.dirname(new_path), exist_ok=True)
+    try:
+        os.link(old_path, new_path)
+    except OSError:
+        shutil.copy2(old_path, new_path)
+    return True
+
+
+def rename_blob(old_name, new_name):
+    """
+    Carry a content-addressed blob's reference count over to its new name
+    """
+    old = MediaBlob.objects.filter(name=old_name).first()
+    if old is None:
+        return
+    if not MediaBlob.objects.filter(name=new_name).update(ref_count=F('ref_count') + old.ref_count):
+        MediaBlob.objects.create(name=new_name, sha256=old.sha256, size=old.size, ref_count=old.ref_count)
+    old.delete()
+
+
+def remove_relocated(storage, old_name):
+    path = storage.path(old_name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def iter_media_files(root=None):
+    """
+    Yield (storage name, size, mtime) for every file below MEDIA_ROOT, streaming
+    one directory at a time so memory stays flat however many files there are
+    """
+    root = os.fspath(root or settings.MEDIA_ROOT)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    name = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                    yield name, stat.st_size, stat.st_mtime
+
+
+def iter_referenced_names(chunk_size=5000):
+    """
+    Yield every storage name the database refers to: all FileField/ImageField
+    values plus generated files recorded in JSON fields (derivatives, avatars)
+    """
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField) and field.concrete:
+                yield from (
+                    model._default_manager.exclude(**{field.name: ''})
+                    .exclude(**{f'{field.name}__isnull': True})
+                    .values_list(field.name, flat=True).iterator(chunk_size=chunk_size)
+                )
+
+    for model_label, field_name, extractor in GENERATED_FILE_FIELDS:
+        model = apps.get_model(model_label)
+        for value in model._default_manager.values_list(field_name, flat=True).iterator(chunk_size=chunk_size):
+            yield from extractor(value)
+
+
+class ReferenceIndex:
+    """
+    The set of referenced names, spilled to a temporary SQLite file so that
+    millions of paths don't have to fit in memory
+    """
+
+    def __init__(self, directory=None):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3', dir=directory)
+        os.close(handle)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode = OFF')
+        self.db.execute('PRAGMA synchronous = OFF')
+        self.db.execute('CREATE TABLE refs (name TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def add_all(self, names, batch_size=10000):
+        batch = []
+        for name in names:
+            batch.append((os.path.normpath(name).replace(os.sep, '/'),))
+            if len(batch) >= batch_size:
+                self.db.executemany('INSERT OR IGNORE INTO refs VALUES (?)', batch)
+                batch = []
+        if batch:
+            self.db.executemany('INSERT OR IGNORE INTO refs VALUES (?)', batch)
+        self.db.commit()
+        return self.db.execute('SELECT COUNT(*) FROM refs').fetchone()[0]
+
+    def referenced(self, names):
+        """
+        The subset of names that are referenced
+        """
+        found = set()
+        # Stay under SQLite's bound parameter limit
+        for start in range(0, len(names), 900):
+            chunk = names[start:start + 900]
+            found.update(
+                row[0] for row in self.db.execute(
+                    'SELECT name FROM refs WHERE name IN ({})'.format(','.join('?' * len(chunk))), chunk
+                )
+            )
+        return found
+
+    def __iter__(self):
+        return (row[0] for row in self.db.execute('SELECT name FROM refs'))
+
+    def close(self):
+        self.db.close()
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def find_orphans(index, min_age_seconds=0, batch_size=1000, root=None):
+    """
+    Yield (name, size) for media files no database row refers to. Files newer
+    than min_age_seconds are left alone: uploads are written before their row commits.
+    """
+    cutoff = time.time() - min_age_seconds
+    batch = []
+
+    def flush():
+        referenced = index.referenced([name for name, _ in batch])
+        return [(name, size) for name, size in batch if name not in referenced]
+
+    for name, size, mtime in iter_media_files(root):
+        if mtime > cutoff:
+            continue
+        batch.append((name, size))
+        if len(batch) >= batch_size:
+            yield from flush()
+            batch = []
+    if batch:
+        yield from flush()
+
+
+def _prune_empty_parents(path, root):
+    directory = os.path.dirname(path)
+    while os.path.normpath(directory) != os.path.normpath(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def remove_orphan(name, quarantine_dir=None, root=None):
+    """
+    Delete an orphaned file, or move it under quarantine_dir keeping its relative path
+    """
+    root = os.fspath(root or settings.MEDIA_ROOT)
+    path = os.path.join(root, name)
+    if quarantine_dir:
+        target = os.path.join(quarantine_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+    else:
+        os.remove(path)
+    MediaBlob.objects.filter(name=name).delete()
+    _prune_empty_parents(path, root)
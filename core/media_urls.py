@@ -0,0 +1,87 @@
+# core/media_urls.py
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+class MediaURLBuilder:
+    """
+    Builds media URLs for one request. The scheme, host and media prefix are
+    resolved once, so each URL is a string join instead of a storage.url()
+    plus build_absolute_uri() round trip. With MEDIA_CDN_URL set, URLs point
+    at the CDN instead of the request host.
+    """
+
+    def __init__(self, request=None):
+        if settings.MEDIA_CDN_URL:
+            self.base_url = settings.MEDIA_CDN_URL.rstrip('/') + '/'
+        elif request is not None:
+            self.base_url = request.build_absolute_uri(settings.MEDIA_URL)
+        else:
+            self.base_url = settings.MEDIA_URL
+        self.request = request
+        self._local_storages = {}
+
+    def _is_local(self, storage):
+        # Only files served from MEDIA_URL can be joined directly; other storages know their own URLs
+        key = id(storage)
+        if key not in self._local_storages:
+            self._local_storages[key] = (
+                isinstance(storage, FileSystemStorage) and storage.base_url == settings.MEDIA_URL
+            )
+        return self._local_storages[key]
+
+    def url(self, file_or_name, storage=None):
+        """
+        Absolute URL for a FieldFile, or for a storage name in storage (default storage if omitted)
+        """
+        if not file_or_name:
+            return None
+        if isinstance(file_or_name, str):
+            name = file_or_name
+        else:
+            name, storage = file_or_name.name, file_or_name.storage
+        if storage is None or self._is_local(storage):
+            return self.base_url + filepath_to_uri(name).lstrip('/')
+        url = storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request is not None else url
+
+
+def media_url_builder(request):
+    """
+    The URL builder for a request, created on first use and reused by every
+    serializer rendering that request
+    """
+    if request is None:
+        return MediaURLBuilder()
+    builder = getattr(request, '_media_url_builder', None)
+    if builder is None:
+        builder = MediaURLBuilder(request)
+        request._media_url_builder = builder
+    return builder
+
+
+class MediaImageField(serializers.ImageField):
+    """
+    ImageField that renders its URL through the request's MediaURLBuilder
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        if not getattr(self, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return value.name
+        return media_url_builder(self.context.get('request')).url(value)
+
+
+class MediaURLSerializerMixin:
+    """
+    Render a ModelSerializer's model ImageFields with MediaImageField
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.ImageField: MediaImageField,
+    }
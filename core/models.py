@@ -8,4 +8,16 @@ class TimestampedModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+class MediaBlob(TimestampedModel):
+    """
+    A stored file named by its content hash, shared by every upload with the same bytes
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
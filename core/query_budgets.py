@@ -0,0 +1,267 @@
+# core/query_budgets.py
+import re
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+
+# Only the API is budgeted; the Django admin, docs and debug toolbar are not ours to tune
+API_PREFIX = 'api/v1/'
+# GET views that can't be exercised without a one-off token in the URL
+SKIPPED = {'verify_email'}
+# Literals that differ between otherwise identical statements
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_PARAMS = re.compile(r'\(\?(?:, \?)+\)')
+
+
+def get_endpoints(patterns=None, prefix=''):
+    """
+    Yield (name, route, pattern) for every API URL whose view answers GET
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from get_endpoints(pattern.url_patterns, route)
+            continue
+        if not route.startswith(API_PREFIX) or pattern.name in SKIPPED:
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None) or getattr(pattern.callback, 'cls', None)
+        if view_class is not None and hasattr(view_class, 'get'):
+            yield pattern.name, route, pattern
+
+
+def seed_fixture(scale):
+    """
+    Create a catalog, its customers and a staff user's account data where every
+    relation an endpoint can fan out over has `scale` rows per parent (so
+    scale ** 2 products, each with scale sizes, colors, images, reviews...).
+    Returns the objects URL kwargs are filled from.
+    """
+    from admin_console.models import AdminActivity
+    from contact.models import ContactMessage
+    from orders.models import Cart, CartItem, Coupon, Order, OrderEvent, OrderItem
+    from products.inventory import rebuild_low_stock
+    from products.models import (
+        Category, Color, ImageUploadSession, Product, ProductColor, ProductHighlight,
+        ProductImage, ProductReview, ProductSize, ProductSpecification, Size, Wishlist, WishlistItem,
+    )
+    from users.models import Address, User
+
+    staff = User.objects.create_user(
+        username='budget-staff', email='budget-staff@example.com', password='budget',
+        is_staff=True, is_superuser=True,
+    )
+    customers = [
+        User.objects.create_user(username=f'budget-customer-{i}', email=f'budget-customer-{i}@example.com')
+        for i in range(scale)
+    ]
+    addresses = Address.objects.bulk_create(
+        Address(
+            user=staff, full_name='Budget Staff', phone_number='5550100', address_line1=f'{i} Main St',
+            city='Springfield', state='IL', postal_code='62701', is_default=i == 0,
+        )
+        for i in range(scale)
+    )
+
+    parent = Category.objects.create(name='Budget', slug='budget')
+    categories = Category.objects.bulk_create(
+        Category(name=f'Budget {i}', slug=f'budget-{i}', parent=parent) for i in range(scale)
+    )
+    colors = Color.objects.bulk_create(
+        Color(name=f'Color {i}', hex_value=f'#{i:06x}') for i in range(scale)
+    )
+    sizes = Size.objects.bulk_create(
+        Size(name=f'S{i}', display_order=i) for i in range(scale)
+    )
+    products = Product.objects.bulk_create(
+        Product(
+            name=f'Budget product {c}-{i}', slug=f'budget-product-{c}-{i}', sku=f'BUDGET-{c}-{i}',
+            category=category, description='Fixture product', price=Decimal('20.00'),
+            original_price=Decimal('25.00'), stock_quantity=10,
+            is_featured=True, is_new=True, is_bestseller=True,
+        )
+        for c, category in enumerate(categories)
+        for i in range(scale)
+    )
+    # Every other variant is below the product's low stock threshold
+    product_sizes = ProductSize.objects.bulk_create(
+        ProductSize(product=product, size=size, stock_quantity=1 if i % 2 else 10)
+        for product in products
+        for i, size in enumerate(sizes)
+    )
+    product_colors = ProductColor.objects.bulk_create(
+        ProductColor(product=product, color=color, is_default=i == 0)
+        for product in products
+        for i, color in enumerate(colors)
+    )
+    ProductImage.objects.bulk_create(
+        ProductImage(
+            product=product_color.product, color=product_color, is_primary=product_color.is_default,
+            image=f'productimage/budget-{product_color.product_id}-{product_color.color_id}.jpg',
+        )
+        for product_color in product_colors
+    )
+    ProductHighlight.objects.bulk_create(
+        ProductHighlight(product=product, text=f'Highlight {i}', display_order=i)
+        for product in products
+        for i in range(scale)
+    )
+    ProductSpecification.objects.bulk_create(
+        ProductSpecification(product=product, title=f'Spec {i}', value='Value', display_order=i)
+        for product in products
+        for i in range(scale)
+    )
+    ProductReview.objects.bulk_create(
+        ProductReview(product=product, user=user, rating=4, title='Fixture review')
+        for product in products
+        for user in [staff, *customers]
+    )
+    upload_session = ImageUploadSession.objects.create(
+        product=products[0], created_by=staff, filename='budget.jpg', size=1024,
+    )
+
+    wishlists = Wishlist.objects.bulk_create(
+        Wishlist(user=staff, name=f'Budget wishlist {i}') for i in range(scale)
+    )
+    wishlist_items = WishlistItem.objects.bulk_create(
+        WishlistItem(wishlist=wishlist, product=product, selected_size=sizes[0], selected_color=colors[0])
+        for wishlist in wishlists
+        for product in products[:scale]
+    )
+    cart = Cart.objects.create(user=staff)
+    cart_items = CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=product_size.product, size=product_size.size)
+        for product_size in product_sizes[:scale]
+    )
+
+    orders = Order.objects.bulk_create(
+        Order(
+            order_number=f'BUDGET-{i}', user=staff, shipping_address=addresses[0], billing_address=addresses[0],
+            subtotal=Decimal('40.00'), total=Decimal('40.00'),
+        )
+        for i in range(scale)
+    )
+    OrderItem.objects.bulk_create(
+        OrderItem(
+            order=order, product=product, product_name=product.name, product_sku=product.sku,
+            size=sizes[0], size_name=sizes[0].name, price=product.price,
+        )
+        for order in orders
+        for product in products[:scale]
+    )
+    OrderEvent.objects.bulk_create(
+        OrderEvent(order=order, event_type='note_added', description='Fixture event', created_by=staff)
+        for order in orders
+        for _ in range(scale)
+    )
+    now = timezone.now()
+    coupons = Coupon.objects.bulk_create(
+        Coupon(code=f'BUDGET{i}', discount_percentage=10, valid_from=now, valid_to=now + timedelta(days=30))
+        for i in range(scale)
+    )
+    messages = ContactMessage.objects.bulk_create(
+        ContactMessage(name='Budget', email='budget@example.com', subject=f'Subject {i}', message='Hello')
+        for i in range(scale)
+    )
+    activities = AdminActivity.objects.bulk_create(
+        AdminActivity(user=staff, activity_type='product_updated', description=f'Fixture activity {i}')
+        for i in range(scale)
+    )
+    rebuild_low_stock()
+
+    return {
+        'staff': staff,
+        'category': categories[0],
+        'product': products[0],
+        'color': colors[0],
+        'size': sizes[0],
+        'product_size': product_sizes[0],
+        'product_color': product_colors[0],
+        'review': ProductReview.objects.filter(user=staff).first(),
+        'wishlist': wishlists[0],
+        'wishlist_item': wishlist_items[0],
+        'upload_session': upload_session,
+        'cart_item': cart_items[0],
+        'order': orders[0],
+        'coupon': coupons[0],
+        'message': messages[0],
+        'activity': activities[0],
+        'address': addresses[0],
+        'user': customers[0],
+    }
+
+
+# Which fixture object a route's pk refers to, by the path segment before it;
+# the first suffix that matches wins, so longer segments come first
+PK_OBJECTS = (
+    ('product-sizes/', 'product_size'),
+    ('product-colors/', 'product_color'),
+    ('cart/items/', 'cart_item'),
+    ('/items/', 'wishlist_item'),
+    ('addresses/', 'address'),
+    ('colors/', 'color'),
+    ('sizes/', 'size'),
+    ('reviews/', 'review'),
+    ('wishlists/', 'wishlist'),
+    ('orders/', 'order'),
+    ('coupons/', 'coupon'),
+    ('messages/', 'message'),
+    ('activities/', 'activity'),
+    ('users/', 'user'),
+)
+
+
+def url_kwargs(route, pattern, fixture):
+    """
+    Fill a route's converters from the fixture, or None if there is no object for one
+    """
+    kwargs = {}
+    for name in pattern.pattern.converters:
+        if name == 'slug':
+            kwargs[name] = (fixture['category'] if 'categor' in route else fixture['product']).slug
+        elif name == 'session_id':
+            kwargs[name] = fixture['upload_session'].pk
+        elif name == 'wishlist_id':
+            kwargs[name] = fixture['wishlist'].pk
+        elif name == 'pk':
+            head = route.split('<int:pk>')[0]
+            key = next((key for segment, key in PK_OBJECTS if head.endswith(segment)), None)
+            if key is None:
+                return None
+            kwargs[name] = fixture[key].pk
+        else:
+            return None
+    return kwargs
+
+
+def normalize_sql(sql):
+    """
+    A statement with its literals replaced, so N+1 repeats collapse to one shape
+    """
+    return _SQL_PARAMS.sub('(?)', _SQL_LITERALS.sub('?', sql))
+
+
+def duplicated_queries(queries):
+    """
+    [(count, normalized sql)] for statement shapes that ran more than once, most repeated first
+    """
+    counts = Counter(normalize_sql(query['sql']) for query in queries)
+    return [(count, sql) for sql, count in counts.most_common() if count > 1]
+
+
+def measure(client, path):
+    """
+    GET a path and return (status code, captured queries)
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(path)
+        if response.streaming:
+            # Streamed responses run their queries while being consumed
+            b''.join(response.streaming_content)
+    return response.status_code, context.captured_queries
@@ -0,0 +1,78 @@
+# core/query_plans.py
+import json
+import re
+
+from django.db import connection
+
+# SQLite: 'SCAN products_product' reads the whole table; 'SCAN t USING INDEX i' walks an index in order
+_SQLITE_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?\s*$')
+_POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+# Backends full_scans can read plans from
+SUPPORTED_VENDORS = ('sqlite', 'postgresql', 'mysql')
+
+
+def hot_queries():
+    """
+    (label, queryset) for the hot read paths, built the way the views build them.
+    Filter values are placeholders; only the plan matters.
+    """
+    from admin_console.models import AdminActivity
+    from orders.models import Order
+    from products.models import Product, ProductImage, ProductReview
+    from users.models import User
+    from users.search import prefix_search
+
+    products = Product.objects.filter(is_active=True)
+    return [
+        ('product list (newest)', products.order_by('-created_at')[:20]),
+        ('category products', products.filter(category_id=1)[:20]),
+        ('featured products', Product.objects.filter(is_featured=True, is_active=True)[:8]),
+        ('new arrivals', Product.objects.filter(is_new=True, is_active=True)[:8]),
+        ('bestsellers', Product.objects.filter(is_bestseller=True, is_active=True)[:8]),
+        ('product detail', products.filter(slug='example')),
+        ('primary image', ProductImage.objects.filter(product_id=1, is_primary=True)),
+        ('product reviews', ProductReview.objects.filter(
+            product__slug='example', is_approved=True
+        ).order_by('-created_at')[:20]),
+        ('user reviews', ProductReview.objects.filter(user_id=1).order_by('-created_at')[:20]),
+        ('user orders', Order.objects.filter(user_id=1).order_by('-created_at')[:20]),
+        ('orders by status', Order.objects.filter(order_status='pending').order_by('-created_at')[:20]),
+        ('admin activity by type', AdminActivity.objects.filter(
+            activity_type='login'
+        ).order_by('-created_at')[:20]),
+        ('admin user search', prefix_search(User.objects.all(), 'jo smith')),
+    ]
+
+
+def explain(queryset):
+    """
+    The database's plan for a queryset, as text
+    """
+    if connection.vendor == 'mysql':
+        return queryset.explain(format='json')
+    return queryset.explain()
+
+
+def _mysql_full_scans(node):
+    if isinstance(node, dict):
+        if node.get('access_type') == 'ALL':
+            yield node.get('table_name', '?')
+        for value in node.values():
+            yield from _mysql_full_scans(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _mysql_full_scans(value)
+
+
+def full_scans(plan, vendor=None):
+    """
+    Tables a plan reads in full
+    """
+    vendor = vendor or connection.vendor
+    if vendor == 'sqlite':
+        return [match.group(1) for line in plan.splitlines() if (match := _SQLITE_FULL_SCAN.search(line))]
+    if vendor == 'postgresql':
+        return _POSTGRES_FULL_SCAN.findall(plan)
+    if vendor == 'mysql':
+        return list(_mysql_full_scans(json.loads(plan)))
+    raise NotImplementedError(f'No plan parser for {vendor}')
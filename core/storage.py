@@ -0,0 +1,101 @@
+# core/storage.py
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .models import MediaBlob
+from .utils import shard_path, unshard_directory
+
+HASHED_NAME = re.compile(r'^[0-9a-f]{64}\.[0-9a-z]+$')
+
+
+def hash_content(content):
+    """
+    sha256 of a File's bytes, read in chunks; leaves the file at position 0
+    """
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    return bool(name) and bool(HASHED_NAME.match(posixpath.basename(name)))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the sha256 of their content,
+    keeping the upload_to directory and extension: productimage/<sha256>.jpg.
+
+    Saving bytes that are already stored returns the existing name and adds a
+    reference instead of writing a copy; delete() drops a reference and only
+    removes the file once nothing refers to it. Since a name can never point at
+    different bytes, its URL is safe to cache forever.
+    """
+
+    def hashed_name(self, name, digest):
+        # Shard on the digest, replacing any shard directories the upload_to chose
+        dirname, filename = posixpath.split(name)
+        return shard_path(unshard_directory(dirname), digest + os.path.splitext(filename)[1].lower())
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hash_content(content)
+        name = self.hashed_name(name, digest)
+        self._write(name, content)
+        # Only bytes that made it to disk are referenced, and the reference joins the
+        # caller's transaction, so a rolled back row save takes it back too (the file
+        # is then an orphan for collect_media_garbage)
+        self._add_reference(name, digest, content.size)
+        if not self.exists(name):
+            # The last other reference was released while this one was being added
+            self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        if self.exists(name):
+            return
+        content.seek(0)
+        stored = self._save(name, content)
+        if stored != name:
+            # Lost a race with an identical upload; keep the first copy
+            super().delete(stored)
+
+    def _add_reference(self, name, digest, size):
+        with transaction.atomic():
+            _, created = MediaBlob.objects.get_or_create(
+                name=name, defaults={'sha256': digest, 'size': size}
+            )
+            if not created:
+                MediaBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def delete(self, name):
+        if not is_content_addressed(name):
+            return super().delete(name)
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            if blob is not None:
+                blob.delete()
+            # Remove the file only once the release is durable, and only if the
+            # same bytes weren't uploaded again in the meantime
+            transaction.on_commit(lambda: self._delete_unreferenced(name))
+
+    def _delete_unreferenced(self, name):
+        if not MediaBlob.objects.filter(name=name).exists():
+            super().delete(name)
@@ -0,0 +1,503 @@
+# core/synthetic_data.py
+import random
+import time
+from array import array
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from orders.models import Cart, CartItem, Order, OrderEvent, OrderItem
+from products.inventory import refresh_low_stock
+from products.models import (
+    Category, Color, Product, ProductColor, ProductHighlight, ProductImage, ProductReview,
+    ProductSize, ProductSpecification, Size,
+)
+from users.models import Address, User
+from users.search import index_users
+
+DEPARTMENTS = ('Men', 'Women', 'Kids', 'Unisex', 'Sport', 'Workwear', 'Outlet', 'Essentials')
+GARMENTS = (
+    'Shirt', 'T-Shirt', 'Polo', 'Hoodie', 'Sweater', 'Cardigan', 'Jacket', 'Coat', 'Blazer',
+    'Jeans', 'Chinos', 'Shorts', 'Joggers', 'Dress', 'Skirt', 'Overshirt', 'Vest', 'Tank',
+)
+ADJECTIVES = (
+    'Classic', 'Relaxed', 'Slim', 'Oversized', 'Vintage', 'Everyday', 'Heritage', 'Essential',
+    'Washed', 'Cropped', 'Tailored', 'Lightweight', 'Heavyweight', 'Brushed', 'Ribbed', 'Utility',
+)
+MATERIALS = ('Cotton', 'Linen', 'Denim', 'Wool', 'Fleece', 'Jersey', 'Twill', 'Corduroy', 'Poplin', 'Flannel')
+FITS = ('Regular', 'Slim', 'Relaxed', 'Oversized')
+CARE = ('Machine wash cold', 'Hand wash only', 'Dry clean only', 'Machine wash 30C, tumble dry low')
+HIGHLIGHTS = (
+    'Garment dyed for a lived-in look', 'Reinforced seams', 'Pre-shrunk', 'Made from organic cotton',
+    'Recycled fibres', 'Tagless neck label', 'Double-needle hems', 'Hidden side pockets',
+    'Breathable weave', 'Ethically made', 'Anti-pill finish', 'Adjustable cuffs',
+)
+COLOR_PALETTE = (
+    ('Black', '#000000'), ('White', '#FFFFFF'), ('Navy', '#1F2A44'), ('Grey', '#8A8D91'),
+    ('Olive', '#6B6B3A'), ('Sand', '#C2B280'), ('Burgundy', '#800020'), ('Sky', '#87CEEB'),
+    ('Forest', '#228B22'), ('Rust', '#B7410E'), ('Cream', '#FFFDD0'), ('Charcoal', '#36454F'),
+)
+SIZE_PALETTE = ('XS', 'S', 'M', 'L', 'XL', 'XXL')
+FIRST_NAMES = (
+    'Ada', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farid', 'Grace', 'Hugo', 'Isla', 'Jonas',
+    'Kira', 'Liam', 'Maya', 'Noah', 'Olga', 'Priya', 'Quinn', 'Rosa', 'Sami', 'Theo',
+)
+LAST_NAMES = (
+    'Adams', 'Baker', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Jensen',
+    'Kowalski', 'Lopez', 'Murphy', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Weber',
+)
+CITIES = (
+    ('Austin', 'TX', '73301'), ('Boston', 'MA', '02108'), ('Chicago', 'IL', '60601'),
+    ('Denver', 'CO', '80202'), ('Miami', 'FL', '33101'), ('Portland', 'OR', '97201'),
+    ('Seattle', 'WA', '98101'), ('Brooklyn', 'NY', '11201'),
+)
+REVIEW_TITLES = ('Love it', 'Great fit', 'Runs small', 'Runs large', 'Good value', 'Not for me', 'Perfect')
+# Weighted towards good reviews, as real catalogs are
+RATINGS = (5, 5, 5, 4, 4, 4, 3, 2, 1)
+QUANTITIES = (1, 1, 1, 1, 2, 2, 3)
+ORDER_STEPS = ('pending', 'processing', 'shipped', 'delivered')
+# Every adjective/material/garment combination, so a product only keeps the index of its name
+PRODUCT_NAME_PARTS = [
+    (adjective, material, garment) for adjective in ADJECTIVES for material in MATERIALS for garment in GARMENTS
+]
+PRODUCT_NAMES = [' '.join(parts) for parts in PRODUCT_NAME_PARTS]
+PRODUCT_SLUGS = [slugify(name) for name in PRODUCT_NAMES]
+MAX_PRODUCT_COLORS = 4
+MAX_ADDRESSES = 2
+SYNTHETIC_PASSWORD = 'synthetic'
+
+
+def money(cents):
+    return f'{cents // 100}.{cents % 100:02d}'
+
+
+def next_id(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+class RowWriter:
+    """
+    executemany INSERT of plain tuples for one model, the given fields per row and
+    every other column at its default. Skips model instantiation, which dominates
+    bulk_create at millions of rows, and pre_save, which would stamp every
+    created_at with the current time.
+    """
+    def __init__(self, model, fields):
+        opts = model._meta
+        given = [opts.get_field(name) for name in fields]
+        defaults = [field for field in opts.concrete_fields if field not in given and not field.primary_key]
+        self.tail = tuple(field.get_db_prep_save(field.get_default(), connection) for field in defaults)
+        quote = connection.ops.quote_name
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(opts.db_table),
+            ', '.join(quote(field.column) for field in given + defaults),
+            ', '.join(['%s'] * (len(given) + len(defaults))),
+        )
+
+    def write(self, rows):
+        tail = self.tail
+        with connection.cursor() as cursor:
+            cursor.executemany(self.sql, [row + tail for row in rows])
+        return len(rows)
+
+
+class SyntheticDataGenerator:
+    """
+    Deterministic fake catalog and order history: the same seed, end date and
+    volumes against the same starting database produce the same rows. Ids are
+    assigned up front from the current maximum, so runs append to existing data.
+
+    Product images reference placeholder paths; no files are written.
+    """
+    def __init__(self, seed=0, end=None, days=730, batch_size=10_000, log=None):
+        self.rng = random.Random(seed)
+        self.end = end or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=days)
+        # Timestamps are written as the naive strings the backend would store, skipping
+        # adapt_datetimefield_value's per-call timezone lookups
+        self.origin = timezone.make_naive(self.start, connection.timezone) if settings.USE_TZ else self.start
+        self.span = self.end - self.start
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.counts = Counter()
+        self.password = make_password(SYNTHETIC_PASSWORD, salt='synthetic')
+        self.category_ids = []
+        self.color_ids = []
+        self.color_names = []
+        self.size_ids = []
+        # Per-user and per-product facts the orders and carts are built from,
+        # indexed by (id - first id) and packed to stay small at a million products
+        self.first_user_id = 0
+        self.user_addresses = array('q')
+        self.first_product_id = 0
+        self.product_names = array('H')  # index into PRODUCT_NAMES
+        self.product_prices = array('I')
+        self.product_sizes = array('B')  # first size index, size count
+        self.product_colors = array('b')  # palette indexes, -1 padded to MAX_PRODUCT_COLORS
+        self.product_color_counts = array('B')
+        self.product_color_ids = array('q')  # id of the product's first ProductColor
+
+    def timestamp(self, fraction):
+        """
+        The moment `fraction` of the way through the history, as a database value
+        """
+        return str(self.origin + self.span * min(fraction, 1.0))
+
+    # random.randrange and friends cost a microsecond or more per call, which adds
+    # up over tens of millions of rows; scaling random() is uniform enough here
+    def below(self, stop):
+        return int(self.rng.random() * stop)
+
+    def between(self, low, high):
+        return low + int(self.rng.random() * (high - low + 1))
+
+    def pick(self, values):
+        return values[int(self.rng.random() * len(values))]
+
+    def chunks(self, count):
+        for start in range(0, count, self.batch_size):
+            yield start, min(start + self.batch_size, count)
+
+    def record(self, label, rows, started):
+        elapsed = time.perf_counter() - started
+        self.log(f'{label:<20} {rows:>12,} rows {elapsed:8.1f}s {rows / max(elapsed, 1e-9):>12,.0f} rows/s')
+
+    def generate(self, categories=0, users=0, products=0, reviews_per_product=0, orders=0,
+                 lines_per_order=1, cart_fraction=0.0):
+        self.palettes()
+        if categories:
+            self.categories(categories)
+        if users:
+            self.users(users)
+        if products:
+            self.products(products, reviews_per_product)
+        if orders:
+            self.orders(orders, lines_per_order)
+        if cart_fraction:
+            self.carts(cart_fraction)
+        return self.counts
+
+    def palettes(self):
+        """
+        Colors and sizes are shared lookups: reuse the ones that exist, create the rest
+        """
+        colors = {color.name: color for color in Color.objects.filter(name__in=[name for name, _ in COLOR_PALETTE])}
+        Color.objects.bulk_create([
+            Color(name=name, hex_value=hex_value) for name, hex_value in COLOR_PALETTE if name not in colors
+        ])
+        colors = {color.name: color for color in Color.objects.filter(name__in=[name for name, _ in COLOR_PALETTE])}
+        self.color_names = [name for name, _ in COLOR_PALETTE]
+        self.color_ids = [colors[name].id for name in self.color_names]
+
+        sizes = {size.name: size for size in Size.objects.filter(name__in=SIZE_PALETTE)}
+        Size.objects.bulk_create([
+            Size(name=name, display_order=i) for i, name in enumerate(SIZE_PALETTE) if name not in sizes
+        ])
+        sizes = {size.name: size for size in Size.objects.filter(name__in=SIZE_PALETTE)}
+        self.size_ids = [sizes[name].id for name in SIZE_PALETTE]
+
+    def categories(self, count):
+        """
+        A three level tree: a tenth of the categories are departments, the rest
+        hang under a department or one of its children
+        """
+        started = time.perf_counter()
+        first_id = next_id(Category)
+        roots = max(1, count // 10)
+        parents = []
+        rows = []
+        for i in range(count):
+            category_id = first_id + i
+            if i < roots:
+                name, parent_id = DEPARTMENTS[i % len(DEPARTMENTS)], None
+                parents.append(category_id)
+            else:
+                name, parent_id = self.pick(GARMENTS), self.pick(parents)
+                if parent_id < first_id + roots:
+                    parents.append(category_id)
+            created = self.timestamp(0)
+            rows.append((
+                category_id, created, created, name, f'{slugify(name)}-{category_id}',
+                parent_id, i % 100,
+            ))
+        writer = RowWriter(Category, (
+            'id', 'created_at', 'updated_at', 'name', 'slug', 'parent_id', 'display_order',
+        ))
+        with transaction.atomic():
+            self.counts['categories'] += writer.write(rows)
+        self.category_ids = [row[0] for row in rows]
+        self.record('categories', len(rows), started)
+
+    def users(self, count):
+        """
+        Customers with one or two addresses each, the first being the default.
+        All of them log in with the password 'synthetic'.
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        self.first_user_id = first_id = next_id(User)
+        address_id = next_id(Address)
+        user_writer = RowWriter(User, (
+            'id', 'password', 'username', 'email', 'first_name', 'last_name', 'phone_number',
+            'is_active', 'is_email_verified', 'date_joined',
+        ))
+        address_writer = RowWriter(Address, (
+            'id', 'created_at', 'updated_at', 'user_id', 'address_type', 'is_default', 'full_name',
+            'phone_number', 'address_line1', 'city', 'state', 'postal_code',
+        ))
+        for start, stop in self.chunks(count):
+            users, user_addresses = [], []
+            for i in range(start, stop):
+                user_id = first_id + i
+                first_name = self.pick(FIRST_NAMES)
+                last_name = self.pick(LAST_NAMES)
+                phone = f'555{self.below(10_000_000):07d}'
+                joined = self.timestamp(i / count * 0.9)
+                users.append((
+                    user_id, self.password, f'synthetic{user_id}', f'synthetic{user_id}@example.com',
+                    first_name, last_name, phone, True, rng.random() < 0.8, joined,
+                ))
+                self.user_addresses.append(address_id)
+                for j in range(self.between(1, MAX_ADDRESSES)):
+                    city, state, postal_code = self.pick(CITIES)
+                    user_addresses.append((
+                        address_id, joined, joined, user_id, 'both', j == 0, f'{first_name} {last_name}',
+                        phone, f'{self.between(1, 9999)} {self.pick(LAST_NAMES)} St',
+                        city, state, postal_code,
+                    ))
+                    address_id += 1
+            with transaction.atomic():
+                self.counts['users'] += user_writer.write(users)
+                self.counts['addresses'] += address_writer.write(user_addresses)
+                index_users(User.objects.filter(id__gte=first_id + start, id__lt=first_id + stop))
+        self.record('users', count, started)
+
+    def products(self, count, reviews_per_product=0):
+        """
+        Products with consecutive sizes, distinct colors each with an image,
+        highlights, specifications and reviews by the generated users
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        category_ids = self.category_ids or list(Category.objects.values_list('id', flat=True))
+        if not category_ids:
+            raise ValueError('Products need categories; generate some first')
+        user_count = len(self.user_addresses)
+        self.first_product_id = first_id = next_id(Product)
+        product_color_id = next_id(ProductColor)
+        writers = {
+            'products': RowWriter(Product, (
+                'id', 'created_at', 'updated_at', 'name', 'slug', 'category_id', 'description',
+                'short_description', 'price', 'original_price', 'fabric', 'fit', 'wash_care', 'model_size',
+                'sku', 'in_stock', 'stock_quantity', 'is_active', 'is_featured', 'is_new', 'is_bestseller',
+            )),
+            'product sizes': RowWriter(ProductSize, ('product_id', 'size_id', 'stock_quantity', 'is_available')),
+            'product colors': RowWriter(ProductColor, ('id', 'product_id', 'color_id', 'is_default')),
+            'product images': RowWriter(ProductImage, (
+                'product_id', 'color_id', 'image', 'alt_text', 'is_primary', 'display_order',
+            )),
+            'highlights': RowWriter(ProductHighlight, ('product_id', 'text', 'display_order')),
+            'specifications': RowWriter(ProductSpecification, ('product_id', 'title', 'value', 'display_order')),
+            'reviews': RowWriter(ProductReview, (
+                'created_at', 'updated_at', 'product_id', 'user_id', 'rating', 'title', 'content',
+                'is_verified_purchase',
+            )),
+        }
+        new_cutoff = count - count // 10
+        for start, stop in self.chunks(count):
+            rows = {label: [] for label in writers}
+            for i in range(start, stop):
+                product_id = first_id + i
+                name_code = self.below(len(PRODUCT_NAMES))
+                adjective, material, garment = PRODUCT_NAME_PARTS[name_code]
+                name = PRODUCT_NAMES[name_code]
+                price = self.between(10, 199) * 100 - 1
+                created = self.timestamp((i + rng.random()) / count)
+
+                size_count = self.between(3, len(self.size_ids))
+                first_size = self.below(len(self.size_ids) - size_count + 1)
+                stock = 0
+                for size_index in range(first_size, first_size + size_count):
+                    size_stock = self.between(0, 40)
+                    stock += size_stock
+                    rows['product sizes'].append((product_id, self.size_ids[size_index], size_stock, True))
+
+                palette = rng.sample(range(len(self.color_ids)), self.between(1, MAX_PRODUCT_COLORS))
+                self.product_color_ids.append(product_color_id)
+                for j, color_index in enumerate(palette):
+                    rows['product colors'].append((product_color_id, product_id, self.color_ids[color_index], j == 0))
+                    rows['product images'].append((
+                        product_id, product_color_id, f'productimage/synthetic/{product_id}-{j}.jpg',
+                        f'{name} in {self.color_names[color_index]}', j == 0, j,
+                    ))
+                    product_color_id += 1
+
+                for j, text in enumerate(rng.sample(HIGHLIGHTS, 3)):
+                    rows['highlights'].append((product_id, text, j))
+                fit = self.pick(FITS)
+                care = self.pick(CARE)
+                for j, (title, value) in enumerate((('Fabric', f'100% {material}'), ('Fit', fit), ('Care', care))):
+                    rows['specifications'].append((product_id, title, value, j))
+
+                if user_count and reviews_per_product:
+                    reviewers = rng.sample(range(user_count), min(user_count, self.between(0, 2 * reviews_per_product)))
+                    for user_index in reviewers:
+                        reviewed = self.timestamp((i + 1 + rng.random() * (count - i)) / count)
+                        rows['reviews'].append((
+                            reviewed, reviewed, product_id, self.first_user_id + user_index,
+                            self.pick(RATINGS), self.pick(REVIEW_TITLES),
+                            '', rng.random() < 0.6,
+                        ))
+
+                rows['products'].append((
+                    product_id, created, created, name, f'{PRODUCT_SLUGS[name_code]}-{product_id}',
+                    self.pick(category_ids),
+                    f'A {adjective.lower()} {garment.lower()} in soft {material.lower()}.',
+                    f'{fit} fit {material.lower()}',
+                    money(price), money(price * 5 // 4) if rng.random() < 0.3 else None,
+                    material, fit, care, 'M', f'SYN-{product_id:09d}', stock > 0, stock,
+                    rng.random() < 0.95, rng.random() < 0.05, i >= new_cutoff, rng.random() < 0.05,
+                ))
+                self.product_names.append(name_code)
+                self.product_prices.append(price)
+                self.product_sizes.extend((first_size, size_count))
+                self.product_colors.extend(palette + [-1] * (MAX_PRODUCT_COLORS - len(palette)))
+                self.product_color_counts.append(len(palette))
+
+            with transaction.atomic():
+                for label, writer in writers.items():
+                    self.counts[label] += writer.write(rows[label])
+                refresh_low_stock(range(first_id + start, first_id + stop))
+        self.record('products', count, started)
+
+    def variant(self, product_index):
+        """
+        A random (size id, size name, product color id, color name) the product is sold in
+        """
+        size_index = self.product_sizes[2 * product_index] + self.below(self.product_sizes[2 * product_index + 1])
+        j = self.below(self.product_color_counts[product_index])
+        return (
+            self.size_ids[size_index], SIZE_PALETTE[size_index],
+            self.product_color_ids[product_index] + j,
+            self.color_names[self.product_colors[MAX_PRODUCT_COLORS * product_index + j]],
+        )
+
+    def pick_product(self):
+        """
+        Index of a product, skewed so a few sell far more than the long tail
+        """
+        return int(len(self.product_prices) * self.rng.random() ** 2)
+
+    def orders(self, count, lines_per_order=5):
+        """
+        Orders spread over the history by the generated users for the generated
+        products, with status following age and an event per status step
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        user_count, product_count = len(self.user_addresses), len(self.product_prices)
+        if not user_count or not product_count:
+            raise ValueError('Orders are generated for users and products created in the same run')
+        first_id = next_id(Order)
+        order_writer = RowWriter(Order, (
+            'id', 'created_at', 'updated_at', 'order_number', 'user_id', 'shipping_address_id',
+            'billing_address_id', 'subtotal', 'shipping_cost', 'tax', 'total', 'order_status',
+            'payment_status', 'tracking_number', 'shipping_carrier',
+        ))
+        line_writer = RowWriter(OrderItem, (
+            'created_at', 'updated_at', 'order_id', 'product_id', 'product_name', 'product_sku',
+            'color_id', 'color_name', 'size_id', 'size_name', 'price', 'quantity',
+        ))
+        event_writer = RowWriter(OrderEvent, ('created_at', 'updated_at', 'order_id', 'event_type', 'description'))
+        for start, stop in self.chunks(count):
+            orders, lines, events = [], [], []
+            for i in range(start, stop):
+                order_id = first_id + i
+                fraction = (i + rng.random()) / count
+                created = self.timestamp(fraction)
+                age = (self.end - self.start) * (1 - fraction)
+                if rng.random() < 0.05:
+                    status = 'cancelled'
+                elif age > timedelta(days=14):
+                    status = 'delivered'
+                elif age > timedelta(days=5):
+                    status = 'shipped'
+                elif age > timedelta(days=1):
+                    status = 'processing'
+                else:
+                    status = 'pending'
+
+                subtotal = 0
+                for _ in range(self.between(1, 2 * lines_per_order - 1)):
+                    product_index = self.pick_product()
+                    product_id = self.first_product_id + product_index
+                    size_id, size_name, color_id, color_name = self.variant(product_index)
+                    price = self.product_prices[product_index]
+                    quantity = self.pick(QUANTITIES)
+                    subtotal += price * quantity
+                    lines.append((
+                        created, created, order_id, product_id, PRODUCT_NAMES[self.product_names[product_index]],
+                        f'SYN-{product_id:09d}', color_id, color_name, size_id, size_name, money(price), quantity,
+                    ))
+
+                shipping = 0 if subtotal >= 10_000 else 599
+                tax = subtotal * 8 // 100
+                user_index = self.below(user_count)
+                address_id = self.user_addresses[user_index]
+                shipped = status in ('shipped', 'delivered')
+                orders.append((
+                    order_id, created, created, f'SYN-{order_id:011d}', self.first_user_id + user_index,
+                    address_id, address_id, money(subtotal), money(shipping), money(tax),
+                    money(subtotal + shipping + tax), status,
+                    'refunded' if status == 'cancelled' else 'pending' if status == 'pending' else 'paid',
+                    f'1Z{order_id:016d}' if shipped else '', 'UPS' if shipped else '',
+                ))
+                events.append((created, created, order_id, 'status_change', 'Order placed'))
+                steps = ('cancelled',) if status == 'cancelled' else ORDER_STEPS[1:ORDER_STEPS.index(status) + 1]
+                for step in steps:
+                    events.append((created, created, order_id, 'status_change', f'Status changed to {step}'))
+
+            with transaction.atomic():
+                self.counts['orders'] += order_writer.write(orders)
+                self.counts['order lines'] += line_writer.write(lines)
+                self.counts['order events'] += event_writer.write(events)
+        self.record('orders', count, started)
+
+    def carts(self, fraction):
+        """
+        Open carts for a share of the generated users, one to three items each
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        user_count, product_count = len(self.user_addresses), len(self.product_prices)
+        if not user_count or not product_count:
+            raise ValueError('Carts are generated for users and products created in the same run')
+        cart_id = next_id(Cart)
+        created = self.timestamp(1)
+        cart_writer = RowWriter(Cart, ('id', 'created_at', 'updated_at', 'user_id'))
+        item_writer = RowWriter(CartItem, (
+            'created_at', 'updated_at', 'cart_id', 'product_id', 'color_id', 'size_id', 'quantity',
+        ))
+        for start, stop in self.chunks(user_count):
+            cart_rows, items = [], []
+            for user_index in range(start, stop):
+                if rng.random() >= fraction:
+                    continue
+                cart_rows.append((cart_id, created, created, self.first_user_id + user_index))
+                for product_index in sorted({self.pick_product() for _ in range(self.between(1, 3))}):
+                    size_id, _, color_id, _ = self.variant(product_index)
+                    items.append((
+                        created, created, cart_id, self.first_product_id + product_index, color_id, size_id,
+                        self.pick(QUANTITIES),
+                    ))
+                cart_id += 1
+            with transaction.atomic():
+                self.counts['carts'] += cart_writer.write(cart_rows)
+                self.counts['cart items'] += item_writer.write(items)
+        self.record('carts', self.counts['carts'], started)
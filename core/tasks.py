@@ -0,0 +1,52 @@
+# core/tasks.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Process-wide worker pool for work that should not hold up a request
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.BACKGROUND_TASK_WORKERS,
+                    thread_name_prefix='fairfoul-worker'
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', func.__qualname__)
+    finally:
+        # Worker threads get their own connections; don't leak them
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run func on the worker pool once the current transaction commits, so the
+    task sees the rows that scheduled it. With BACKGROUND_TASKS_EAGER the task
+    runs inline instead (tests, management commands).
+    """
+    def submit():
+        if settings.BACKGROUND_TASKS_EAGER:
+            func(*args, **kwargs)
+        else:
+            get_executor().submit(_run, func, args, kwargs)
+
+    transaction.on_commit(submit)
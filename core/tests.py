@@ -1,3 +1,222 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import modify_settings
+from django.urls import reverse
+
+from products.models import Category, Product
+
+from .models import MediaBlob
+from .query_budgets import duplicated_queries, get_endpoints, measure, seed_fixture, url_kwargs
+from .query_plans import SUPPORTED_VENDORS, explain, full_scans, hot_queries
+from .storage import ContentAddressedStorage
+from .utils import SLUG_SAVE_ATTEMPTS, get_unique_slug, get_unique_slugs
+
+QUERY_BUDGETS = Path(__file__).resolve().parent / 'query_budgets.json'
+# Rows per relation in the two query budget fixtures
+SMALL_SCALE = 2
+LARGE_SCALE = 5
+# Repeated statement shapes shown per failing endpoint
+SHOWN_DUPLICATES = 5
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = ContentAddressedStorage(location=self.root)
+
+    def test_identical_content_shares_one_blob(self):
+        first = self.storage.save('uploads/a.txt', ContentFile(b'same'))
+        second = self.storage.save('uploads/b.txt', ContentFile(b'same'))
+        self.assertEqual(first, second)
+        self.assertEqual(MediaBlob.objects.get(name=first).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(first)
+        self.assertTrue(self.storage.exists(first))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(first)
+        self.assertFalse(self.storage.exists(first))
+        self.assertFalse(MediaBlob.objects.filter(name=first).exists())
+
+    def test_failed_write_takes_no_reference(self):
+        with mock.patch.object(ContentAddressedStorage, '_save', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.storage.save('uploads/a.txt', ContentFile(b'data'))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_rolled_back_save_releases_its_reference(self):
+        name = self.storage.save('uploads/a.txt', ContentFile(b'data'))
+        with transaction.atomic():
+            self.storage.save('uploads/b.txt', ContentFile(b'data'))
+            transaction.set_rollback(True)
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+    # The test files aren't images; metadata extraction is not under test
+    @mock.patch('products.signals.schedule_image_metadata')
+    def test_replaced_category_image_is_released(self, schedule_image_metadata):
+        with override_settings(
+            MEDIA_ROOT=self.root, STORAGES={'default': {'BACKEND': 'core.storage.ContentAddressedStorage'}}
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                category = Category.objects.create(name='Tops', slug='tops', image=ContentFile(b'old', 'a.jpg'))
+            old_name = category.image.name
+            with self.captureOnCommitCallbacks(execute=True):
+                category.image = ContentFile(b'new', 'b.jpg')
+                category.save()
+
+            self.assertNotEqual(category.image.name, old_name)
+            self.assertFalse(MediaBlob.objects.filter(name=old_name).exists())
+            self.assertFalse(os.path.exists(os.path.join(self.root, old_name)))
+            self.assertTrue(MediaBlob.objects.filter(name=category.image.name).exists())
+
+
+class HotQueryPlanTests(TestCase):
+    def test_hot_queries_use_an_index(self):
+        if connection.vendor not in SUPPORTED_VENDORS:
+            self.skipTest(f'No plan parser for {connection.vendor}')
+        for label, queryset in hot_queries():
+            with self.subTest(label):
+                plan = explain(queryset)
+                self.assertEqual(full_scans(plan), [], plan)
+
+
+# The debug toolbar adds its own queries to every response
+@modify_settings(MIDDLEWARE={'remove': 'debug_toolbar.middleware.DebugToolbarMiddleware'})
+class QueryBudgetTests(TestCase):
+    """
+    GET every API endpoint as a staff user at two fixture sizes. An endpoint
+    fails when its query count grows with the data by more than its
+    known_growth cap, or exceeds its budget at the large size.
+
+    Regenerate query_budgets.json after an intended change with
+    WRITE_QUERY_BUDGETS=1 manage.py test core.tests.QueryBudgetTests
+    """
+
+    def measure_scale(self, scale):
+        """
+        {url name: (status, queries)} for every endpoint against a fixture of the given scale
+        """
+        results = {}
+        with transaction.atomic():
+            fixture = seed_fixture(scale)
+            # Errors are reported as failing endpoints rather than aborting the run
+            client = Client(raise_request_exception=False)
+            client.force_login(fixture['staff'])
+            for name, route, pattern in get_endpoints():
+                kwargs = url_kwargs(route, pattern, fixture)
+                if kwargs is not None:
+                    results[name] = measure(client, reverse(name, kwargs=kwargs))
+            transaction.set_rollback(True)
+        return results
+
+    def test_query_budgets(self):
+        small, large = self.measure_scale(SMALL_SCALE), self.measure_scale(LARGE_SCALE)
+        if os.environ.get('WRITE_QUERY_BUDGETS'):
+            self.write_budgets(small, large)
+            self.skipTest(f'Wrote {QUERY_BUDGETS}')
+
+        config = json.loads(QUERY_BUDGETS.read_text())
+        budgets = config['budgets']
+        # Endpoints already known to run a query per row, with the growth they may not exceed;
+        # drop an entry once its endpoint is fixed
+        known_growth = config['known_growth']
+        for name in [*large, *(name for name in small if name not in large)]:
+            with self.subTest(name):
+                self.assertIn(name, small, 'not measured at the small size (no fixture object for its URL)')
+                self.assertIn(name, large, 'not measured at the large size (no fixture object for its URL)')
+                (small_status, small_queries), (status, queries) = small[name], large[name]
+                duplicates = '\n'.join(
+                    f'{repeats:>3}x {sql}' for repeats, sql in duplicated_queries(queries)[:SHOWN_DUPLICATES]
+                )
+                self.assertLess(max(small_status, status), 400, f'HTTP {small_status}/{status}')
+
+                growth = len(queries) - len(small_queries)
+                if name in known_growth:
+                    self.assertGreater(growth, 0, 'no longer grows with data; remove it from known_growth')
+                self.assertLessEqual(
+                    growth, known_growth.get(name, 0),
+                    f'grows with data ({len(small_queries)} -> {len(queries)})\n{duplicates}',
+                )
+                self.assertIn(name, budgets, 'no budget')
+                self.assertLessEqual(
+                    len(queries), budgets[name], f'over budget ({len(queries)} > {budgets[name]})\n{duplicates}'
+                )
+
+    def write_budgets(self, small, large):
+        measured = [name for name in large if name in small]
+        QUERY_BUDGETS.write_text(json.dumps({
+            'budgets': {name: len(large[name][1]) for name in sorted(measured)},
+            'known_growth': {
+                name: len(large[name][1]) - len(small[name][1])
+                for name in sorted(measured)
+                if len(large[name][1]) > len(small[name][1])
+            },
+        }, indent=2) + '\n')
+
+
+class UniqueSlugTests(TestCase):
+    def create_categories(self, *slugs):
+        Category.objects.bulk_create(Category(name=slug, slug=slug) for slug in slugs)
+
+    def test_free_slug_is_used_as_is(self):
+        self.create_categories('shirts-1')
+        self.assertEqual(get_unique_slug(Category(name='Shirts'), 'slug', 'name'), 'shirts')
+
+    def test_collision_picks_first_free_suffix(self):
+        self.create_categories('shirts', 'shirts-1', 'shirts-3', 'shirts-long')
+        self.assertEqual(get_unique_slug(Category(name='Shirts'), 'slug', 'name'), 'shirts-2')
+
+    def test_instance_keeps_its_own_slug(self):
+        self.create_categories('shirts')
+        category = Category.objects.get(slug='shirts')
+        self.assertEqual(get_unique_slug(category, 'slug', 'name'), 'shirts')
+
+    def test_long_name_leaves_room_for_suffix(self):
+        max_length = Category._meta.get_field('slug').max_length
+        name = 'x' * (max_length + 10)
+        self.create_categories('x' * max_length)
+        slug = get_unique_slug(Category(name=name), 'slug', 'name')
+        self.assertLessEqual(len(slug), max_length)
+        self.assertTrue(slug.endswith('-1'))
+
+    def test_batch_is_unique_among_itself_and_existing_rows(self):
+        self.create_categories('shirts', 'shirts-2', 'hats')
+        with self.assertNumQueries(2):
+            slugs = get_unique_slugs(Category, ['Shirts', 'Shirts', 'Shoes', 'shoes', 'Hats', ''])
+        self.assertEqual(slugs, ['shirts-1', 'shirts-3', 'shoes', 'shoes-1', 'hats-1', 'category'])
+
+    def test_batch_without_collisions_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unique_slugs(Category, ['Shirts', 'Hats']), ['shirts', 'hats'])
+
+    def test_save_retries_when_slug_is_taken_concurrently(self):
+        self.create_categories('shirts')
+        # The first allocation misses the existing row, as if it was inserted right after the lookup
+        with mock.patch('core.utils.get_unique_slug', side_effect=['shirts', 'shirts-1']) as allocate:
+            category = Category.objects.create(name='Shirts')
+        self.assertEqual(allocate.call_count, 2)
+        self.assertEqual(category.slug, 'shirts-1')
+        self.assertEqual(Category.objects.filter(slug__startswith='shirts').count(), 2)
+
+    def test_save_gives_up_after_max_attempts(self):
+        self.create_categories('shirts')
+        with mock.patch('core.utils.get_unique_slug', return_value='shirts') as allocate:
+            with self.assertRaises(IntegrityError):
+                Category.objects.create(name='Shirts')
+        self.assertEqual(allocate.call_count, SLUG_SAVE_ATTEMPTS)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        Product.objects.create(category=Category.objects.create(name='Tops'), name='A', price=1, sku='A-1')
+        with mock.patch('core.utils.get_unique_slug', wraps=get_unique_slug) as allocate:
+            with self.assertRaises(IntegrityError):
+                Product.objects.create(category=Category.objects.get(), name='B', price=1, sku='A-1')
+        self.assertEqual(allocate.call_count, 1)
@@ -1,30 +1,146 @@
 # core/utils.py
+import hashlib
 import uuid
 import os
+import re
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 
+_HEX = re.compile(r'^[0-9a-f]{4}')
+_SHARD_DIRS = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}$')
+
+# Room kept for a '-<n>' suffix when a slug is at its field's max_length
+SLUG_SUFFIX_RESERVE = 6
+# startswith lookups OR-ed into one query when allocating slugs in bulk
+SLUG_STEMS_PER_QUERY = 100
+SLUG_SAVE_ATTEMPTS = 5
+
+
+def _slug_base(model, value, max_length):
+    return (slugify(value) or model._meta.model_name)[:max_length].rstrip('-')
+
+
+def _slug_stem(base, max_length):
+    return base[:max_length - SLUG_SUFFIX_RESERVE].rstrip('-')
+
+
+def _first_free_slug(base, max_length, taken):
+    if base not in taken:
+        return base
+    stem = _slug_stem(base, max_length)
+    counter = 1
+    while f"{stem}-{counter}" in taken:
+        counter += 1
+    return f"{stem}-{counter}"
+
+
+def _taken_slugs(queryset, slug_field_name, stems):
+    """
+    Every slug in queryset starting with one of stems, in a single query
+    """
+    condition = Q()
+    for stem in stems:
+        condition |= Q(**{f'{slug_field_name}__startswith': stem})
+    return set(queryset.filter(condition).values_list(slug_field_name, flat=True))
+
+
 def get_unique_slug(model_instance, slug_field_name, sluggable_field_name):
     """
-    Generate a unique slug for a model instance
+    Generate a unique slug for a model instance: 'name', else 'name-1', 'name-2', ...
+    Every slug the candidates could collide with is fetched in one prefix query
+    and the first free suffix is picked in memory.
     """
-    slug = slugify(getattr(model_instance, sluggable_field_name))
-    unique_slug = slug
-    instance_class = model_instance.__class__
-    
-    # Check if the slug already exists
-    counter = 1
-    while instance_class._default_manager.filter(**{slug_field_name: unique_slug}).exists():
-        unique_slug = f"{slug}-{counter}"
-        counter += 1
-        
-    return unique_slug
+    model = model_instance.__class__
+    max_length = model._meta.get_field(slug_field_name).max_length
+    base = _slug_base(model, getattr(model_instance, sluggable_field_name), max_length)
+    queryset = model._default_manager.all()
+    if model_instance.pk is not None:
+        queryset = queryset.exclude(pk=model_instance.pk)
+    taken = _taken_slugs(queryset, slug_field_name, [_slug_stem(base, max_length)])
+    return _first_free_slug(base, max_length, taken)
+
+
+def get_unique_slugs(model, values, slug_field_name='slug'):
+    """
+    Unique slugs for a batch of new rows, also unique among themselves.
+    One query checks the plain slugs; only the ones that collide need
+    prefix queries, batched SLUG_STEMS_PER_QUERY at a time.
+    """
+    max_length = model._meta.get_field(slug_field_name).max_length
+    bases = [_slug_base(model, value, max_length) for value in values]
+    manager = model._default_manager
+    taken = set(manager.filter(**{f'{slug_field_name}__in': set(bases)}).values_list(slug_field_name, flat=True))
+
+    seen, collided = set(), set()
+    for base in bases:
+        if base in taken or base in seen:
+            collided.add(_slug_stem(base, max_length))
+        seen.add(base)
+    collided = sorted(collided)
+    for start in range(0, len(collided), SLUG_STEMS_PER_QUERY):
+        taken |= _taken_slugs(manager.all(), slug_field_name, collided[start:start + SLUG_STEMS_PER_QUERY])
+
+    slugs = []
+    for base in bases:
+        slug = _first_free_slug(base, max_length, taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(model_instance, save, sluggable_field_name='name', slug_field_name='slug'):
+    """
+    Call save() after giving the instance a unique slug. If a concurrent insert
+    takes the slug first, the unique constraint fails inside a savepoint and a
+    fresh slug is allocated and saved again.
+    """
+    manager = model_instance.__class__._default_manager
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        slug = get_unique_slug(model_instance, slug_field_name, sluggable_field_name)
+        setattr(model_instance, slug_field_name, slug)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            taken = manager.filter(**{slug_field_name: slug})
+            if model_instance.pk is not None:
+                taken = taken.exclude(pk=model_instance.pk)
+            # Not a slug clash (or out of attempts): let the caller see it
+            if attempt == SLUG_SAVE_ATTEMPTS - 1 or not taken.exists():
+                raise
+
+
+def shard_path(directory, filename):
+    """
+    Spread files over two levels of subdirectories keyed on the name's hash prefix:
+    productimage/3f/a2/3fa2....jpg. Random (uuid, sha256) names are used directly,
+    anything else is hashed first.
+    """
+    key = filename.lower()
+    if not _HEX.match(key):
+        key = hashlib.md5(filename.encode()).hexdigest()
+    return os.path.join(directory, key[:2], key[2:4], filename)
+
+
+def unshard_directory(directory):
+    """
+    The base directory of a sharded path's directory: productimage/3f/a2 -> productimage
+    """
+    return _SHARD_DIRS.sub('', directory)
+
+
+def is_sharded(name):
+    directory = os.path.dirname(name)
+    return unshard_directory(directory) != directory
+
 
 def get_file_path(instance, filename):
     """
-    Generate a unique filename for uploaded files
+    Generate a unique, sharded filename for uploaded files
     """
     ext = filename.split('.')[-1]
     filename = f"{uuid.uuid4()}.{ext}"
     model_name = instance.__class__.__name__.lower()
     
-    return os.path.join(model_name, filename)
\ No newline at end of file
+    return shard_path(model_name, filename)
\ No newline at end of file
@@ -1,3 +1,150 @@
-from django.shortcuts import render
+# core/views.py
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
 
-# Create your views here.
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_addressed
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def _media_path(path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    try:
+        file_stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('File not found')
+    return full_path, file_stat
+
+
+def _etag(file_stat):
+    return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def _byte_range(request, size, etag, mtime):
+    """
+    The (start, end) of a single satisfiable Range request, None to send the whole
+    file, or False if the range can't be satisfied
+    """
+    header = request.META.get('HTTP_RANGE', '').strip()
+    match = RANGE_HEADER.match(header)
+    if not match or match.group(1) == match.group(2) == '':
+        # Missing, malformed or multi-part ranges get the full file
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != int(mtime):
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(full_path, start, end):
+    with open(full_path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(path, full_path):
+    """
+    Hand the transfer to the front server, which then takes care of ranges and conditional requests
+    """
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE_BACKEND == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_SENDFILE_PREFIX + quote(path)
+    else:
+        response['X-Sendfile'] = full_path
+    # Let the front server fill in the type from the file it sends
+    del response['Content-Type']
+    return response
+
+
+def _stream_response(request, full_path, file_stat, etag):
+    size = file_stat.st_size
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    byte_range = _byte_range(request, size, etag, file_stat.st_mtime)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = size
+    elif byte_range is None:
+        # FileResponse uses the server's wsgi.file_wrapper (sendfile) when there is one
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response.block_size = CHUNK_SIZE
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, end), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT.
+
+    With MEDIA_SENDFILE_BACKEND set the transfer is offloaded to nginx
+    (X-Accel-Redirect) or Apache/lighttpd (X-Sendfile). Otherwise the file is
+    streamed in chunks, with ETag/If-Modified-Since revalidation and single
+    byte ranges. Content-addressed names never change, so they are cacheable
+    forever; other files are revalidated after MEDIA_MAX_AGE.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    full_path, file_stat = _media_path(path)
+    etag = _etag(file_stat)
+    mtime = file_stat.st_mtime
+
+    if settings.MEDIA_SENDFILE_BACKEND:
+        response = _sendfile_response(path, full_path)
+    else:
+        response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+        if response is None:
+            response = _stream_response(request, full_path, file_stat, etag)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        response['Accept-Ranges'] = 'bytes'
+
+    if is_content_addressed(path):
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE)
+    return response
@@ -67,6 +67,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'admin_console.middleware.AdminActivityMiddleware',  # Actor for admin activity logging
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -105,6 +106,9 @@ DATABASES = {
 }
 
 # For production, use PostgreSQL
+# MySQL has no partial indexes: the hot-query indexes in products 0007 lose
+# their condition there, so products 0008 adds plain composite ones instead;
+# check the plans with `manage.py explain_hot_queries` after switching.
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.mysql',
@@ -146,6 +150,58 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Base URL media links are built from instead of the request host, e.g. https://cdn.fairfoul.com/media/
+MEDIA_CDN_URL = os.environ.get('MEDIA_CDN_URL', '')
+# Name uploads by content hash so identical files are stored once (core.storage)
+MEDIA_CONTENT_ADDRESSED = os.environ.get('MEDIA_CONTENT_ADDRESSED', 'False') == 'True'
+# Cache lifetime for content-addressed media, whose URLs never change
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# Cache lifetime for other media, revalidated with ETag/Last-Modified afterwards
+MEDIA_MAX_AGE = 60 * 60
+# Offload media transfers to the front server: 'x-accel-redirect' (nginx) or 'x-sendfile'
+# (Apache mod_xsendfile, lighttpd). For nginx, MEDIA_SENDFILE_PREFIX must be an internal
+# location aliased to MEDIA_ROOT.
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND') or None
+MEDIA_SENDFILE_PREFIX = '/protected-media/'
+# Where collect_media_garbage moves orphaned files unless told to delete them
+MEDIA_QUARANTINE_DIR = BASE_DIR / 'quarantine' / 'media'
+
+STORAGES = {
+    'default': {
+        'BACKEND': (
+            'core.storage.ContentAddressedStorage' if MEDIA_CONTENT_ADDRESSED
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Background worker pool for deferred work such as image processing
+BACKGROUND_TASK_WORKERS = int(os.environ.get('BACKGROUND_TASK_WORKERS', 2))
+BACKGROUND_TASKS_EAGER = False
+
+# Responsive image derivatives generated for product images
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+IMAGE_DERIVATIVE_FORMATS = ('webp', 'jpeg')
+IMAGE_DERIVATIVE_QUALITY = 80
+# Threads used to validate and store files in a single bulk image upload
+IMAGE_UPLOAD_WORKERS = int(os.environ.get('IMAGE_UPLOAD_WORKERS', 8))
+# Profile pictures are normalized to a bounded WebP with square avatar crops (users.images)
+PROFILE_PICTURE_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+PROFILE_PICTURE_MAX_DIMENSION = 1024
+PROFILE_PICTURE_AVATAR_SIZES = (48, 96, 256)
+PROFILE_PICTURE_KEEP_ORIGINAL = False
+# Chunked, resumable uploads: partial files live outside MEDIA_ROOT until finalized
+IMAGE_UPLOAD_TEMP_DIR = BASE_DIR / 'tmp' / 'uploads'
+IMAGE_UPLOAD_CHUNK_SIZE = 1024 * 1024
+IMAGE_UPLOAD_MAX_BYTES = 100 * 1024 * 1024
+IMAGE_UPLOAD_SESSION_TTL_HOURS = 24
+
+# Admin activity retention: older monthly partitions are archived to compressed JSONL
+ADMIN_ACTIVITY_RETENTION_MONTHS = int(os.environ.get('ADMIN_ACTIVITY_RETENTION_MONTHS', 12))
+ADMIN_ACTIVITY_ARCHIVE_DIR = BASE_DIR / 'archive' / 'admin_activity'
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
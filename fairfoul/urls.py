@@ -1,11 +1,14 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from core.views import serve_media
+
 # API documentation setup
 schema_view = get_schema_view(
     openapi.Info(
@@ -38,10 +41,12 @@ urlpatterns = [
     path('api/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]
 
-# Serve media files in development
+# Media files, offloaded to the front server when MEDIA_SENDFILE_BACKEND is set
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
+
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    
     # Debug toolbar
     urlpatterns += [
         path('__debug__/', include('debug_toolbar.urls')),
@@ -92,6 +92,11 @@ class Order(TimestampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A customer's order history, and the admin list filtered by status
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+            models.Index(fields=['order_status', '-created_at'], name='order_status_created_idx'),
+        ]
     
     def __str__(self):
         return self.order_number
@@ -0,0 +1,56 @@
+# products/bulk_updates.py
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .models import Product
+
+# Fields the bulk endpoint may set directly
+BULK_FIELDS = ('price', 'original_price', 'is_active', 'is_featured', 'is_new', 'is_bestseller')
+FILTER_FLAGS = ('is_active', 'is_featured', 'is_new', 'is_bestseller')
+
+
+def bulk_target(ids=None, filters=None):
+    """
+    Products selected by an id list or by category slug and flag filters
+    """
+    queryset = Product.objects.all()
+    if ids is not None:
+        return queryset.filter(id__in=ids)
+    filters = filters or {}
+    if filters.get('category'):
+        queryset = queryset.filter(category__slug=filters['category'])
+    for flag in FILTER_FLAGS:
+        if flag in filters:
+            queryset = queryset.filter(**{flag: filters[flag]})
+    return queryset
+
+
+def adjusted_price(percent):
+    """
+    price scaled by percent (-20 for 20% off) and rounded to cents, as a database expression
+    """
+    price_field = Product._meta.get_field('price')
+    factor = Decimal(1) + Decimal(percent) / 100
+    return Round(
+        F('price') * Value(factor, output_field=price_field), 2,
+        output_field=DecimalField(max_digits=price_field.max_digits, decimal_places=price_field.decimal_places)
+    )
+
+
+def bulk_update_products(queryset, changes=None, price_adjustment_percent=None):
+    """
+    Apply field changes and/or a percentage price adjustment to every product
+    in queryset with a single UPDATE; returns the number of products updated.
+
+    Per-product save() and signals are bypassed, so callers log the change once.
+    Stock is never touched, so the low stock index stays valid.
+    """
+    values = dict(changes or {})
+    if price_adjustment_percent is not None:
+        values['price'] = adjusted_price(price_adjustment_percent)
+    # update() skips auto_now; bump it so clients revalidate the changed products
+    values['updated_at'] = timezone.now()
+    return queryset.update(**values)
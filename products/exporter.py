@@ -0,0 +1,134 @@
+# products/exporter.py
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from core.media_urls import MediaURLBuilder
+
+from .importer import LIST_SEPARATOR, PRODUCT_FIELDS, SPEC_SEPARATOR, STOCK_SEPARATOR
+from .models import Product, ProductColor, ProductImage, ProductSize
+
+# Import columns first, so an exported CSV can be imported again as is
+CSV_COLUMNS = (
+    'sku', *PRODUCT_FIELDS, 'category', 'sizes', 'colors', 'highlights', 'specifications',
+    'id', 'slug', 'images', 'created_at', 'updated_at',
+)
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def export_queryset(queryset=None):
+    """
+    Products with everything an export row needs, loaded in one query per relation
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    return queryset.select_related('category').prefetch_related(
+        Prefetch('productsize_set', queryset=ProductSize.objects.select_related('size').order_by('size__display_order', 'id')),
+        Prefetch('colors', queryset=ProductColor.objects.select_related('color').order_by('-is_default', 'id')),
+        Prefetch('images', queryset=ProductImage.objects.select_related('color__color').order_by('display_order', 'id')),
+        'highlights',
+        'specifications',
+    )
+
+
+def iter_products(queryset=None, chunk_size=500):
+    """
+    Yield products in id order, one keyset page at a time, so memory stays
+    bounded by chunk_size whatever the catalog size
+    """
+    queryset = export_queryset(queryset).order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        yield from chunk
+        last_id = chunk[-1].id
+
+
+def product_record(product, url_builder):
+    """
+    A product with its variants as plain data, in the shapes the importer accepts
+    """
+    record = {'sku': product.sku or ''}
+    for name in PRODUCT_FIELDS:
+        record[name] = getattr(product, name)
+    record.update({
+        'category': product.category.slug if product.category else None,
+        'sizes': [
+            {'size': product_size.size.name, 'stock': product_size.stock_quantity}
+            for product_size in product.productsize_set.all()
+        ],
+        'colors': [product_color.color.name for product_color in product.colors.all()],
+        'highlights': [highlight.text for highlight in product.highlights.all()],
+        'specifications': [
+            {'title': spec.title, 'value': spec.value} for spec in product.specifications.all()
+        ],
+        'id': product.id,
+        'slug': product.slug,
+        'images': [
+            {
+                'url': url_builder.url(image.image),
+                'alt_text': image.alt_text,
+                'is_primary': image.is_primary,
+                'color': image.color.color.name if image.color else None,
+            }
+            for image in product.images.all()
+        ],
+        'created_at': product.created_at,
+        'updated_at': product.updated_at,
+    })
+    return record
+
+
+def csv_row(record):
+    """
+    Flatten a record into CSV cells; lists use the importer's separators
+    """
+    row = dict(record)
+    row['sizes'] = LIST_SEPARATOR.join(
+        f"{size['size']}{STOCK_SEPARATOR}{size['stock']}" for size in record['sizes']
+    )
+    row['colors'] = LIST_SEPARATOR.join(record['colors'])
+    row['highlights'] = LIST_SEPARATOR.join(record['highlights'])
+    row['specifications'] = LIST_SEPARATOR.join(
+        f"{spec['title']}{SPEC_SEPARATOR}{spec['value']}" for spec in record['specifications']
+    )
+    row['images'] = LIST_SEPARATOR.join(image['url'] for image in record['images'])
+    for name in ('created_at', 'updated_at'):
+        row[name] = record[name].isoformat()
+    return [row[column] for column in CSV_COLUMNS]
+
+
+class _Echo:
+    """
+    File-like object whose write() returns the line, so csv.writer can feed a generator
+    """
+    def write(self, value):
+        return value
+
+
+def export_products(queryset=None, file_format='csv', chunk_size=500, request=None):
+    """
+    Yield the catalog as CSV or JSON Lines text, one product per line.
+
+    Values containing the '|' list separator can't be told apart in CSV
+    cells; use JSON Lines for a lossless export.
+    """
+    url_builder = MediaURLBuilder(request)
+    products = iter_products(queryset, chunk_size=chunk_size)
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(CSV_COLUMNS)
+        for product in products:
+            yield writer.writerow(csv_row(product_record(product, url_builder)))
+    elif file_format == 'jsonl':
+        for product in products:
+            yield json.dumps(product_record(product, url_builder), cls=DjangoJSONEncoder) + '\n'
+    else:
+        raise ValueError(f'Unsupported format: {file_format}')
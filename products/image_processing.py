@@ -0,0 +1,50 @@
+# products/image_processing.py
+from core.images import (
+    current_metadata, delete_derivatives, extract_metadata, generate_derivatives, open_image,
+    release_replaced_derivatives
+)
+from core.tasks import run_in_background
+
+from .models import ProductImage
+
+
+def needs_processing(product_image):
+    return bool(product_image.image) and (
+        product_image.derivatives.get('source') != product_image.image.name
+        or current_metadata(product_image.image, product_image.image_meta) is None
+    )
+
+
+def build_product_image_derivatives(image_id, force=False):
+    """
+    Generate the responsive derivatives and metadata for one ProductImage,
+    decoding the original once for both
+    """
+    product_image = ProductImage.objects.filter(pk=image_id).first()
+    if product_image is None or not product_image.image:
+        return None
+    if not force and not needs_processing(product_image):
+        return product_image.derivatives
+
+    source_name = product_image.image.name
+    old_derivatives = product_image.derivatives
+    image = open_image(product_image.image)
+    derivatives = generate_derivatives(product_image.image, image=image)
+    image_meta = extract_metadata(product_image.image, image=image)
+    # Only record them if the image wasn't replaced while we were working
+    updated = ProductImage.objects.filter(pk=image_id, image=source_name).update(
+        derivatives=derivatives, image_meta=image_meta
+    )
+    if not updated:
+        delete_derivatives(product_image.image.storage, derivatives)
+        return None
+    release_replaced_derivatives(product_image.image.storage, old_derivatives, derivatives)
+    return derivatives
+
+
+def schedule_derivatives(image_ids):
+    """
+    Queue derivative generation for images on the background worker pool
+    """
+    for image_id in image_ids:
+        run_in_background(build_product_image_derivatives, image_id)
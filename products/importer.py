@@ -0,0 +1,434 @@
+# products/importer.py
+import csv
+import io
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from core.utils import SLUG_SAVE_ATTEMPTS, get_unique_slugs
+
+from .inventory import refresh_low_stock
+from .models import Category, Color, Product, ProductHighlight, ProductSpecification, Size
+from .variants import sync_colors, sync_highlights, sync_sizes, sync_specifications
+
+# Product columns an import row may set; 'sku' is the upsert key and 'category'
+# is resolved by slug or name
+PRODUCT_FIELDS = (
+    'name', 'description', 'short_description', 'price', 'original_price',
+    'fabric', 'fit', 'wash_care', 'model_size', 'in_stock', 'stock_quantity',
+    'low_stock_threshold', 'is_active', 'is_featured', 'is_new', 'is_bestseller',
+)
+COLLECTION_FIELDS = ('sizes', 'colors', 'highlights', 'specifications')
+REQUIRED_FOR_CREATE = ('name', 'description', 'price')
+# Separators for list values in CSV cells: 'S:10|M:5', 'Red|Blue', 'Fabric=Cotton|Fit=Slim'
+LIST_SEPARATOR = '|'
+STOCK_SEPARATOR = ':'
+SPEC_SEPARATOR = '='
+MAX_REPORTED_ERRORS = 1000
+# Spellings accepted for flag columns, as exported by spreadsheets and other shops
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+class ImportAborted(ImportFormatError):
+    """
+    The stream broke off partway; the batches before it are already written
+    """
+    def __init__(self, message, summary):
+        super().__init__(message)
+        self.summary = summary
+
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, file_format):
+    """
+    Yield (line number, row dict or parse error) from a text stream, one row at a time
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        if not reader.fieldnames or 'sku' not in reader.fieldnames:
+            raise ImportFormatError("CSV header must include a 'sku' column")
+        for row in reader:
+            # Short rows fill missing cells with None; treat those columns as absent
+            yield reader.line_num, {
+                key: value for key, value in row.items() if key is not None and value is not None
+            }
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, ValidationError(f'Invalid JSON: {exc}')
+                continue
+            if not isinstance(row, dict):
+                row = ValidationError('Each line must be a JSON object')
+            yield line_number, row
+    else:
+        raise ImportFormatError(f'Unsupported format: {file_format}')
+
+
+def open_upload(uploaded_file):
+    """
+    Text stream over an uploaded file; a UTF-8 BOM (as written by Excel) is skipped
+    """
+    return io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+
+
+class Lookups:
+    """
+    Categories, colors and sizes by lowercased name (and category slug),
+    loaded once per import so rows resolve without queries
+    """
+    def __init__(self):
+        self.categories = {}
+        for category_id, name, slug in Category.objects.values_list('id', 'name', 'slug'):
+            self.categories.setdefault(name.lower(), category_id)
+            self.categories[slug.lower()] = category_id
+        self.colors = {name.lower(): color_id for color_id, name in Color.objects.values_list('id', 'name')}
+        self.sizes = {name.lower(): size_id for size_id, name in Size.objects.values_list('id', 'name')}
+
+
+def _split(value):
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(LIST_SEPARATOR) if part.strip()]
+    if isinstance(value, list):
+        return value
+    raise ValidationError('Expected a list')
+
+
+def _parse_stock(value):
+    try:
+        stock = int(value)
+    except (TypeError, ValueError):
+        stock = -1
+    if stock < 0:
+        raise ValidationError(f'Invalid stock quantity: {value}')
+    return stock
+
+
+def parse_sizes(value, lookups):
+    """
+    [(size_id, stock or None)] from 'S:10|M' or [{'size': 'S', 'stock': 10}, 'M']
+    """
+    if isinstance(value, dict):
+        items = list(value.items())
+    else:
+        items = []
+        for item in _split(value):
+            if isinstance(item, dict):
+                items.append((item.get('size'), item.get('stock')))
+            else:
+                name, _, stock = str(item).partition(STOCK_SEPARATOR)
+                items.append((name, stock.strip() or None))
+    sizes = {}
+    for name, stock in items:
+        size_id = lookups.sizes.get(str(name).strip().lower())
+        if size_id is None:
+            raise ValidationError(f'Unknown size: {name}')
+        sizes[size_id] = None if stock is None else _parse_stock(stock)
+    return list(sizes.items())
+
+
+def parse_colors(value, lookups):
+    """
+    Color ids in order from 'Red|Blue'; the first is the default
+    """
+    color_ids = []
+    for name in _split(value):
+        color_id = lookups.colors.get(str(name).strip().lower())
+        if color_id is None:
+            raise ValidationError(f'Unknown color: {name}')
+        if color_id not in color_ids:
+            color_ids.append(color_id)
+    return color_ids
+
+
+def parse_highlights(value):
+    field = ProductHighlight._meta.get_field('text')
+    return [field.clean(str(text).strip(), None) for text in _split(value)]
+
+
+def parse_specifications(value):
+    """
+    [(title, value)] from 'Fabric=Cotton|Fit=Slim', a {title: value} object
+    or a list of {'title', 'value'} objects
+    """
+    if isinstance(value, dict):
+        items = list(value.items())
+    else:
+        items = []
+        for item in _split(value):
+            if isinstance(item, dict):
+                items.append((item.get('title'), item.get('value')))
+            else:
+                title, separator, spec_value = str(item).partition(SPEC_SEPARATOR)
+                if not separator:
+                    raise ValidationError(f"Specification must be 'Title{SPEC_SEPARATOR}Value': {item}")
+                items.append((title, spec_value))
+    title_field = ProductSpecification._meta.get_field('title')
+    value_field = ProductSpecification._meta.get_field('value')
+    return [
+        (title_field.clean(str(title or '').strip(), None), value_field.clean(str(spec_value or '').strip(), None))
+        for title, spec_value in items
+    ]
+
+
+def clean_row(row, lookups):
+    """
+    Validate one row against the model fields.
+
+    Returns (sku, values, collections); raises ValidationError with a
+    {column: [messages]} dict. Columns missing from the row are left untouched
+    on update; an empty cell clears nullable fields and collections.
+    """
+    errors = {}
+    sku = str(row.get('sku') or '').strip()
+    if not sku:
+        errors['sku'] = ['This field is required.']
+    else:
+        try:
+            Product._meta.get_field('sku').clean(sku, None)
+        except ValidationError as exc:
+            errors['sku'] = exc.messages
+
+    values = {}
+    for name in PRODUCT_FIELDS:
+        if name not in row:
+            continue
+        field = Product._meta.get_field(name)
+        raw = row[name]
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw in ('', None):
+            if field.null:
+                raw = None
+            elif field.get_internal_type() not in ('CharField', 'TextField'):
+                # Blank numbers and flags keep their current value (or default)
+                continue
+            else:
+                raw = ''
+        if field.get_internal_type() == 'BooleanField' and isinstance(raw, str):
+            if raw.lower() in TRUE_VALUES:
+                values[name] = True
+            elif raw.lower() in FALSE_VALUES:
+                values[name] = False
+            else:
+                errors[name] = [f"'{raw}' is not a flag; use one of {', '.join(TRUE_VALUES + FALSE_VALUES)}"]
+            continue
+        try:
+            values[name] = field.clean(raw, None)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+
+    if 'category' in row:
+        category = str(row['category'] or '').strip()
+        if not category:
+            values['category_id'] = None
+        elif category.lower() in lookups.categories:
+            values['category_id'] = lookups.categories[category.lower()]
+        else:
+            errors['category'] = [f'Unknown category: {category}']
+
+    collections = {}
+    parsers = {
+        'sizes': lambda value: parse_sizes(value, lookups),
+        'colors': lambda value: parse_colors(value, lookups),
+        'highlights': parse_highlights,
+        'specifications': parse_specifications,
+    }
+    for name, parse in parsers.items():
+        if name not in row:
+            continue
+        value = row[name]
+        if value in ('', None):
+            collections[name] = []
+            continue
+        try:
+            collections[name] = parse(value)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+
+    if errors:
+        raise ValidationError(errors)
+    return sku, values, collections
+
+
+def _create_products(products, batch_size):
+    """
+    bulk_create new products with slugs allocated for the whole batch. A
+    concurrent insert can still take one of the slugs first; the insert then
+    fails inside a savepoint and is retried with fresh slugs.
+    """
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        for product, slug in zip(products, get_unique_slugs(Product, [product.name for product in products])):
+            product.slug = slug
+        try:
+            with transaction.atomic():
+                return Product.objects.bulk_create(products, batch_size=batch_size)
+        except IntegrityError:
+            slugs = [product.slug for product in products]
+            if attempt == SLUG_SAVE_ATTEMPTS - 1 or not Product.objects.filter(slug__in=slugs).exists():
+                raise
+
+
+class ProductImporter:
+    """
+    Upsert products by SKU from CSV or JSON Lines.
+
+    Rows are validated and written in batches: each batch is one transaction
+    with a bulk_create for new products, a bulk_update for existing ones and
+    a bulk diff of their sizes, colors, highlights and specifications.
+    Invalid rows are skipped and reported with their line number; the rest of
+    the batch is still imported.
+    """
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.lookups = Lookups()
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.last_line = 0
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+    def add_error(self, line, sku, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'sku': sku, 'errors': errors})
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = []
+            try:
+                batch.extend(islice(rows, self.batch_size))
+            except UnicodeDecodeError as exc:
+                # Keep the rows read before the bad bytes, and report how far the import got
+                self.import_batch(batch)
+                last_line = batch[-1][0] if batch else self.last_line
+                where = f' after line {last_line}' if last_line else ''
+                raise ImportAborted(f'File is not valid UTF-8{where}: {exc}', self.summary())
+            if not batch:
+                break
+            self.import_batch(batch)
+            self.last_line = batch[-1][0]
+        return self.summary()
+
+    def _clean_batch(self, batch):
+        cleaned = {}
+        for line, row in batch:
+            if isinstance(row, ValidationError):
+                self.add_error(line, None, {'row': row.messages})
+                continue
+            try:
+                sku, values, collections = clean_row(row, self.lookups)
+            except ValidationError as exc:
+                self.add_error(line, str(row.get('sku') or '') or None, exc.message_dict)
+                continue
+            if sku in cleaned:
+                self.add_error(line, sku, {'sku': [f'Duplicate of line {cleaned[sku][0]}']})
+                continue
+            cleaned[sku] = (line, values, collections)
+        return cleaned
+
+    @transaction.atomic
+    def import_batch(self, batch):
+        cleaned = self._clean_batch(batch)
+        if not cleaned:
+            return
+        existing = {product.sku: product for product in Product.objects.filter(sku__in=list(cleaned))}
+
+        new_products, updated_products, update_fields = [], [], set()
+        now = timezone.now()
+        for sku, (line, values, collections) in cleaned.items():
+            product = existing.get(sku)
+            if product is None:
+                missing = {
+                    name: ['This field is required.']
+                    for name in REQUIRED_FOR_CREATE if name not in values
+                }
+                if missing:
+                    self.add_error(line, sku, missing)
+                    continue
+                new_products.append(Product(sku=sku, **values))
+            else:
+                for name, value in values.items():
+                    setattr(product, name, value)
+                # bulk_update skips auto_now
+                product.updated_at = now
+                update_fields.update('category' if name == 'category_id' else name for name in values)
+                updated_products.append(product)
+
+        if new_products:
+            _create_products(new_products, self.batch_size)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                ids = dict(
+                    Product.objects.filter(sku__in=[product.sku for product in new_products])
+                    .values_list('sku', 'id')
+                )
+                for product in new_products:
+                    product.pk = ids[product.sku]
+        if updated_products:
+            Product.objects.bulk_update(
+                updated_products, sorted(update_fields | {'updated_at'}), batch_size=self.batch_size
+            )
+        self._write_collections(cleaned, new_products + updated_products)
+
+        refresh_low_stock([product.pk for product in new_products + updated_products])
+        self.created += len(new_products)
+        self.updated += len(updated_products)
+
+    def _write_collections(self, cleaned, products):
+        by_name = {name: [] for name in COLLECTION_FIELDS}
+        for product in products:
+            collections = cleaned[product.sku][2]
+            for name, items in collections.items():
+                by_name[name].append((product, items))
+
+        sync_sizes(by_name['sizes'])
+        sync_colors(by_name['colors'])
+        sync_highlights(
+            (product, [{'text': text, 'display_order': i} for i, text in enumerate(texts)])
+            for product, texts in by_name['highlights']
+        )
+        sync_specifications(
+            (product, [
+                {'title': title, 'value': value, 'display_order': i}
+                for i, (title, value) in enumerate(specs)
+            ])
+            for product, specs in by_name['specifications']
+        )
+
+
+def import_products(stream, file_format='csv', batch_size=1000, dry_run=False):
+    """
+    Import products from a text stream; returns {'created', 'updated', 'failed', 'errors'}.
+    A dry run validates and writes everything, then rolls it all back.
+    """
+    importer = ProductImporter(batch_size=batch_size)
+    rows = read_rows(stream, file_format)
+    if not dry_run:
+        return importer.run(rows)
+    with transaction.atomic():
+        summary = importer.run(rows)
+        transaction.set_rollback(True)
+    return summary
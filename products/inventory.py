@@ -0,0 +1,98 @@
+# products/inventory.py
+from django.db import transaction
+from django.db.models import Min
+
+from .models import LowStockVariant, Product, ProductSize
+
+
+def is_low_stock(stock_quantity, threshold):
+    """
+    The single low stock rule used by the index, the admin list and the dashboard
+    """
+    return stock_quantity <= threshold
+
+
+def _low_stock_rows(product_ids):
+    products = Product.objects.filter(id__in=product_ids).values_list(
+        'id', 'stock_quantity', 'low_stock_threshold'
+    )
+    sizes_by_product = {}
+    for size_id, product_id, stock_quantity in ProductSize.objects.filter(
+        product_id__in=product_ids
+    ).values_list('id', 'product_id', 'stock_quantity'):
+        sizes_by_product.setdefault(product_id, []).append((size_id, stock_quantity))
+
+    rows = []
+    for product_id, stock_quantity, threshold in products:
+        sizes = sizes_by_product.get(product_id)
+        if sizes:
+            rows.extend(
+                LowStockVariant(
+                    product_id=product_id, product_size_id=size_id,
+                    stock_quantity=size_stock, threshold=threshold
+                )
+                for size_id, size_stock in sizes
+                if is_low_stock(size_stock, threshold)
+            )
+        elif is_low_stock(stock_quantity, threshold):
+            rows.append(LowStockVariant(
+                product_id=product_id, stock_quantity=stock_quantity, threshold=threshold
+            ))
+    return rows
+
+
+def refresh_low_stock(product_ids):
+    """
+    Recompute the low stock entries for the given products
+    """
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+    with transaction.atomic():
+        rows = _low_stock_rows(product_ids)
+        LowStockVariant.objects.filter(product_id__in=product_ids).delete()
+        LowStockVariant.objects.bulk_create(rows)
+
+
+def schedule_low_stock_refresh(product_id):
+    """
+    Refresh a product's entries once the current transaction commits, so
+    cascaded deletes and multi-row edits see their final state
+    """
+    transaction.on_commit(lambda: refresh_low_stock([product_id]))
+
+
+def rebuild_low_stock(batch_size=1000):
+    """
+    Rebuild the whole index in product id batches; returns the number of entries
+    """
+    last_id = 0
+    while True:
+        product_ids = list(
+            Product.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not product_ids:
+            break
+        refresh_low_stock(product_ids)
+        last_id = product_ids[-1]
+    # Drop entries left behind by products deleted without signals
+    LowStockVariant.objects.exclude(product__in=Product.objects.all()).delete()
+    return LowStockVariant.objects.count()
+
+
+def low_stock_products(threshold=None):
+    """
+    Products with at least one low stock variant, annotated with their lowest variant stock.
+    An explicit threshold can only narrow the per-product thresholds.
+    """
+    if threshold is None:
+        queryset = Product.objects.filter(low_stock_variants__isnull=False)
+    else:
+        queryset = Product.objects.filter(low_stock_variants__stock_quantity__lte=threshold)
+    # Annotating after the filter reuses its join, so this stays a single grouped query
+    return queryset.annotate(lowest_stock=Min('low_stock_variants__stock_quantity'))
+
+
+def count_low_stock_products():
+    return LowStockVariant.objects.values('product_id').distinct().count()
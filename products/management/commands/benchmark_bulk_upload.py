@@ -0,0 +1,109 @@
+# products/management/commands/benchmark_bulk_upload.py
+import io
+import os
+import random
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from PIL import Image
+
+from products.models import Category, Product, ProductImage
+from products.serializers import ProductImageSerializer
+from products.uploads import bulk_create_product_images, decode_image
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark bulk product image uploads: the serial create-per-file path against '
+        'the parallel bulk_create path. Rows are rolled back and stored files removed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=50, help='Images per upload')
+        parser.add_argument('--width', type=int, default=3000)
+        parser.add_argument('--height', type=int, default=2000)
+        parser.add_argument('--rounds', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.stdout.write(
+            f"Encoding {options['images']} {options['width']}x{options['height']} JPEGs..."
+        )
+        payloads = [self._jpeg(rng, options['width'], options['height']) for _ in range(options['images'])]
+        request = RequestFactory().post('/')
+
+        self.stdout.write(f'{os.cpu_count()} CPU(s) available; parallel gains scale with cores and storage latency')
+        scenarios = (
+            ('serial create', self._serial),
+            ('serial + decode', self._serial_validated),
+            ('parallel bulk', self._parallel),
+        )
+        for label, upload in scenarios:
+            rates = []
+            for _ in range(options['rounds']):
+                files = [SimpleUploadedFile(f'shoot-{i}.jpg', data, 'image/jpeg') for i, data in enumerate(payloads)]
+                elapsed = self._timed(upload, files, request)
+                rates.append(len(files) / elapsed)
+            rates.sort()
+            self.stdout.write(
+                f'{label:<16} median {rates[len(rates) // 2]:7.1f} images/s   best {rates[-1]:7.1f} images/s'
+            )
+
+    def _jpeg(self, rng, width, height):
+        # Noise over a gradient, so the files cost roughly what a real photo does to decode
+        image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+        noise = Image.effect_noise((width, height), rng.randint(20, 60)).convert('RGB')
+        buffer = io.BytesIO()
+        Image.blend(image, noise, 0.5).save(buffer, 'JPEG', quality=90)
+        return buffer.getvalue()
+
+    def _timed(self, upload, files, request):
+        storage = ProductImage._meta.get_field('image').storage
+        names = []
+        try:
+            with transaction.atomic():
+                category = Category.objects.create(name='Upload benchmark', slug='upload-benchmark')
+                product = Product.objects.create(
+                    name='Upload benchmark', slug='upload-benchmark', category=category,
+                    description='-', price=1, sku='UPLOAD-BENCHMARK'
+                )
+                start = time.perf_counter()
+                upload(product, files, request)
+                elapsed = time.perf_counter() - start
+                names = list(ProductImage.objects.filter(product=product).values_list('image', flat=True))
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            for name in names:
+                storage.delete(name)
+        return elapsed
+
+    def _serial(self, product, files, request):
+        # The previous view body: one create and one serializer pass per file
+        data = []
+        for i, image_file in enumerate(files):
+            product_image = ProductImage.objects.create(
+                product=product, image=image_file,
+                alt_text=f'{product.name} image {i+1}', is_primary=i == 0, display_order=i
+            )
+            data.append(ProductImageSerializer(product_image, context={'request': request}).data)
+        return data
+
+    def _serial_validated(self, product, files, request):
+        # The serial path with the same image validation the bulk path does
+        for image_file in files:
+            decode_image(image_file)
+        return self._serial(product, files, request)
+
+    def _parallel(self, product, files, request):
+        images = bulk_create_product_images(product, files)
+        return ProductImageSerializer(images, many=True, context={'request': request}).data
@@ -0,0 +1,23 @@
+# products/management/commands/cleanup_upload_sessions.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.uploads import cleanup_upload_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete abandoned and old chunked upload sessions along with their temporary files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours', type=float, default=settings.IMAGE_UPLOAD_SESSION_TTL_HOURS,
+            help='Remove sessions not touched for this long (default: IMAGE_UPLOAD_SESSION_TTL_HOURS)'
+        )
+
+    def handle(self, *args, **options):
+        sessions, strays = cleanup_upload_sessions(timedelta(hours=options['max_age_hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {sessions} upload session(s) and {strays} stray temporary file(s).'
+        ))
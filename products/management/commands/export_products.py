@@ -0,0 +1,37 @@
+# products/management/commands/export_products.py
+import sys
+
+from django.core.management.base import BaseCommand
+
+from products.exporter import export_products
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream the catalog with sizes, colors, images and specifications as CSV or JSON Lines. '
+        'The CSV columns match import_products, so an export can be imported again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Products loaded per query')
+        parser.add_argument('--active-only', action='store_true', help='Skip inactive products')
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.all()
+        if options['active_only']:
+            queryset = queryset.filter(is_active=True)
+        chunks = export_products(queryset, options['format'], chunk_size=options['chunk_size'])
+
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+        count = -1 if options['format'] == 'csv' else 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} product(s) to {options['output']}."))
@@ -0,0 +1,52 @@
+# products/management/commands/generate_image_derivatives.py
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from products.image_processing import build_product_image_derivatives
+from products.models import ProductImage
+
+
+def _build(image_id, force):
+    try:
+        return build_product_image_derivatives(image_id, force=force)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Backfill responsive derivatives and metadata for existing product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate derivatives that already exist')
+        parser.add_argument('--workers', type=int, default=4, help='Images processed in parallel')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        force = options['force']
+        processed = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(
+                    ProductImage.objects.filter(id__gt=last_id).order_by('id')
+                    .values_list('id', 'image', 'derivatives', 'image_meta')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                image_ids = [
+                    image_id for image_id, name, derivatives, image_meta in batch
+                    if name and (force or derivatives.get('source') != name or image_meta.get('source') != name)
+                ]
+                futures = {image_id: executor.submit(_build, image_id, force) for image_id in image_ids}
+                for image_id, future in futures.items():
+                    try:
+                        future.result()
+                        processed += 1
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'Image {image_id}: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {processed} image(s), {failed} failed.'))
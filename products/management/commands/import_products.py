@@ -0,0 +1,42 @@
+# products/management/commands/import_products.py
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import ImportAborted, ImportFormatError, detect_format, import_products
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or update products by SKU from a CSV or JSON Lines file. '
+        'Rows are validated and written in batches; invalid rows are reported and skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .jsonl file')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Validate and roll back without saving')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or detect_format(options['path'])
+        aborted = None
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                summary = import_products(
+                    stream, file_format, batch_size=options['batch_size'], dry_run=options['dry_run']
+                )
+        except ImportAborted as exc:
+            aborted, summary = exc, exc.summary
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']} ({error['sku'] or 'no sku'}): {error['errors']}")
+        if summary['failed'] > len(summary['errors']):
+            self.stderr.write(f"... {summary['failed'] - len(summary['errors'])} more error(s) not shown")
+        prefix = 'Dry run: would have created' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {summary['created']}, updated {summary['updated']}, "
+            f"skipped {summary['failed']} invalid row(s)."
+        ))
+        if aborted:
+            raise CommandError(str(aborted))
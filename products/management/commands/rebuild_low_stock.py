@@ -0,0 +1,15 @@
+# products/management/commands/rebuild_low_stock.py
+from django.core.management.base import BaseCommand
+
+from products.inventory import rebuild_low_stock
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized low stock index from current product and size stock'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        entries = rebuild_low_stock(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Low stock index rebuilt: {entries} variant(s) below threshold.'))
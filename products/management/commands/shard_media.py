@@ -0,0 +1,125 @@
+# products/management/commands/shard_media.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.images import FORMATS
+from core.media import (
+    ReferenceIndex, iter_referenced_names, relocate, remove_relocated, rename_blob, sharded_name,
+)
+from core.storage import is_content_addressed
+from core.utils import is_sharded
+from products.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = (
+        'Move product images and their derivatives from the flat productimage/ directory '
+        'into the sharded layout, rewriting ProductImage paths in batches. Already sharded '
+        'rows are skipped, so an interrupted run can simply be started again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--start-id', type=int, default=0, help='Resume after this ProductImage id')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would move')
+
+    def handle(self, *args, **options):
+        storage = ProductImage._meta.get_field('image').storage
+        # Content-addressed old paths may be shared with rows of later batches; they
+        # are spilled here and removed after the run if nothing refers to them
+        with ReferenceIndex() as shared:
+            moved, missing = self._shard(storage, shared, options)
+            if not options['dry_run']:
+                self._remove_unreferenced(storage, shared)
+
+        verb = 'would be moved' if options['dry_run'] else 'moved'
+        self.stdout.write(self.style.SUCCESS(f'{moved} image(s) {verb}, {missing} with missing files.'))
+
+    def _shard(self, storage, shared, options):
+        last_id = options['start_id']
+        moved = missing = 0
+        while True:
+            batch = list(
+                ProductImage.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'image', 'derivatives')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            updates = []
+            for image_id, name, derivatives in batch:
+                renames = self._renames(name, derivatives)
+                if not renames:
+                    continue
+                if options['dry_run']:
+                    moved += 1
+                    continue
+                try:
+                    for old_name, new_name in renames.items():
+                        relocate(storage, old_name, new_name)
+                except FileNotFoundError as exc:
+                    missing += 1
+                    self.stderr.write(f'Image {image_id}: missing file {exc}')
+                    continue
+                updates.append((image_id, name, renames, derivatives))
+
+            # Point the rows at the new paths, then drop the old ones. A row changed
+            # meanwhile keeps its paths, so only rewritten rows' old paths are dropped
+            relocated = set()
+            with transaction.atomic():
+                for image_id, name, renames, derivatives in updates:
+                    updated = ProductImage.objects.filter(pk=image_id, image=name).update(
+                        image=renames.get(name, name),
+                        derivatives=self._rewrite(derivatives, renames)
+                    )
+                    if not updated:
+                        continue
+                    moved += 1
+                    for old_name, new_name in renames.items():
+                        rename_blob(old_name, new_name)
+                    relocated.update(renames)
+            for old_name in relocated:
+                if not is_content_addressed(old_name):
+                    remove_relocated(storage, old_name)
+            shared.add_all(name for name in relocated if is_content_addressed(name))
+
+            self.stdout.write(f'Processed up to id {last_id}: {moved} moved, {missing} missing')
+        return moved, missing
+
+    def _remove_unreferenced(self, storage, shared, batch_size=1000):
+        """
+        Remove the spilled content-addressed paths no row refers to any more, with one
+        pass over the referenced names; an interrupted run leaves them to collect_media_garbage
+        """
+        with ReferenceIndex() as referenced:
+            referenced.add_all(iter_referenced_names())
+            batch = []
+
+            def flush():
+                for old_name in set(batch) - referenced.referenced(batch):
+                    remove_relocated(storage, old_name)
+                batch.clear()
+
+            for name in shared:
+                batch.append(name)
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+
+    def _renames(self, name, derivatives):
+        names = [name] if name else []
+        for format_key in FORMATS:
+            names.extend((derivatives or {}).get(format_key, {}).values())
+        return {old: sharded_name(old) for old in names if not is_sharded(old)}
+
+    def _rewrite(self, derivatives, renames):
+        if not derivatives:
+            return derivatives
+        rewritten = {'source': renames.get(derivatives.get('source'), derivatives.get('source'))}
+        for format_key in FORMATS:
+            if format_key in derivatives:
+                rewritten[format_key] = {
+                    width: renames.get(name, name) for width, name in derivatives[format_key].items()
+                }
+        return rewritten
@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-18 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_low_stock_index(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductSize = apps.get_model('products', 'ProductSize')
+    LowStockVariant = apps.get_model('products', 'LowStockVariant')
+
+    thresholds = dict(Product.objects.values_list('id', 'low_stock_threshold'))
+    rows = []
+    sized_products = set()
+    for size in ProductSize.objects.values('id', 'product_id', 'stock_quantity').iterator():
+        sized_products.add(size['product_id'])
+        threshold = thresholds[size['product_id']]
+        if size['stock_quantity'] <= threshold:
+            rows.append(LowStockVariant(
+                product_id=size['product_id'], product_size_id=size['id'],
+                stock_quantity=size['stock_quantity'], threshold=threshold
+            ))
+    for product in Product.objects.values('id', 'stock_quantity', 'low_stock_threshold').iterator():
+        if product['id'] not in sized_products and product['stock_quantity'] <= product['low_stock_threshold']:
+            rows.append(LowStockVariant(
+                product_id=product['id'], stock_quantity=product['stock_quantity'],
+                threshold=product['low_stock_threshold']
+            ))
+    LowStockVariant.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_wishlist_productreview_wishlistitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='low_stock_threshold',
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.CreateModel(
+            name='LowStockVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_quantity', models.PositiveIntegerField()),
+                ('threshold', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_variants', to='products.product')),
+                ('product_size', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_entry', to='products.productsize')),
+            ],
+            options={
+                'ordering': ['stock_quantity'],
+                'indexes': [models.Index(fields=['product', 'stock_quantity'], name='lowstock_product_stock_idx')],
+            },
+        ),
+        migrations.RunPython(build_low_stock_index, migrations.RunPython.noop),
+    ]
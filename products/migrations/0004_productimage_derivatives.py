@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_low_stock_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
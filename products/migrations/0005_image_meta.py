@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_productimage_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-18 23:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_image_upload_session'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='product_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='product_active_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['-created_at'], name='product_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_new', True)), fields=['-created_at'], name='product_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_bestseller', True)), fields=['-created_at'], name='product_bestseller_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(condition=models.Q(('is_primary', True)), fields=['product'], name='productimage_primary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['product', '-created_at'], name='review_product_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['user', '-created_at'], name='review_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+# Plain composite stand-ins for 0007's partial indexes on backends without
+# conditional indexes (MySQL), where Django drops the condition and builds an
+# index that doesn't lead with the filtered flags. SQLite and PostgreSQL keep
+# only the partial ones: they can't match a bare 'WHERE is_active' against a
+# composite index, so these would only add write cost. The indexes are in
+# migration state (and Meta.indexes) everywhere; only the database side is
+# conditional.
+FALLBACK_INDEXES = (
+    ('Product', models.Index(fields=['is_active', '-created_at'], name='product_active_created_fb')),
+    ('Product', models.Index(fields=['is_active', 'category', '-created_at'], name='product_active_cat_fb')),
+    ('Product', models.Index(fields=['is_featured', 'is_active', '-created_at'], name='product_featured_fb')),
+    ('Product', models.Index(fields=['is_new', 'is_active', '-created_at'], name='product_new_fb')),
+    ('Product', models.Index(fields=['is_bestseller', 'is_active', '-created_at'], name='product_bestseller_fb')),
+    ('ProductImage', models.Index(fields=['product', 'is_primary'], name='productimage_primary_fb')),
+    ('ProductReview', models.Index(fields=['product', 'is_approved', '-created_at'], name='review_product_approved_fb')),
+)
+
+
+def add_fallback_indexes(apps, schema_editor):
+    if schema_editor.connection.features.supports_partial_indexes:
+        return
+    for model_name, index in FALLBACK_INDEXES:
+        schema_editor.add_index(apps.get_model('products', model_name), index)
+
+
+def remove_fallback_indexes(apps, schema_editor):
+    if schema_editor.connection.features.supports_partial_indexes:
+        return
+    for model_name, index in FALLBACK_INDEXES:
+        schema_editor.remove_index(apps.get_model('products', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_query_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name.lower(), index=index)
+                for model_name, index in FALLBACK_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_fallback_indexes, remove_fallback_indexes),
+            ],
+        ),
+    ]
@@ -1,9 +1,12 @@
 # products/models.py
+import uuid
+from functools import partial
+
 from django.db import models
+from django.db.models import Q
 from django.core.validators import MinValueValidator,MaxValueValidator
-from django.utils.text import slugify
 from core.models import TimestampedModel
-from core.utils import get_file_path
+from core.utils import get_file_path, save_with_unique_slug
 from django.contrib.auth import authenticate, get_user_model
 
 
@@ -17,6 +20,8 @@ class Category(TimestampedModel):
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to='categories/', null=True, blank=True)
+    # Dimensions, size, dominant colour and blur placeholder, filled in by the background worker
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
     is_active = models.BooleanField(default=True)
     display_order = models.IntegerField(default=0)
@@ -29,9 +34,9 @@ class Category(TimestampedModel):
         return self.name
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        save_with_unique_slug(self, partial(super().save, *args, **kwargs))
 
 
 class Color(models.Model):
@@ -88,6 +93,7 @@ class Product(TimestampedModel):
     sku = models.CharField(max_length=100, unique=True, blank=True, null=True)
     in_stock = models.BooleanField(default=True)
     stock_quantity = models.PositiveIntegerField(default=0)
+    low_stock_threshold = models.PositiveIntegerField(default=5)
     
     # Visibility flags
     is_active = models.BooleanField(default=True)
@@ -100,14 +106,37 @@ class Product(TimestampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Storefront listings: active products, newest first, optionally per category.
+            # Partial indexes, because Django compares booleans as a bare column
+            # ('WHERE is_active'), which SQLite can only match against an index condition
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='product_active_created_idx'),
+            models.Index(fields=['category', '-created_at'], condition=Q(is_active=True), name='product_active_cat_idx'),
+            # Home page sections
+            models.Index(
+                fields=['-created_at'], condition=Q(is_featured=True, is_active=True), name='product_featured_idx'
+            ),
+            models.Index(fields=['-created_at'], condition=Q(is_new=True, is_active=True), name='product_new_idx'),
+            models.Index(
+                fields=['-created_at'], condition=Q(is_bestseller=True, is_active=True), name='product_bestseller_idx'
+            ),
+            # Plain composite stand-ins for the partial indexes above. Migration 0008 only
+            # builds them on backends without partial indexes (MySQL); elsewhere they exist
+            # in migration state only, so change them with SeparateDatabaseAndState too
+            models.Index(fields=['is_active', '-created_at'], name='product_active_created_fb'),
+            models.Index(fields=['is_active', 'category', '-created_at'], name='product_active_cat_fb'),
+            models.Index(fields=['is_featured', 'is_active', '-created_at'], name='product_featured_fb'),
+            models.Index(fields=['is_new', 'is_active', '-created_at'], name='product_new_fb'),
+            models.Index(fields=['is_bestseller', 'is_active', '-created_at'], name='product_bestseller_fb'),
+        ]
     
     def __str__(self):
         return self.name
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        save_with_unique_slug(self, partial(super().save, *args, **kwargs))
     
     def get_discount_percentage(self):
         """Calculate discount percentage if original price exists"""
@@ -132,6 +161,32 @@ class ProductSize(models.Model):
         return f"{self.product.name} - {self.size.name}"
 
 
+class LowStockVariant(models.Model):
+    """
+    Materialized index of stock-keeping variants at or below their product's
+    low stock threshold, kept current by products.inventory on every stock change.
+    A variant is a ProductSize, or the product itself when it has no sizes.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='low_stock_variants')
+    product_size = models.OneToOneField(
+        ProductSize, on_delete=models.CASCADE, null=True, blank=True, related_name='low_stock_entry'
+    )
+    stock_quantity = models.PositiveIntegerField()
+    threshold = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['stock_quantity']
+        indexes = [
+            models.Index(fields=['product', 'stock_quantity'], name='lowstock_product_stock_idx'),
+        ]
+    
+    def __str__(self):
+        if self.product_size_id:
+            return f"{self.product_size} ({self.stock_quantity} left)"
+        return f"{self.product.name} ({self.stock_quantity} left)"
+
+
 class ProductColor(models.Model):
     """
     Product color variant with associated images
@@ -163,12 +218,21 @@ class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     color = models.ForeignKey(ProductColor, on_delete=models.SET_NULL, null=True, blank=True, related_name='images')
     image = models.ImageField(upload_to=get_file_path)
+    # Resized copies by format and width, filled in by products.image_processing
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
+    # Dimensions, size, dominant colour and blur placeholder (core.images.extract_metadata)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)
     alt_text = models.CharField(max_length=255, blank=True)
     is_primary = models.BooleanField(default=False)
     display_order = models.PositiveSmallIntegerField(default=0)
     
     class Meta:
         ordering = ['display_order']
+        indexes = [
+            models.Index(fields=['product'], condition=Q(is_primary=True), name='productimage_primary_idx'),
+            # Only built without partial index support, see Product.Meta
+            models.Index(fields=['product', 'is_primary'], name='productimage_primary_fb'),
+        ]
     
     def __str__(self):
         return f"Image for {self.product.name}"
@@ -193,6 +257,41 @@ class ProductImage(models.Model):
         super().save(*args, **kwargs)
 
 
+class ImageUploadSession(TimestampedModel):
+    """
+    A resumable, chunked product image upload. Chunks are appended to a
+    temporary file outside MEDIA_ROOT; the ProductImage is created on finalize.
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='upload_sessions')
+    color = models.ForeignKey(ProductColor, on_delete=models.SET_NULL, null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    # Optional checksum supplied by the client, verified on finalize
+    expected_sha256 = models.CharField(max_length=64, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    alt_text = models.CharField(max_length=255, blank=True)
+    is_primary = models.BooleanField(default=False)
+    display_order = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    product_image = models.OneToOneField(ProductImage, on_delete=models.SET_NULL, null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='uploadsession_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Upload {self.filename} ({self.received}/{self.size})"
+
+
 class ProductHighlight(models.Model):
     """
     Product highlights (bullet points)
@@ -242,6 +341,12 @@ class ProductReview(TimestampedModel):
     class Meta:
         unique_together = ('product', 'user')  # One review per product per user
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', '-created_at'], condition=Q(is_approved=True), name='review_product_approved_idx'),
+            models.Index(fields=['user', '-created_at'], name='review_user_created_idx'),
+            # Only built without partial index support, see Product.Meta
+            models.Index(fields=['product', 'is_approved', '-created_at'], name='review_product_approved_fb'),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.rating} Stars by {self.user.email}"
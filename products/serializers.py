@@ -1,25 +1,51 @@
 # products/serializers.py - Update these serializers to match frontend expectations
 
 from rest_framework import serializers
+
+from core.images import current_metadata
+from core.media_urls import MediaURLSerializerMixin, media_url_builder
+
 from .models import (
     Category, Color, Size, Product, ProductSize, 
-    ProductColor, ProductImage, ProductHighlight, ProductSpecification,Wishlist,ProductReview,WishlistItem
+    ProductColor, ProductImage, ImageUploadSession, ProductHighlight, ProductSpecification,Wishlist,ProductReview,WishlistItem
 )
+from .variants import sync_highlights, sync_specifications
+
+def get_image_srcset(product_image, request):
+    """
+    Absolute derivative URLs for an image as {'webp': {'320': url, ...}, 'jpeg': {...}}.
+    Empty until the background worker has generated them for the current file.
+    """
+    derivatives = product_image.derivatives or {}
+    if not request or derivatives.get('source') != product_image.image.name:
+        return {}
+    storage = product_image.image.storage
+    urls = media_url_builder(request)
+    return {
+        format_key: {
+            width: urls.url(name, storage)
+            for width, name in widths.items()
+        }
+        for format_key, widths in derivatives.items()
+        if format_key != 'source'
+    }
+
 
 # Improved CategorySerializer with proper image and product count handling
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(MediaURLSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for product categories with improved image handling
     """
     parent_name = serializers.StringRelatedField(source='parent', read_only=True)
     image_url = serializers.SerializerMethodField()
+    image_meta = serializers.SerializerMethodField()
     product_count = serializers.SerializerMethodField()
     primary_product_image = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
         fields = (
-            'id', 'name', 'slug', 'description', 'image', 'image_url', 
+            'id', 'name', 'slug', 'description', 'image', 'image_url', 'image_meta',
             'parent', 'parent_name', 'is_active', 'display_order', 
             'product_count', 'primary_product_image', 'created_at', 'updated_at'
         )
@@ -32,9 +58,12 @@ class CategorySerializer(serializers.ModelSerializer):
         if obj.image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.image.url)
+                return media_url_builder(request).url(obj.image)
         return None
     
+    def get_image_meta(self, obj):
+        return current_metadata(obj.image, obj.image_meta)
+    
     def get_product_count(self, obj):
         """
         Get product count for this category, including subcategories
@@ -67,13 +96,13 @@ class CategorySerializer(serializers.ModelSerializer):
         for product in products:
             primary_image = product.images.filter(is_primary=True).first()
             if primary_image and request:
-                return request.build_absolute_uri(primary_image.image.url)
+                return media_url_builder(request).url(primary_image.image)
         
         # If no primary images found, try any product image
         for product in products:
             any_image = product.images.first()
             if any_image and request:
-                return request.build_absolute_uri(any_image.image.url)
+                return media_url_builder(request).url(any_image.image)
                 
         # Try subcategories' products if needed
         subcategories = Category.objects.filter(parent=obj.id)
@@ -82,12 +111,12 @@ class CategorySerializer(serializers.ModelSerializer):
             for product in subcat_products:
                 primary_image = product.images.filter(is_primary=True).first()
                 if primary_image and request:
-                    return request.build_absolute_uri(primary_image.image.url)
+                    return media_url_builder(request).url(primary_image.image)
                 
                 # Try any image
                 any_image = product.images.first()
                 if any_image and request:
-                    return request.build_absolute_uri(any_image.image.url)
+                    return media_url_builder(request).url(any_image.image)
         
         return None
 
@@ -138,7 +167,7 @@ class CategoryListSerializer(serializers.ModelSerializer):
         if obj.image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.image.url)
+                return media_url_builder(request).url(obj.image)
         return None
     
     def get_primary_product_image(self, obj):
@@ -157,13 +186,13 @@ class CategoryListSerializer(serializers.ModelSerializer):
         for product in products:
             primary_image = product.images.filter(is_primary=True).first()
             if primary_image and request:
-                return request.build_absolute_uri(primary_image.image.url)
+                return media_url_builder(request).url(primary_image.image)
         
         # If no primary images found, try any product image
         for product in products:
             any_image = product.images.first()
             if any_image and request:
-                return request.build_absolute_uri(any_image.image.url)
+                return media_url_builder(request).url(any_image.image)
                 
         # Try subcategories' products if needed
         subcategories = Category.objects.filter(parent=obj.id)
@@ -172,12 +201,12 @@ class CategoryListSerializer(serializers.ModelSerializer):
             for product in subcat_products:
                 primary_image = product.images.filter(is_primary=True).first()
                 if primary_image and request:
-                    return request.build_absolute_uri(primary_image.image.url)
+                    return media_url_builder(request).url(primary_image.image)
                 
                 # Try any image
                 any_image = product.images.first()
                 if any_image and request:
-                    return request.build_absolute_uri(any_image.image.url)
+                    return media_url_builder(request).url(any_image.image)
         
         return None
 
@@ -211,22 +240,45 @@ class ProductSizeSerializer(serializers.ModelSerializer):
         fields = ('id', 'size', 'size_name', 'size_details', 'stock_quantity', 'is_available')
 
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(MediaURLSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for product images
     """
     image_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    image_meta = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductImage
-        fields = ('id', 'image', 'image_url', 'alt_text', 'is_primary', 'display_order', 'color')
-        read_only_fields = ('image_url',)
+        fields = ('id', 'image', 'image_url', 'srcset', 'image_meta', 'alt_text', 'is_primary', 'display_order', 'color')
+        read_only_fields = ('image_url', 'srcset', 'image_meta')
     
     def get_image_url(self, obj):
         request = self.context.get('request')
         if request and obj.image:
-            return request.build_absolute_uri(obj.image.url)
+            return media_url_builder(request).url(obj.image)
         return None
+    
+    def get_srcset(self, obj):
+        return get_image_srcset(obj, self.context.get('request'))
+    
+    def get_image_meta(self, obj):
+        return current_metadata(obj.image, obj.image_meta)
+
+
+class ImageUploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for chunked upload session status
+    """
+    offset = serializers.IntegerField(source='received', read_only=True)
+    
+    class Meta:
+        model = ImageUploadSession
+        fields = (
+            'id', 'filename', 'size', 'offset', 'status', 'sha256',
+            'product_image', 'created_at', 'updated_at'
+        )
+        read_only_fields = fields
 
 
 class ProductHighlightSerializer(serializers.ModelSerializer):
@@ -266,6 +318,8 @@ class ProductListSerializer(serializers.ModelSerializer):
     category_name = serializers.StringRelatedField(source='category', read_only=True)
     discount_percentage = serializers.SerializerMethodField()
     primary_image = serializers.SerializerMethodField()
+    primary_image_srcset = serializers.SerializerMethodField()
+    primary_image_meta = serializers.SerializerMethodField()
     images = serializers.SerializerMethodField()
     price = serializers.FloatField()  # Ensure price is returned as a number
     original_price = serializers.FloatField(required=False, allow_null=True)  # Ensure original_price is a number
@@ -275,24 +329,43 @@ class ProductListSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'name', 'slug', 'category', 'category_name', 
             'price', 'original_price', 'discount_percentage',
-            'primary_image', 'is_new', 'is_bestseller',
+            'primary_image', 'primary_image_srcset', 'primary_image_meta', 'is_new', 'is_bestseller',
             'in_stock', 'short_description', 'images'
         )
     
     def get_discount_percentage(self, obj):
         return obj.get_discount_percentage()
     
+    def _get_primary_image_object(self, obj):
+        if not hasattr(obj, '_primary_image'):
+            # Use images.all() so a prefetch_related('images') serves every row
+            images = list(obj.images.all())
+            # Try to get the primary image, falling back to the first image
+            primary_image = next((img for img in images if img.is_primary), None)
+            if not primary_image and images:
+                primary_image = images[0]
+            obj._primary_image = primary_image
+        return obj._primary_image
+    
     def get_primary_image(self, obj):
-        # Try to get the primary image
-        primary_image = obj.images.filter(is_primary=True).first()
-        if not primary_image:
-            # Fallback to the first image
-            primary_image = obj.images.first()
+        primary_image = self._get_primary_image_object(obj)
         
         if primary_image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(primary_image.image.url)
+                return media_url_builder(request).url(primary_image.image)
+        return None
+    
+    def get_primary_image_srcset(self, obj):
+        primary_image = self._get_primary_image_object(obj)
+        if primary_image:
+            return get_image_srcset(primary_image, self.context.get('request'))
+        return {}
+    
+    def get_primary_image_meta(self, obj):
+        primary_image = self._get_primary_image_object(obj)
+        if primary_image:
+            return current_metadata(primary_image.image, primary_image.image_meta)
         return None
     
     def get_images(self, obj):
@@ -300,12 +373,56 @@ class ProductListSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request:
             return [
-                request.build_absolute_uri(img.image.url) 
+                media_url_builder(request).url(img.image) 
                 for img in obj.images.all()
             ]
         return []
 
 
+class AdminProductGridSerializer(serializers.ModelSerializer):
+    """
+    Admin product list rows: grid columns, a thumbnail and aggregated variant
+    stock. Expects the annotations and prefetch from AdminProductListCreateView.
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True, default=None)
+    discount_percentage = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    variant_stock = serializers.IntegerField(read_only=True)
+    size_count = serializers.IntegerField(read_only=True)
+    color_count = serializers.IntegerField(read_only=True)
+    is_low_stock = serializers.BooleanField(read_only=True)
+    price = serializers.FloatField()
+    original_price = serializers.FloatField(required=False, allow_null=True)
+    
+    class Meta:
+        model = Product
+        fields = (
+            'id', 'name', 'slug', 'sku', 'category', 'category_name',
+            'price', 'original_price', 'discount_percentage', 'thumbnail',
+            'stock_quantity', 'variant_stock', 'size_count', 'color_count', 'is_low_stock',
+            'in_stock', 'is_active', 'is_featured', 'is_new', 'is_bestseller',
+            'created_at', 'updated_at'
+        )
+        read_only_fields = fields
+    
+    def get_discount_percentage(self, obj):
+        return obj.get_discount_percentage()
+    
+    def get_thumbnail(self, obj):
+        """
+        Smallest derivative of the primary (else first) image; the original until derivatives exist
+        """
+        # The prefetch orders primary images first
+        image = next(iter(obj.images.all()), None)
+        if image is None:
+            return None
+        srcset = get_image_srcset(image, self.context.get('request'))
+        widths = srcset.get('webp') or srcset.get('jpeg')
+        if widths:
+            return widths[min(widths, key=int)]
+        return media_url_builder(self.context.get('request')).url(image.image)
+
+
 class ProductDetailSerializer(serializers.ModelSerializer):
     """
     Detailed serializer for single product view
@@ -329,7 +446,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'description', 'short_description',
             'price', 'original_price', 'discount_percentage',
             'fabric', 'fit', 'wash_care', 'model_size',
-            'sku', 'in_stock', 'stock_quantity',
+            'sku', 'in_stock', 'stock_quantity', 'low_stock_threshold',
             'is_active', 'is_featured', 'is_new', 'is_bestseller',
             'highlights', 'specifications', 'available_sizes', 
             'colors', 'images', 'rating', 'reviews_count',
@@ -363,7 +480,7 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'name', 'category', 'description', 'short_description',
             'price', 'original_price', 'fabric', 'fit', 'wash_care', 
-            'model_size', 'sku', 'in_stock', 'stock_quantity',
+            'model_size', 'sku', 'in_stock', 'stock_quantity', 'low_stock_threshold',
             'is_active', 'is_featured', 'is_new', 'is_bestseller',
             'highlights', 'specifications'
         )
@@ -375,13 +492,8 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         # Create the product
         product = Product.objects.create(**validated_data)
         
-        # Create highlights
-        for highlight_data in highlights_data:
-            ProductHighlight.objects.create(product=product, **highlight_data)
-        
-        # Create specifications
-        for spec_data in specifications_data:
-            ProductSpecification.objects.create(product=product, **spec_data)
+        # Create highlights and specifications, one insert each
+        self._sync_nested(product, highlights_data, specifications_data)
         
         return product
     
@@ -394,24 +506,82 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         
-        # Update highlights if provided
-        if highlights_data is not None:
-            # Delete existing highlights
-            instance.highlights.all().delete()
-            # Create new highlights
-            for highlight_data in highlights_data:
-                ProductHighlight.objects.create(product=instance, **highlight_data)
-        
-        # Update specifications if provided
-        if specifications_data is not None:
-            # Delete existing specifications
-            instance.specifications.all().delete()
-            # Create new specifications
-            for spec_data in specifications_data:
-                ProductSpecification.objects.create(product=instance, **spec_data)
+        # Reconcile highlights and specifications if provided: unchanged rows are kept,
+        # changed ones updated and the rest inserted or deleted in bulk
+        self._sync_nested(instance, highlights_data, specifications_data)
         
         return instance
     
+    def _sync_nested(self, product, highlights_data, specifications_data):
+        if highlights_data is not None:
+            sync_highlights([(product, [
+                {'text': data['text'], 'display_order': data.get('display_order', 0)}
+                for data in highlights_data
+            ])])
+        if specifications_data is not None:
+            sync_specifications([(product, [
+                {'title': data['title'], 'value': data['value'], 'display_order': data.get('display_order', 0)}
+                for data in specifications_data
+            ])])
+
+
+class ProductBulkFilterSerializer(serializers.Serializer):
+    """
+    Selects products for a bulk update by category slug and flags.
+    The whole catalog is only selected with an explicit `all: true`.
+    """
+    category = serializers.SlugField(required=False)
+    is_active = serializers.BooleanField(required=False)
+    is_featured = serializers.BooleanField(required=False)
+    is_new = serializers.BooleanField(required=False)
+    is_bestseller = serializers.BooleanField(required=False)
+    all = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        select_all = attrs.pop('all', False)
+        if select_all and attrs:
+            raise serializers.ValidationError('Use all without other filters.')
+        if not select_all and not attrs:
+            raise serializers.ValidationError('Provide at least one filter, or all: true to update every product.')
+        return attrs
+
+
+class ProductBulkChangesSerializer(serializers.Serializer):
+    """
+    Field values a bulk update sets on every selected product
+    """
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    original_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False, allow_null=True
+    )
+    is_active = serializers.BooleanField(required=False)
+    is_featured = serializers.BooleanField(required=False)
+    is_new = serializers.BooleanField(required=False)
+    is_bestseller = serializers.BooleanField(required=False)
+
+
+class ProductBulkUpdateSerializer(serializers.Serializer):
+    """
+    A bulk product update: target products by `ids` or `filter`, then `set`
+    fields and/or adjust prices by a percentage (-20 is 20% off)
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = ProductBulkFilterSerializer(required=False)
+    set = ProductBulkChangesSerializer(required=False)
+    price_adjustment_percent = serializers.DecimalField(
+        max_digits=5, decimal_places=2, min_value=-99, max_value=1000, required=False
+    )
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter.')
+        changes = attrs.get('set') or {}
+        adjustment = attrs.get('price_adjustment_percent')
+        if not changes and adjustment is None:
+            raise serializers.ValidationError('Nothing to update; provide set or price_adjustment_percent.')
+        if 'price' in changes and adjustment is not None:
+            raise serializers.ValidationError('Set a price or adjust it by a percentage, not both.')
+        return attrs
 
 
 # Wishlist Serializers
@@ -0,0 +1,93 @@
+# products/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.images import delete_derivatives, schedule_image_metadata
+from core.storage import is_content_addressed
+
+from .image_processing import needs_processing, schedule_derivatives
+from .inventory import schedule_low_stock_refresh
+from .models import Category, Product, ProductImage, ProductSize
+
+STOCK_FIELDS = {'stock_quantity', 'low_stock_threshold'}
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_low_stock(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep the low stock index current when product stock or threshold changes
+    """
+    if update_fields is not None and not STOCK_FIELDS.intersection(update_fields):
+        return
+    schedule_low_stock_refresh(instance.pk)
+
+
+@receiver(post_save, sender=ProductSize)
+@receiver(post_delete, sender=ProductSize)
+def refresh_size_low_stock(sender, instance, **kwargs):
+    """
+    Keep the low stock index current when size stock changes or sizes are removed
+    """
+    schedule_low_stock_refresh(instance.product_id)
+
+
+@receiver(post_save, sender=ProductImage)
+def queue_product_image_derivatives(sender, instance, **kwargs):
+    """
+    Generate responsive derivatives and metadata in the background for new or replaced images
+    """
+    if needs_processing(instance):
+        schedule_derivatives([instance.pk])
+
+
+@receiver(post_delete, sender=ProductImage)
+def delete_product_image_files(sender, instance, **kwargs):
+    """
+    Remove derivative files along with their image row, and release the
+    original when it is a shared content-addressed blob
+    """
+    storage = instance.image.storage
+    derivatives = instance.derivatives
+    image_name = instance.image.name
+
+    def delete_files():
+        delete_derivatives(storage, derivatives)
+        if is_content_addressed(image_name):
+            storage.delete(image_name)
+
+    transaction.on_commit(delete_files)
+
+
+@receiver(pre_save, sender=ProductImage)
+@receiver(pre_save, sender=Category)
+def remember_replaced_image(sender, instance, update_fields=None, **kwargs):
+    """
+    Note the stored image name before a save that may replace it
+    """
+    instance._replaced_image = None
+    if instance.pk is None or (update_fields is not None and 'image' not in update_fields):
+        return
+    old_name = sender._default_manager.filter(pk=instance.pk).values_list('image', flat=True).first()
+    if is_content_addressed(old_name) and old_name != instance.image.name:
+        instance._replaced_image = old_name
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=Category)
+def release_replaced_image(sender, instance, **kwargs):
+    """
+    Release a replaced content-addressed image once the row pointing elsewhere is committed
+    """
+    old_name = getattr(instance, '_replaced_image', None)
+    if old_name and old_name != instance.image.name:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: storage.delete(old_name))
+
+
+@receiver(post_save, sender=Category)
+def queue_category_image_metadata(sender, instance, **kwargs):
+    """
+    Record image metadata in the background for new or replaced category images
+    """
+    schedule_image_metadata(instance, 'image', 'image_meta')
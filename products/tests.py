@@ -1,3 +1,480 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from admin_console.models import AdminActivity
+from core.media_urls import MediaURLBuilder
+from users.models import User
+
+from .bulk_updates import bulk_update_products
+from .exporter import export_products, product_record
+from .importer import ImportAborted, ProductImporter, import_products, read_rows
+from .inventory import low_stock_products, rebuild_low_stock
+from .models import (
+    Category, Color, LowStockVariant, Product, ProductColor, ProductHighlight, ProductSize,
+    ProductSpecification, Size
+)
+from .uploads import start_upload_session
+from .variants import sync_highlights
+
+
+def create_product(category, sku='SKU-1', **fields):
+    fields.setdefault('name', f'Product {sku}')
+    fields.setdefault('description', 'A product')
+    fields.setdefault('price', Decimal('20.00'))
+    return Product.objects.create(category=category, sku=sku, **fields)
+
+
+class AdminAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='staff', is_staff=True
+        )
+        cls.category = Category.objects.create(name='Tops', slug='tops')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+
+class ImageUploadSessionTests(AdminAPITestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        settings_override = override_settings(IMAGE_UPLOAD_TEMP_DIR=temp_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.session = start_upload_session(create_product(self.category), 'a.jpg', 10, user=self.staff)
+
+    def test_empty_chunk_is_rejected(self):
+        response = self.client.patch(
+            reverse('admin-upload-session', args=[self.session.pk]), b'',
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.received, 0)
+
+    def test_chunk_is_appended(self):
+        response = self.client.patch(
+            reverse('admin-upload-session', args=[self.session.pk]), b'12345',
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Upload-Offset'], '5')
+
+
+class LowStockIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Tops', slug='tops')
+        cls.small = Size.objects.create(name='S')
+        cls.large = Size.objects.create(name='L')
+
+    def create_sized_product(self, stock, sku='SKU-1'):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, sku=sku)
+            small = ProductSize.objects.create(product=product, size=self.small, stock_quantity=stock)
+            large = ProductSize.objects.create(product=product, size=self.large, stock_quantity=20)
+        return product, small, large
+
+    def low_sizes(self, product):
+        return set(LowStockVariant.objects.filter(product=product).values_list('product_size_id', flat=True))
+
+    def test_size_stock_update_moves_variant_in_and_out(self):
+        product, small, large = self.create_sized_product(stock=10)
+        self.assertEqual(self.low_sizes(product), set())
+
+        small.stock_quantity = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            small.save()
+        self.assertEqual(self.low_sizes(product), {small.pk})
+        self.assertEqual(list(low_stock_products().values_list('lowest_stock', flat=True)), [3])
+
+        small.stock_quantity = 8
+        with self.captureOnCommitCallbacks(execute=True):
+            small.save()
+        self.assertEqual(self.low_sizes(product), set())
+
+    def test_index_waits_for_commit(self):
+        product, small, large = self.create_sized_product(stock=10)
+        small.stock_quantity = 0
+        with self.captureOnCommitCallbacks() as callbacks:
+            small.save()
+            self.assertEqual(self.low_sizes(product), set())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.low_sizes(product), {small.pk})
+
+    def test_threshold_change_on_product(self):
+        product, small, large = self.create_sized_product(stock=10)
+
+        product.low_stock_threshold = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save(update_fields=['low_stock_threshold'])
+        self.assertEqual(self.low_sizes(product), {small.pk})
+        self.assertEqual(LowStockVariant.objects.get(product=product).threshold, 10)
+
+        product.low_stock_threshold = 25
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertEqual(self.low_sizes(product), {small.pk, large.pk})
+
+    def test_product_without_sizes_uses_its_own_stock(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product(self.category, stock_quantity=2)
+        entry = LowStockVariant.objects.get(product=product)
+        self.assertIsNone(entry.product_size_id)
+        self.assertEqual(entry.stock_quantity, 2)
+
+    def test_rebuild_low_stock(self):
+        product, small, large = self.create_sized_product(stock=1)
+        other, other_small, _ = self.create_sized_product(stock=9, sku='SKU-2')
+        # Bulk updates skip the signals, so the index is stale until rebuilt
+        ProductSize.objects.filter(pk=other_small.pk).update(stock_quantity=0)
+        ProductSize.objects.filter(pk=small.pk).update(stock_quantity=30)
+        Product.objects.filter(pk=product.pk).update(low_stock_threshold=25)
+
+        self.assertEqual(rebuild_low_stock(batch_size=1), 2)
+        self.assertEqual(self.low_sizes(product), {large.pk})
+        self.assertEqual(self.low_sizes(other), {other_small.pk})
+
+
+class AdminProductSyncTests(AdminAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.sizes = [Size.objects.create(name=name) for name in ('S', 'M', 'L')]
+        cls.colors = [Color.objects.create(name=name, hex_value='#000000') for name in ('Red', 'Blue', 'Green')]
+
+    def create(self, **data):
+        return self.client.post(reverse('admin-product-list'), {
+            'name': 'Shirt', 'category': self.category.pk, 'description': 'A shirt',
+            'price': '20.00', 'sku': 'SHIRT-1', 'stock_quantity': 7, **data,
+        }, format='json')
+
+    def update(self, product, **data):
+        return self.client.patch(reverse('admin-product-detail', args=[product.slug]), data, format='json')
+
+    def size_rows(self, product):
+        return dict(ProductSize.objects.filter(product=product).values_list('size_id', 'id'))
+
+    def color_rows(self, product):
+        return dict(ProductColor.objects.filter(product=product).values_list('color_id', 'id'))
+
+    def test_create_adds_variants_and_details(self):
+        response = self.create(
+            sizes=[self.sizes[0].pk, self.sizes[1].pk],
+            colors=[self.colors[1].pk, self.colors[0].pk, self.colors[1].pk],
+            highlights=[{'text': 'Cotton', 'display_order': 1}],
+            specifications=[{'title': 'Fabric', 'value': 'Cotton'}],
+        )
+        self.assertEqual(response.status_code, 201)
+        product = Product.objects.get(sku='SHIRT-1')
+        self.assertEqual(
+            set(ProductSize.objects.filter(product=product).values_list('size_id', 'stock_quantity')),
+            {(self.sizes[0].pk, 7), (self.sizes[1].pk, 7)},
+        )
+        self.assertEqual(
+            list(ProductColor.objects.filter(product=product).order_by('-is_default', 'color_id')
+                 .values_list('color_id', 'is_default')),
+            [(self.colors[1].pk, True), (self.colors[0].pk, False)],
+        )
+        self.assertEqual(list(product.highlights.values_list('text', 'display_order')), [('Cotton', 1)])
+        self.assertEqual(list(product.specifications.values_list('title', 'value')), [('Fabric', 'Cotton')])
+
+    def test_update_keeps_matching_rows(self):
+        self.create(
+            sizes=[self.sizes[0].pk, self.sizes[1].pk], colors=[self.colors[0].pk, self.colors[1].pk],
+            highlights=[{'text': 'Cotton'}, {'text': 'Slim'}],
+        )
+        product = Product.objects.get(sku='SHIRT-1')
+        sizes, colors = self.size_rows(product), self.color_rows(product)
+        ProductSize.objects.filter(pk=sizes[self.sizes[1].pk]).update(stock_quantity=2)
+        highlight = product.highlights.get(text='Cotton')
+
+        response = self.update(
+            product, stock_quantity=3,
+            sizes=[self.sizes[1].pk, self.sizes[2].pk], colors=[self.colors[1].pk, self.colors[2].pk],
+            highlights=[{'text': 'Cotton', 'display_order': 5}],
+        )
+        self.assertEqual(response.status_code, 200)
+
+        new_sizes, new_colors = self.size_rows(product), self.color_rows(product)
+        self.assertEqual(set(new_sizes), {self.sizes[1].pk, self.sizes[2].pk})
+        self.assertEqual(new_sizes[self.sizes[1].pk], sizes[self.sizes[1].pk])
+        self.assertEqual(ProductSize.objects.get(pk=new_sizes[self.sizes[1].pk]).stock_quantity, 2)
+        self.assertEqual(ProductSize.objects.get(pk=new_sizes[self.sizes[2].pk]).stock_quantity, 3)
+
+        self.assertEqual(set(new_colors), {self.colors[1].pk, self.colors[2].pk})
+        self.assertEqual(new_colors[self.colors[1].pk], colors[self.colors[1].pk])
+        self.assertTrue(ProductColor.objects.get(pk=new_colors[self.colors[1].pk]).is_default)
+        self.assertFalse(ProductColor.objects.get(pk=new_colors[self.colors[2].pk]).is_default)
+
+        self.assertEqual(list(product.highlights.values_list('pk', 'display_order')), [(highlight.pk, 5)])
+
+    def test_update_without_variants_leaves_them_alone(self):
+        self.create(sizes=[self.sizes[0].pk], colors=[self.colors[0].pk])
+        product = Product.objects.get(sku='SHIRT-1')
+        sizes, colors = self.size_rows(product), self.color_rows(product)
+        self.assertEqual(self.update(product, name='Shirt 2').status_code, 200)
+        self.assertEqual(self.size_rows(product), sizes)
+        self.assertEqual(self.color_rows(product), colors)
+
+    def test_empty_lists_delete_variants(self):
+        self.create(sizes=[self.sizes[0].pk], colors=[self.colors[0].pk])
+        product = Product.objects.get(sku='SHIRT-1')
+        self.assertEqual(self.update(product, sizes=[], colors=[]).status_code, 200)
+        self.assertEqual(self.size_rows(product), {})
+        self.assertEqual(self.color_rows(product), {})
+
+    def test_unknown_size_on_create_is_404_and_rolled_back(self):
+        response = self.create(sizes=[self.sizes[0].pk, 999999])
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Product.objects.filter(sku='SHIRT-1').exists())
+        self.assertFalse(ProductSize.objects.exists())
+
+    def test_unknown_color_on_update_is_404_and_rolled_back(self):
+        self.create(sizes=[self.sizes[0].pk], colors=[self.colors[0].pk])
+        product = Product.objects.get(sku='SHIRT-1')
+        colors = self.color_rows(product)
+        response = self.update(product, name='Renamed', colors=[self.colors[1].pk, 999999])
+        self.assertEqual(response.status_code, 404)
+        product.refresh_from_db()
+        self.assertEqual(product.name, 'Shirt')
+        self.assertEqual(self.color_rows(product), colors)
+
+    def test_reconcile_counts(self):
+        product = create_product(self.category)
+        ProductHighlight.objects.bulk_create([
+            ProductHighlight(product=product, text='Cotton', display_order=0),
+            ProductHighlight(product=product, text='Slim', display_order=1),
+            ProductHighlight(product=product, text='Slim', display_order=2),
+        ])
+        # One select, delete, update and insert inside the savepoint
+        with self.assertNumQueries(6):
+            counts = sync_highlights([(product, [
+                {'text': 'Cotton', 'display_order': 0},
+                {'text': 'Slim', 'display_order': 3},
+                {'text': 'Washable', 'display_order': 4},
+            ])])
+        self.assertEqual(counts, (1, 1, 1))
+        self.assertEqual(
+            list(product.highlights.values_list('text', 'display_order')),
+            [('Cotton', 0), ('Slim', 3), ('Washable', 4)],
+        )
+        self.assertFalse(ProductSpecification.objects.exists())
+
+
+class ProductImporterTests(TestCase):
+    CSV = (
+        'sku,name,description,price,category,is_featured,sizes,colors,highlights,specifications\n'
+        'TEE-1,Tee,A tee,19.99,tops,yes,S:4|M,Red|Blue,Soft|Light,Fabric=Cotton|Fit=Slim\n'
+        'TEE-2,Long tee,Another tee,24.50,Tops,0,,Blue,,\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Tops', slug='tops')
+        Category.objects.create(name='Bottoms', slug='bottoms')
+        for name in ('S', 'M', 'L'):
+            Size.objects.create(name=name)
+        for name in ('Red', 'Blue'):
+            Color.objects.create(name=name, hex_value='#000000')
+
+    def run_import(self, text, file_format='csv', batch_size=1000):
+        with self.captureOnCommitCallbacks(execute=True):
+            return import_products(io.StringIO(text), file_format, batch_size=batch_size)
+
+    def records(self):
+        """
+        Exported records without the columns an import doesn't set
+        """
+        url_builder = MediaURLBuilder(None)
+        records = []
+        for product in Product.objects.order_by('sku'):
+            record = product_record(product, url_builder)
+            for name in ('id', 'slug', 'images', 'created_at', 'updated_at'):
+                del record[name]
+            records.append(record)
+        return records
+
+    def test_csv_import_creates_then_updates(self):
+        summary = self.run_import(self.CSV)
+        self.assertEqual(summary, {'created': 2, 'updated': 0, 'failed': 0, 'errors': []})
+
+        tee = Product.objects.get(sku='TEE-1')
+        self.assertEqual((tee.name, str(tee.price), tee.category, tee.is_featured), ('Tee', '19.99', self.category, True))
+        self.assertEqual(
+            sorted(tee.productsize_set.values_list('size__name', 'stock_quantity')), [('M', 0), ('S', 4)]
+        )
+        self.assertEqual(tee.colors.get(is_default=True).color.name, 'Red')
+        self.assertEqual(list(tee.highlights.values_list('text', flat=True)), ['Soft', 'Light'])
+        self.assertEqual(list(tee.specifications.values_list('title', 'value')), [('Fabric', 'Cotton'), ('Fit', 'Slim')])
+        self.assertFalse(Product.objects.get(sku='TEE-2').is_featured)
+
+        summary = self.run_import('sku,price,sizes\nTEE-1,15.00,L:2\n')
+        self.assertEqual((summary['created'], summary['updated']), (0, 1))
+        tee.refresh_from_db()
+        self.assertEqual((tee.name, str(tee.price)), ('Tee', '15.00'))
+        self.assertEqual(list(tee.productsize_set.values_list('size__name', 'stock_quantity')), [('L', 2)])
+        # Columns left out of the update keep their rows
+        self.assertEqual(tee.colors.count(), 2)
+
+    def test_jsonl_import(self):
+        lines = [
+            {'sku': 'TEE-1', 'name': 'Tee', 'description': 'A tee', 'price': '19.99', 'category': 'tops',
+             'sizes': [{'size': 'S', 'stock': 4}, 'M'], 'colors': ['Blue'],
+             'specifications': {'Fabric': 'Cotton'}, 'is_new': True},
+        ]
+        summary = self.run_import(''.join(json.dumps(line) + '\n' for line in lines), 'jsonl')
+        self.assertEqual(summary['created'], 1)
+        tee = Product.objects.get(sku='TEE-1')
+        self.assertTrue(tee.is_new)
+        self.assertEqual(sorted(tee.productsize_set.values_list('size__name', 'stock_quantity')), [('M', 0), ('S', 4)])
+        self.assertEqual(list(tee.specifications.values_list('title', 'value')), [('Fabric', 'Cotton')])
+
+    def test_bad_rows_are_reported_and_good_rows_imported(self):
+        text = self.CSV + (
+            'TEE-3,Bad,A tee,cheap,tops,,,,,\n'
+            'TEE-4,Bad,A tee,10,hats,maybe,XL,,,\n'
+            'TEE-5,,,,,,,,,\n'
+            'TEE-1,Again,A tee,10,tops,,,,,\n'
+            ',No sku,A tee,10,tops,,,,,\n'
+        )
+        summary = self.run_import(text)
+        self.assertEqual((summary['created'], summary['failed']), (2, 5))
+        errors = {error['line']: error for error in summary['errors']}
+        self.assertEqual(set(errors), {4, 5, 6, 7, 8})
+        self.assertEqual(list(errors[4]['errors']), ['price'])
+        self.assertEqual(sorted(errors[5]['errors']), ['category', 'is_featured', 'sizes'])
+        self.assertEqual(sorted(errors[6]['errors']), ['description', 'name'])
+        self.assertEqual(errors[7]['sku'], 'TEE-1')
+        self.assertIsNone(errors[8]['sku'])
+        self.assertEqual(set(Product.objects.values_list('sku', flat=True)), {'TEE-1', 'TEE-2'})
+
+    def test_bad_json_line_is_reported(self):
+        text = '{"sku": "TEE-1", "name": "Tee", "description": "A tee", "price": "5"}\nnot json\n[1]\n'
+        summary = self.run_import(text, 'jsonl')
+        self.assertEqual((summary['created'], summary['failed']), (1, 2))
+        self.assertEqual([error['line'] for error in summary['errors']], [2, 3])
+
+    def test_invalid_utf8_keeps_earlier_batches(self):
+        # Enough rows that the bad bytes aren't in the text wrapper's first read
+        rows = ''.join(f'ROW-{i},Row {i},A tee,10,tops,,,,,\n' for i in range(500))
+        data = (self.CSV + rows).encode() + b'TEE-X,Broken \xff,A tee,10,tops,,,,,\n'
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', newline='')
+        importer = ProductImporter(batch_size=50)
+        with self.assertRaises(ImportAborted) as raised:
+            importer.run(read_rows(stream, 'csv'))
+        created = raised.exception.summary['created']
+        self.assertGreater(created, 0)
+        self.assertEqual(Product.objects.count(), created)
+        # Every row up to the reported line made it in
+        self.assertIn(f'after line {created + 1}:', str(raised.exception))
+
+    def test_dry_run_writes_nothing(self):
+        summary = import_products(io.StringIO(self.CSV), 'csv', dry_run=True)
+        self.assertEqual(summary['created'], 2)
+        self.assertFalse(Product.objects.exists())
+
+    def test_export_round_trip(self):
+        self.run_import(self.CSV)
+        Product.objects.filter(sku='TEE-2').update(original_price='30.00', fabric='Linen', in_stock=False)
+        expected = self.records()
+
+        for file_format in ('csv', 'jsonl'):
+            with self.subTest(file_format=file_format):
+                exported = ''.join(export_products(file_format=file_format))
+                Product.objects.all().delete()
+                summary = self.run_import(exported, file_format)
+                self.assertEqual((summary['created'], summary['failed']), (2, 0), summary['errors'])
+                self.assertEqual(self.records(), expected)
+
+                # Importing the same file again changes nothing
+                summary = self.run_import(exported, file_format)
+                self.assertEqual((summary['created'], summary['updated']), (0, 2))
+                self.assertEqual(self.records(), expected)
+
+
+class AdminProductBulkUpdateTests(AdminAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_category = Category.objects.create(name='Bottoms', slug='bottoms')
+        cls.tee = create_product(cls.category, sku='TEE', price=Decimal('19.99'))
+        cls.shirt = create_product(cls.category, sku='SHIRT', price=Decimal('33.33'), is_featured=True)
+        cls.jeans = create_product(cls.other_category, sku='JEANS', price=Decimal('50.00'))
+
+    def bulk_update(self, data):
+        return self.client.post(reverse('admin-product-bulk-update'), data, format='json')
+
+    def prices(self):
+        return dict(Product.objects.values_list('sku', 'price'))
+
+    def test_filter_must_select_something(self):
+        for bulk_filter in ({}, {'all': False}, {'all': True, 'category': 'tops'}):
+            with self.subTest(filter=bulk_filter):
+                response = self.bulk_update({'filter': bulk_filter, 'set': {'is_new': True}})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('filter', response.data)
+        self.assertFalse(Product.objects.filter(is_new=True).exists())
+
+    def test_all_updates_every_product(self):
+        response = self.bulk_update({'filter': {'all': True}, 'set': {'is_new': True}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(Product.objects.filter(is_new=True).count(), 3)
+
+    def test_price_adjustment_is_rounded_in_the_update(self):
+        before = Product.objects.get(pk=self.jeans.pk).updated_at
+        with self.assertNumQueries(1):
+            updated = bulk_update_products(Product.objects.all(), price_adjustment_percent=Decimal('-10'))
+        self.assertEqual(updated, 3)
+        self.assertEqual(self.prices(), {
+            'TEE': Decimal('17.99'), 'SHIRT': Decimal('30.00'), 'JEANS': Decimal('45.00'),
+        })
+        self.assertGreater(Product.objects.get(pk=self.jeans.pk).updated_at, before)
+
+        bulk_update_products(Product.objects.filter(sku='SHIRT'), price_adjustment_percent=Decimal('15.5'))
+        self.assertEqual(Product.objects.get(sku='SHIRT').price, Decimal('34.65'))
+
+    def test_filtered_update_logs_one_activity(self):
+        logged = set(AdminActivity.objects.values_list('pk', flat=True))
+        response = self.bulk_update({
+            'filter': {'category': 'tops'}, 'set': {'is_bestseller': True}, 'price_adjustment_percent': '15',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['fields'], ['is_bestseller', 'price'])
+        self.assertEqual(self.prices(), {
+            'TEE': Decimal('22.99'), 'SHIRT': Decimal('38.33'), 'JEANS': Decimal('50.00'),
+        })
+        self.assertEqual(
+            set(Product.objects.filter(is_bestseller=True).values_list('sku', flat=True)), {'TEE', 'SHIRT'}
+        )
+
+        activity = AdminActivity.objects.exclude(pk__in=logged).get()
+        self.assertEqual(activity.activity_type, 'products_bulk_updated')
+        self.assertEqual(activity.user, self.staff)
+        self.assertEqual(activity.changes, {'is_bestseller': True, 'price_adjustment_percent': '15.00'})
+
+    def test_ids_target_only_those_products(self):
+        response = self.bulk_update({'ids': [self.jeans.pk], 'set': {'price': '12.50'}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.prices()['JEANS'], Decimal('12.50'))
+        self.assertEqual(self.prices()['TEE'], Decimal('19.99'))
+
+    def test_nothing_matched_logs_nothing(self):
+        logged = AdminActivity.objects.count()
+        response = self.bulk_update({'filter': {'category': 'hats'}, 'set': {'is_new': True}})
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(AdminActivity.objects.count(), logged)
@@ -0,0 +1,340 @@
+# products/uploads.py
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image
+
+from core.utils import get_file_path
+
+from .image_processing import schedule_derivatives
+from .models import ImageUploadSession, ProductImage
+
+# Hash state for sessions appended to by this process, so finalize doesn't re-read
+# the file; another process (or a restart) rebuilds it from the temporary file
+_HASHERS = OrderedDict()
+_HASHERS_LIMIT = 256
+_hashers_lock = threading.Lock()
+
+
+class InvalidImage(Exception):
+    pass
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadOffsetMismatch(UploadError):
+    def __init__(self, offset):
+        super().__init__(f'Expected offset {offset}')
+        self.offset = offset
+
+
+def decode_image(image_file):
+    """
+    Fully decode an upload so truncated or non-image files are rejected before anything is stored
+    """
+    try:
+        image_file.seek(0)
+        with Image.open(image_file) as image:
+            # JPEGs can decode at reduced scale; the whole stream is still read and checked
+            image.draft(image.mode, (image.width // 8, image.height // 8))
+            image.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+        raise InvalidImage(f'{image_file.name}: not a valid image ({exc})')
+    finally:
+        image_file.seek(0)
+
+
+def _store(storage, instance, image_file):
+    try:
+        return storage.save(get_file_path(instance, image_file.name), image_file)
+    finally:
+        # Content-addressed storage records blobs from this worker thread
+        connections.close_all()
+
+
+def _map(executor, func, *iterables):
+    """
+    executor.map that waits for every task before raising, so a failure
+    can't leave writes running behind the caller's cleanup
+    """
+    futures = [executor.submit(func, *args) for args in zip(*iterables)]
+    results, errors = [], []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as exc:
+            results.append(None)
+            errors.append(exc)
+    return results, errors
+
+
+def bulk_create_product_images(product, image_files, color=None, alt_text='', display_order=None):
+    """
+    Validate, store and insert a batch of uploaded images for a product.
+
+    Decoding and file writes run on a thread pool (Pillow and file IO release
+    the GIL); the rows go in with one bulk_create. Invalid files reject the
+    whole batch before anything is written. Returns the created images in
+    upload order.
+    """
+    image_files = list(image_files)
+    if not image_files:
+        return []
+    storage = ProductImage._meta.get_field('image').storage
+    workers = max(1, min(settings.IMAGE_UPLOAD_WORKERS, len(image_files)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-upload') as executor:
+        _, errors = _map(executor, decode_image, image_files)
+        if errors:
+            raise InvalidImage('; '.join(str(error) for error in errors))
+
+        has_existing_images = ProductImage.objects.filter(product=product, color=color).exists()
+        instances = [
+            ProductImage(
+                product=product,
+                color=color,
+                alt_text=alt_text or f"{product.name} image {i+1}",
+                # First image becomes primary if there are no existing images
+                is_primary=not has_existing_images and i == 0,
+                display_order=display_order or i
+            )
+            for i in range(len(image_files))
+        ]
+        names, errors = _map(executor, lambda instance, image_file: _store(storage, instance, image_file),
+                             instances, image_files)
+
+    try:
+        if errors:
+            raise errors[0]
+        for instance, name in zip(instances, names):
+            instance.image.name = name
+        with transaction.atomic():
+            created = ProductImage.objects.bulk_create(instances)
+            if any(instance.pk is None for instance in created):
+                # Backends without RETURNING (MySQL) don't set primary keys on bulk_create
+                by_name = {
+                    image.image.name: image
+                    for image in ProductImage.objects.filter(product=product, image__in=names)
+                }
+                created = [by_name[name] for name in names]
+    except Exception:
+        for name in names:
+            if name:
+                storage.delete(name)
+        raise
+
+    # bulk_create skips post_save, so queue the derivatives explicitly
+    schedule_derivatives([image.pk for image in created])
+    return created
+
+
+def session_temp_path(session_id):
+    return os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, f'{session_id}.part')
+
+
+def _remember_hasher(session_id, offset, hasher):
+    with _hashers_lock:
+        _HASHERS[session_id] = (offset, hasher)
+        _HASHERS.move_to_end(session_id)
+        while len(_HASHERS) > _HASHERS_LIMIT:
+            _HASHERS.popitem(last=False)
+
+
+def _hasher_at(session_id, offset):
+    """
+    A sha256 of the first offset bytes of a session's file
+    """
+    with _hashers_lock:
+        cached = _HASHERS.pop(session_id, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+    hasher = hashlib.sha256()
+    with open(session_temp_path(session_id), 'rb') as handle:
+        remaining = offset
+        while remaining > 0:
+            chunk = handle.read(min(settings.IMAGE_UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            hasher.update(chunk)
+            remaining -= len(chunk)
+    return hasher
+
+
+def start_upload_session(product, filename, size, user=None, **fields):
+    """
+    Create an upload session and its empty temporary file
+    """
+    if size <= 0:
+        raise UploadError('Upload size must be positive')
+    if size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise UploadError(f'Uploads are limited to {settings.IMAGE_UPLOAD_MAX_BYTES} bytes')
+    session = ImageUploadSession.objects.create(
+        product=product, filename=os.path.basename(filename)[:255], size=size, created_by=user, **fields
+    )
+    os.makedirs(settings.IMAGE_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(session_temp_path(session.id), 'wb').close()
+    return session
+
+
+def _receive_chunk(session_id, stream, limit):
+    """
+    Copy a chunk from the request stream into its own temporary file, outside
+    any transaction, so a slow client holds no database lock while it sends
+    """
+    path = os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, f'{session_id}.{uuid.uuid4().hex}.chunk')
+    written = 0
+    try:
+        with open(path, 'wb') as handle:
+            while True:
+                chunk = stream.read(settings.IMAGE_UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > limit:
+                    raise UploadError('Chunk extends past the declared upload size')
+                handle.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, written
+
+
+def append_chunk(session_id, offset, stream):
+    """
+    Append a chunk read from stream at offset, hashing it as it is written.
+
+    The chunk is received into a file of its own first; only the offset
+    check, the local copy onto the upload and the new offset run with the
+    session row locked, so concurrent appends are serialised; a client that
+    resumes at the wrong offset gets the current one back through
+    UploadOffsetMismatch.
+    """
+    session = ImageUploadSession.objects.get(pk=session_id)
+    if session.status != 'uploading':
+        raise UploadError('Upload is already finalized')
+    if offset != session.received:
+        raise UploadOffsetMismatch(session.received)
+    chunk_path, written = _receive_chunk(session.id, stream, session.size - offset)
+
+    try:
+        with transaction.atomic():
+            session = ImageUploadSession.objects.select_for_update().get(pk=session_id)
+            if session.status != 'uploading':
+                raise UploadError('Upload is already finalized')
+            # Another request appended at this offset while the chunk was arriving
+            if offset != session.received:
+                raise UploadOffsetMismatch(session.received)
+
+            hasher = _hasher_at(session.id, session.received)
+            with open(session_temp_path(session.id), 'r+b') as handle, open(chunk_path, 'rb') as chunk_file:
+                # Drop any partial write left by an interrupted request
+                handle.truncate(session.received)
+                handle.seek(session.received)
+                while True:
+                    chunk = chunk_file.read(settings.IMAGE_UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    handle.write(chunk)
+                    hasher.update(chunk)
+
+            session.received += written
+            session.save(update_fields=['received', 'updated_at'])
+    finally:
+        os.remove(chunk_path)
+    _remember_hasher(session.id, session.received, hasher)
+    return session
+
+
+def finalize_upload_session(session_id):
+    """
+    Verify a fully received upload and turn it into a ProductImage
+    """
+    with transaction.atomic():
+        session = ImageUploadSession.objects.select_for_update().select_related('product').get(pk=session_id)
+        if session.status == 'complete':
+            return session
+        if session.received != session.size:
+            raise UploadError(f'Upload incomplete: {session.received} of {session.size} bytes received')
+
+        path = session_temp_path(session.id)
+        digest = _hasher_at(session.id, session.received).hexdigest()
+        if session.expected_sha256 and session.expected_sha256.lower() != digest:
+            raise UploadError('Checksum mismatch')
+
+        with open(path, 'rb') as handle:
+            image_file = File(handle, name=session.filename)
+            decode_image(image_file)
+            session.product_image = ProductImage.objects.create(
+                product=session.product,
+                color=session.color,
+                image=image_file,
+                alt_text=session.alt_text or f"{session.product.name} image",
+                is_primary=session.is_primary,
+                display_order=session.display_order
+            )
+        session.sha256 = digest
+        session.status = 'complete'
+        session.save(update_fields=['product_image', 'sha256', 'status', 'updated_at'])
+        transaction.on_commit(lambda: discard_upload_file(session.id))
+    return session
+
+
+def discard_upload_file(session_id):
+    with _hashers_lock:
+        _HASHERS.pop(session_id, None)
+    try:
+        os.remove(session_temp_path(session_id))
+    except FileNotFoundError:
+        pass
+
+
+def abort_upload_session(session):
+    session.delete()
+    discard_upload_file(session.id)
+
+
+def cleanup_upload_sessions(max_age=None):
+    """
+    Delete sessions not touched within max_age (abandoned uploads and old
+    completed ones) with their temporary files, plus temporary files with no
+    session (including chunks left by interrupted requests). Returns (sessions removed, stray files removed).
+    """
+    if max_age is None:
+        max_age = timedelta(hours=settings.IMAGE_UPLOAD_SESSION_TTL_HOURS)
+    cutoff = timezone.now() - max_age
+    removed = 0
+    stale = ImageUploadSession.objects.filter(updated_at__lt=cutoff)
+    while True:
+        session_ids = list(stale.values_list('id', flat=True)[:1000])
+        if not session_ids:
+            break
+        ImageUploadSession.objects.filter(id__in=session_ids).delete()
+        for session_id in session_ids:
+            discard_upload_file(session_id)
+        removed += len(session_ids)
+
+    strays = 0
+    cutoff_timestamp = cutoff.timestamp()
+    if os.path.isdir(settings.IMAGE_UPLOAD_TEMP_DIR):
+        with os.scandir(settings.IMAGE_UPLOAD_TEMP_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff_timestamp:
+                    try:
+                        session_id = uuid.UUID(entry.name.removesuffix('.part'))
+                    except ValueError:
+                        session_id = None
+                    if session_id is None or not ImageUploadSession.objects.filter(id=session_id).exists():
+                        os.remove(entry.path)
+                        strays += 1
+    return removed, strays
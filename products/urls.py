@@ -9,7 +9,9 @@ from .views import (
 )
 from .views_admin import (
     AdminProductListCreateView, AdminProductRetrieveUpdateDestroyView,
+    AdminProductBulkUpdateView, AdminProductImportView, AdminProductExportView,
     AdminProductImageUploadView, AdminProductImageDeleteView, AdminProductImageSetPrimaryView,
+    AdminImageUploadSessionCreateView, AdminImageUploadSessionView, AdminImageUploadSessionFinalizeView,
     AdminProductImageBulkUploadView,
     AdminCategoryListCreateView, AdminCategoryRetrieveUpdateDestroyView,
     AdminColorListCreateView, AdminColorRetrieveUpdateDestroyView,
@@ -64,6 +66,9 @@ urlpatterns = [
 admin_urlpatterns = [
     # Admin Product endpoints
     path('admin/products/', AdminProductListCreateView.as_view(), name='admin-product-list'),
+    path('admin/product-bulk-update/', AdminProductBulkUpdateView.as_view(), name='admin-product-bulk-update'),
+    path('admin/product-import/', AdminProductImportView.as_view(), name='admin-product-import'),
+    path('admin/product-export/', AdminProductExportView.as_view(), name='admin-product-export'),
     path('admin/products/<slug:slug>/', AdminProductRetrieveUpdateDestroyView.as_view(), name='admin-product-detail'),
     
     # Admin Product Image endpoints
@@ -72,6 +77,11 @@ admin_urlpatterns = [
     path('admin/products/<slug:slug>/set-primary-image/', AdminProductImageSetPrimaryView.as_view(), name='admin-product-set-primary-image'),
     path('admin/products/<slug:slug>/bulk-upload-images/', AdminProductImageBulkUploadView.as_view(), name='admin-product-bulk-upload-images'),
     
+    # Admin chunked image upload endpoints
+    path('admin/products/<slug:slug>/uploads/', AdminImageUploadSessionCreateView.as_view(), name='admin-product-upload-session-create'),
+    path('admin/uploads/<uuid:session_id>/', AdminImageUploadSessionView.as_view(), name='admin-upload-session'),
+    path('admin/uploads/<uuid:session_id>/finalize/', AdminImageUploadSessionFinalizeView.as_view(), name='admin-upload-session-finalize'),
+    
     # Admin Category endpoints
     path('admin/categories/', AdminCategoryListCreateView.as_view(), name='admin-category-list'),
     path('admin/categories/<slug:slug>/', AdminCategoryRetrieveUpdateDestroyView.as_view(), name='admin-category-detail'),
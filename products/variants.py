@@ -0,0 +1,97 @@
+# products/variants.py
+from django.db import transaction
+
+from .models import ProductColor, ProductHighlight, ProductSize, ProductSpecification
+
+
+@transaction.atomic
+def reconcile(model, entries, key_fields, defaults=None):
+    """
+    Make each product's rows of model match the wanted values with a handful of
+    bulk statements instead of delete-all-and-recreate.
+
+    entries is [(product, [values, ...])], values being field -> value dicts.
+    Existing rows are matched on key_fields and kept (their ids, and anything
+    pointing at them, survive); fields given besides the key are updated only
+    when they differ. Unmatched values are inserted, with defaults(product)
+    filling fields they leave out, and rows no longer wanted are deleted.
+    Returns (created, updated, deleted) counts.
+    """
+    entries = [(product, items) for product, items in entries]
+    if not entries:
+        return 0, 0, 0
+
+    current = {}
+    for row in model.objects.filter(product_id__in={product.pk for product, _ in entries}).order_by('pk'):
+        key = tuple(getattr(row, field) for field in key_fields)
+        current.setdefault(row.product_id, {}).setdefault(key, []).append(row)
+
+    to_create, to_update, to_delete = [], [], []
+    update_fields = set()
+    for product, items in entries:
+        existing = current.pop(product.pk, {})
+        for values in items:
+            rows = existing.get(tuple(values[field] for field in key_fields))
+            if not rows:
+                to_create.append(model(product_id=product.pk, **{**(defaults(product) if defaults else {}), **values}))
+                continue
+            row = rows.pop(0)
+            changed = [
+                field for field, value in values.items()
+                if field not in key_fields and getattr(row, field) != value
+            ]
+            for field in changed:
+                setattr(row, field, values[field])
+            if changed:
+                update_fields.update(changed)
+                to_update.append(row)
+        to_delete.extend(row.pk for rows in existing.values() for row in rows)
+
+    if to_delete:
+        model.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(update_fields))
+    model.objects.bulk_create(to_create)
+    return len(to_create), len(to_update), len(to_delete)
+
+
+def sync_sizes(entries):
+    """
+    entries: [(product, [(size_id, stock or None), ...])]. Kept sizes keep their
+    stock unless one is given; new sizes start at the product's stock.
+    """
+    return reconcile(ProductSize, [
+        (product, [
+            {'size_id': size_id} if stock is None else {'size_id': size_id, 'stock_quantity': stock}
+            for size_id, stock in sizes
+        ])
+        for product, sizes in entries
+    ], ('size_id',), defaults=lambda product: {'stock_quantity': product.stock_quantity, 'is_available': True})
+
+
+def sync_colors(entries):
+    """
+    entries: [(product, [color_id, ...])]; the first color is the default.
+    Kept colors keep their id, so image and cart links to them stay intact.
+    """
+    return reconcile(ProductColor, [
+        (product, [
+            {'color_id': color_id, 'is_default': i == 0}
+            for i, color_id in enumerate(dict.fromkeys(color_ids))
+        ])
+        for product, color_ids in entries
+    ], ('color_id',))
+
+
+def sync_highlights(entries):
+    """
+    entries: [(product, [{'text', 'display_order'}, ...])]
+    """
+    return reconcile(ProductHighlight, entries, ('text',))
+
+
+def sync_specifications(entries):
+    """
+    entries: [(product, [{'title', 'value', 'display_order'}, ...])]; matched by title
+    """
+    return reconcile(ProductSpecification, entries, ('title',))
@@ -3,19 +3,48 @@ from rest_framework import generics, status, parsers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
+from admin_console.signals import log_admin_activity
+
 from .models import (
-    Product, ProductImage, ProductSize, ProductColor,
+    Product, ProductImage, ImageUploadSession, ProductSize, ProductColor, LowStockVariant,
     ProductHighlight, ProductSpecification, Color, Size, Category
 )
 from .serializers import (
-    ProductDetailSerializer, ProductImageSerializer, ProductSizeSerializer, 
+    AdminProductGridSerializer, ProductDetailSerializer, ProductImageSerializer, ProductSizeSerializer, 
     ProductColorSerializer, ColorSerializer, SizeSerializer, CategorySerializer,
-    ProductCreateUpdateSerializer
+    ProductCreateUpdateSerializer, ImageUploadSessionSerializer, ProductBulkUpdateSerializer
+)
+from .bulk_updates import bulk_target, bulk_update_products
+from .exporter import CONTENT_TYPES, export_products
+from .importer import (
+    TRUE_VALUES, ImportAborted, ImportFormatError, detect_format, import_products, open_upload,
+)
+from .variants import sync_colors, sync_sizes
+from .uploads import (
+    InvalidImage, UploadError, UploadOffsetMismatch, abort_upload_session, append_chunk,
+    bulk_create_product_images, finalize_upload_session, start_upload_session
 )
 
+def _existing_ids(model, ids):
+    """
+    The given ids in order without duplicates; 404 if any of them doesn't exist
+    """
+    try:
+        ids = list(dict.fromkeys(int(pk) for pk in ids))
+    except (TypeError, ValueError):
+        raise Http404(f'No {model._meta.object_name} matches the given query.')
+    if model.objects.filter(id__in=ids).count() != len(ids):
+        raise Http404(f'No {model._meta.object_name} matches the given query.')
+    return ids
+
+
 class AdminProductListCreateView(generics.ListCreateAPIView):
     """
     Admin-only view for listing and creating products
@@ -23,10 +52,35 @@ class AdminProductListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAdminUser]
     queryset = Product.objects.all().order_by('-created_at')
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        # Aggregates as correlated subqueries (no join fan-out) and one image
+        # prefetch: three queries per page including the count
+        sizes = ProductSize.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        return queryset.select_related('category').annotate(
+            variant_stock=Coalesce(
+                Subquery(sizes.annotate(total=Sum('stock_quantity')).values('total')),
+                F('stock_quantity')
+            ),
+            size_count=Coalesce(Subquery(sizes.annotate(count=Count('id')).values('count')), 0),
+            color_count=Coalesce(Subquery(
+                ProductColor.objects.filter(product=OuterRef('pk')).order_by()
+                .values('product').annotate(count=Count('id')).values('count')
+            ), 0),
+            is_low_stock=Exists(LowStockVariant.objects.filter(product=OuterRef('pk'))),
+        ).prefetch_related(Prefetch(
+            'images',
+            queryset=ProductImage.objects.only(
+                'id', 'product_id', 'image', 'derivatives', 'is_primary', 'display_order'
+            ).order_by('-is_primary', 'display_order', 'id')
+        ))
+    
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return ProductCreateUpdateSerializer
-        return ProductDetailSerializer
+        return AdminProductGridSerializer
     
     @transaction.atomic
     def create(self, request, *args, **kwargs):
@@ -42,26 +96,12 @@ class AdminProductListCreateView(generics.ListCreateAPIView):
         # Process sizes
         sizes = request.data.get('sizes', [])
         if isinstance(sizes, list):
-            for size_id in sizes:
-                size = get_object_or_404(Size, id=size_id)
-                ProductSize.objects.create(
-                    product=product,
-                    size=size,
-                    is_available=True,
-                    stock_quantity=product.stock_quantity  # Default to product stock
-                )
+            sync_sizes([(product, [(size_id, None) for size_id in _existing_ids(Size, sizes)])])
         
-        # Process colors
+        # Process colors (the first color is the default)
         colors = request.data.get('colors', [])
         if isinstance(colors, list):
-            for i, color_id in enumerate(colors):
-                color = get_object_or_404(Color, id=color_id)
-                is_default = i == 0  # Make first color the default
-                ProductColor.objects.create(
-                    product=product,
-                    color=color,
-                    is_default=is_default
-                )
+            sync_colors([(product, _existing_ids(Color, colors))])
         
         # Return the product data
         output_serializer = ProductDetailSerializer(
@@ -96,39 +136,16 @@ class AdminProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         # Save the product
         product = serializer.save()
         
-        # Update sizes if provided
+        # Update sizes if provided; kept sizes keep their stock, new ones start at the product stock
         sizes = request.data.get('sizes')
         if sizes is not None:
-            # Clear existing sizes
-            ProductSize.objects.filter(product=product).delete()
-            
-            # Add new sizes
-            if isinstance(sizes, list):
-                for size_id in sizes:
-                    size = get_object_or_404(Size, id=size_id)
-                    ProductSize.objects.create(
-                        product=product,
-                        size=size,
-                        is_available=True,
-                        stock_quantity=product.stock_quantity  # Default to product stock
-                    )
-        
-        # Update colors if provided
+            size_ids = _existing_ids(Size, sizes) if isinstance(sizes, list) else []
+            sync_sizes([(product, [(size_id, None) for size_id in size_ids])])
+        
+        # Update colors if provided; kept colors keep their images and cart references
         colors = request.data.get('colors')
         if colors is not None:
-            # Clear existing colors (but keep the images linked to colors)
-            ProductColor.objects.filter(product=product).delete()
-            
-            # Add new colors
-            if isinstance(colors, list):
-                for i, color_id in enumerate(colors):
-                    color = get_object_or_404(Color, id=color_id)
-                    is_default = i == 0  # Make first color the default
-                    ProductColor.objects.create(
-                        product=product,
-                        color=color,
-                        is_default=is_default
-                    )
+            sync_colors([(product, _existing_ids(Color, colors) if isinstance(colors, list) else [])])
         
         # Return the updated product data
         output_serializer = ProductDetailSerializer(
@@ -137,6 +154,130 @@ class AdminProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         return Response(output_serializer.data)
 
 
+class AdminProductBulkUpdateView(APIView):
+    """
+    Admin-only view for changing prices and flags of many products at once
+    """
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request):
+        """
+        Apply `set` and/or `price_adjustment_percent` to the products given by
+        `ids` or `filter` in a single UPDATE, and log it as one activity
+        """
+        serializer = ProductBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        changes = data.get('set') or {}
+        adjustment = data.get('price_adjustment_percent')
+        
+        with transaction.atomic():
+            updated = bulk_update_products(
+                bulk_target(ids=data.get('ids'), filters=data.get('filter')),
+                changes=changes,
+                price_adjustment_percent=adjustment
+            )
+            fields = sorted(set(changes) | ({'price'} if adjustment is not None else set()))
+            if updated:
+                applied = dict(changes)
+                if adjustment is not None:
+                    applied['price_adjustment_percent'] = adjustment
+                log_admin_activity(
+                    request.user,
+                    'products_bulk_updated',
+                    f"Bulk update of {updated} product(s): {', '.join(fields)}",
+                    ip_address=request.META.get('REMOTE_ADDR', ''),
+                    changes=applied
+                )
+        
+        return Response({
+            'updated': updated,
+            'fields': fields,
+            'price_adjustment_percent': adjustment,
+        })
+
+
+class AdminProductImportView(APIView):
+    """
+    Admin-only view for creating and updating products in bulk from a CSV or JSON Lines file
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser]
+    
+    def post(self, request):
+        """
+        Upsert products by SKU; invalid rows are skipped and reported by line
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response(
+                {'error': 'No file provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        file_format = request.data.get('format') or detect_format(upload.name)
+        dry_run = str(request.data.get('dry_run', '')).lower() in TRUE_VALUES
+        
+        error = None
+        try:
+            summary = import_products(open_upload(upload), file_format, dry_run=dry_run)
+        except ImportAborted as exc:
+            # Earlier batches are committed, so report them along with the error
+            error, summary = str(exc), exc.summary
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not dry_run and (summary['created'] or summary['updated']):
+            log_admin_activity(
+                request.user,
+                'products_imported',
+                f"Products imported from {upload.name}: "
+                f"{summary['created']} created, {summary['updated']} updated",
+                ip_address=request.META.get('REMOTE_ADDR', '')
+            )
+        summary['dry_run'] = dry_run
+        if error:
+            summary['error'] = error
+            return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary)
+
+
+class AdminProductExportView(APIView):
+    """
+    Admin-only view streaming the catalog as CSV or JSON Lines
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """
+        Stream every product with its sizes, colors, images and specifications.
+        ?file_format=csv|jsonl, optionally narrowed by ?category=<slug> and ?is_active=true|false
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in CONTENT_TYPES:
+            return Response(
+                {'error': 'file_format must be csv or jsonl'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = Product.objects.all()
+        category = request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category__slug=category)
+        is_active = request.query_params.get('is_active')
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active.lower() in ('1', 'true', 'yes'))
+        
+        response = StreamingHttpResponse(
+            export_products(queryset, file_format, request=request),
+            content_type=CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{file_format}"'
+        return response
+
+
 class AdminProductImageUploadView(APIView):
     """
     Admin-only view for uploading product images
@@ -207,6 +348,130 @@ class AdminProductImageUploadView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class AdminImageUploadSessionCreateView(APIView):
+    """
+    Admin-only view for starting a chunked, resumable image upload
+    """
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request, slug=None):
+        """
+        Start an upload session; chunks are then sent to the session URL
+        """
+        product = get_object_or_404(Product, slug=slug)
+        
+        filename = request.data.get('filename')
+        try:
+            size = int(request.data.get('size'))
+            display_order = int(request.data.get('display_order') or 0)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'filename and a numeric size are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not filename:
+            return Response(
+                {'error': 'filename and a numeric size are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        color = None
+        color_id = request.data.get('color')
+        if color_id:
+            try:
+                color = ProductColor.objects.get(product=product, color_id=color_id)
+            except ProductColor.DoesNotExist:
+                return Response(
+                    {'error': 'Invalid color ID for this product'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        try:
+            session = start_upload_session(
+                product, filename, size,
+                user=request.user,
+                color=color,
+                alt_text=request.data.get('alt_text', ''),
+                is_primary=request.data.get('is_primary') in ['true', 'True', True],
+                display_order=display_order,
+                expected_sha256=request.data.get('sha256', '')
+            )
+        except UploadError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = ImageUploadSessionSerializer(session).data
+        data['chunk_size'] = settings.IMAGE_UPLOAD_CHUNK_SIZE
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class AdminImageUploadSessionView(APIView):
+    """
+    Admin-only view for the chunks and status of an upload session.
+    
+    PATCH appends the raw request body at the byte offset given in the
+    Upload-Offset header; GET reports the offset to resume from.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, session_id=None):
+        session = get_object_or_404(ImageUploadSession, pk=session_id)
+        return Response(ImageUploadSessionSerializer(session).data)
+    
+    def patch(self, request, session_id=None):
+        session = get_object_or_404(ImageUploadSession, pk=session_id)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset header is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # DRF has no stream for an empty body
+        if request.stream is None:
+            return Response(
+                {'error': 'Request body with the chunk is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            # Read the body as a stream so the chunk is never held in memory whole
+            session = append_chunk(session.pk, offset, request.stream)
+        except UploadOffsetMismatch as exc:
+            return Response(
+                {'error': 'Offset mismatch', 'offset': exc.offset},
+                status=status.HTTP_409_CONFLICT
+            )
+        except UploadError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = Response(ImageUploadSessionSerializer(session).data)
+        response['Upload-Offset'] = session.received
+        return response
+    
+    def delete(self, request, session_id=None):
+        session = get_object_or_404(ImageUploadSession, pk=session_id)
+        abort_upload_session(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdminImageUploadSessionFinalizeView(APIView):
+    """
+    Admin-only view for completing an upload session into a product image
+    """
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request, session_id=None):
+        session = get_object_or_404(ImageUploadSession, pk=session_id)
+        try:
+            session = finalize_upload_session(session.pk)
+        except (UploadError, InvalidImage) as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = ProductImageSerializer(session.product_image, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class AdminProductImageDeleteView(APIView):
     """
     Admin-only view for deleting product images
@@ -322,33 +587,23 @@ class AdminProductImageBulkUploadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if we have existing images
-        has_existing_images = ProductImage.objects.filter(
-            product=product,
-            color=color
-        ).exists()
-        
-        # Process and save each image
-        created_images = []
-        for i, image_file in enumerate(images):
-            # Set first image as primary if no existing images
-            is_primary = not has_existing_images and i == 0
-            
-            # Create image
-            product_image = ProductImage.objects.create(
-                product=product,
+        # Validate and store the files in parallel, then insert the rows in one query
+        try:
+            created_images = bulk_create_product_images(
+                product,
+                images,
                 color=color,
-                image=image_file,
-                alt_text=request.data.get('alt_text', '') or f"{product.name} image {i+1}",
-                is_primary=is_primary,
-                display_order=request.data.get('display_order', 0) or i
+                alt_text=request.data.get('alt_text', ''),
+                display_order=request.data.get('display_order', 0)
+            )
+        except InvalidImage as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            # Serialize and add to result list
-            serializer = ProductImageSerializer(product_image, context={'request': request})
-            created_images.append(serializer.data)
         
-        return Response(created_images, status=status.HTTP_201_CREATED)
+        serializer = ProductImageSerializer(created_images, many=True, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 # Admin-only views for categories
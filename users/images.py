@@ -0,0 +1,84 @@
+# users/images.py
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import ImageOps
+
+from core.images import avatar_names, encode, extract_metadata, open_image
+from core.media_urls import media_url_builder
+from core.tasks import run_in_background
+
+from .models import User
+
+
+def needs_processing(user):
+    return bool(user.profile_picture) and user.profile_picture_variants.get('source') != user.profile_picture.name
+
+
+def process_profile_picture(user_id):
+    """
+    Replace a user's uploaded picture with a bounded WebP, add square avatar
+    crops at PROFILE_PICTURE_AVATAR_SIZES and record its metadata.
+    The original is deleted unless PROFILE_PICTURE_KEEP_ORIGINAL is set.
+    """
+    user = User.objects.filter(pk=user_id).only('profile_picture', 'profile_picture_variants').first()
+    if user is None or not needs_processing(user):
+        return None
+
+    field_file = user.profile_picture
+    storage = field_file.storage
+    source_name = field_file.name
+    old_variants = user.profile_picture_variants
+    stem = os.path.splitext(source_name)[0]
+
+    image = open_image(field_file)
+    max_dimension = settings.PROFILE_PICTURE_MAX_DIMENSION
+    image.thumbnail((max_dimension, max_dimension), reducing_gap=3.0)
+    picture_name = storage.save(f'{stem}-normalized.webp', ContentFile(encode(image, 'webp')))
+
+    avatars = {}
+    for size in settings.PROFILE_PICTURE_AVATAR_SIZES:
+        avatar = ImageOps.fit(image, (size, size))
+        avatars[str(size)] = storage.save(f'{stem}-{size}.webp', ContentFile(encode(avatar, 'webp')))
+
+    variants = {'source': picture_name, 'avatars': avatars}
+    if settings.PROFILE_PICTURE_KEEP_ORIGINAL:
+        variants['original'] = source_name
+    field_file.name = picture_name
+    metadata = extract_metadata(field_file, image=image)
+
+    # Skip the swap if the user uploaded another picture meanwhile
+    updated = User.objects.filter(pk=user_id, profile_picture=source_name).update(
+        profile_picture=picture_name, profile_picture_variants=variants, profile_picture_meta=metadata
+    )
+    if not updated:
+        for name in [picture_name, *avatars.values()]:
+            storage.delete(name)
+        return None
+    stale = avatar_names(old_variants)
+    # The previous upload's normalized picture, replaced by this one
+    if old_variants.get('source') and old_variants['source'] != source_name:
+        stale.add(old_variants['source'])
+    for name in stale - avatar_names(variants) - {picture_name}:
+        storage.delete(name)
+    if not settings.PROFILE_PICTURE_KEEP_ORIGINAL:
+        storage.delete(source_name)
+    return variants
+
+
+def schedule_profile_picture_processing(user):
+    if needs_processing(user):
+        run_in_background(process_profile_picture, user.pk)
+
+
+def avatar_urls(user, request=None):
+    """
+    {size: url} for the user's avatar crops; empty until the picture has been processed
+    """
+    variants = user.profile_picture_variants or {}
+    if not user.profile_picture or variants.get('source') != user.profile_picture.name:
+        return {}
+    storage = user.profile_picture.storage
+    urls = media_url_builder(request)
+    return {size: urls.url(name, storage) for size, name in variants.get('avatars', {}).items()}
@@ -0,0 +1,111 @@
+# users/management/commands/benchmark_user_search.py
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from users.models import User
+from users.search import fuzzy_search, index_users, prefix_search
+
+FIRST_NAMES = [
+    'james', 'mary', 'robert', 'patricia', 'john', 'jennifer', 'michael', 'linda', 'david', 'elizabeth',
+    'william', 'barbara', 'richard', 'susan', 'joseph', 'jessica', 'thomas', 'sarah', 'charles', 'karen',
+    'aarav', 'priya', 'rohan', 'ananya', 'vikram', 'meera', 'arjun', 'kavya', 'zoe', 'noah',
+]
+LAST_NAMES = [
+    'smith', 'johnson', 'williams', 'brown', 'jones', 'garcia', 'miller', 'davis', 'rodriguez', 'martinez',
+    'hernandez', 'lopez', 'gonzalez', 'wilson', 'anderson', 'thomas', 'taylor', 'moore', 'jackson', 'martin',
+    'sharma', 'verma', 'iyer', 'reddy', 'nair', 'kapoor', 'mehta', 'bose', 'fernandes', 'dsouza',
+]
+DOMAINS = ['gmail.com', 'yahoo.com', 'outlook.com', 'fairfoul.com', 'example.org']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the indexed admin user search against the previous icontains filter. '
+        'Synthetic users are generated inside a transaction that is rolled back unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000, help='Synthetic users to generate')
+        parser.add_argument('--queries', type=int, default=50, help='Queries per scenario')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skip-baseline', action='store_true', help='Do not time the icontains baseline')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated users')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self._generate(rng, options['users'], options['batch_size'])
+                self._run(rng, options['queries'], options['skip_baseline'])
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            self.stdout.write('Generated users rolled back.')
+
+    def _generate(self, rng, total, batch_size):
+        start = time.perf_counter()
+        offset = (User.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        for batch_start in range(0, total, batch_size):
+            users = []
+            for i in range(batch_start, min(batch_start + batch_size, total)):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                n = offset + i
+                users.append(User(
+                    email=f'{first}.{last}{n}@{rng.choice(DOMAINS)}',
+                    username=f'{first}{last}{n}',
+                    first_name=first.title(),
+                    last_name=last.title(),
+                    phone_number=f'+1 {rng.randint(200, 999)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+                    password='!',
+                ))
+            users = User.objects.bulk_create(users)
+            index_users(users)
+        self.stdout.write(f'Generated and indexed {total} users in {time.perf_counter() - start:.1f}s')
+
+    def _time(self, label, make_queryset, queries):
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            queryset = make_queryset(query)
+            # What the paginated list view does: a count plus the first page
+            queryset.count()
+            list(queryset.order_by('-date_joined').values_list('id', flat=True)[:20])
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{label:<22} p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms   max {timings[-1]:8.2f} ms'
+        )
+
+    def _run(self, rng, count, skip_baseline):
+        users = User.objects.all()
+        samples = list(
+            users.order_by('?').values_list('first_name', 'last_name', 'email', 'phone_number')[:count]
+        )
+        name_queries = [f'{first[:3]} {last[:4]}' for first, last, _, _ in samples]
+        email_queries = [email.split('@')[0][:8] for _, _, email, _ in samples]
+        phone_queries = [phone[3:10] for _, _, _, phone in samples]
+        typo_queries = [last[:2] + last[3:] + last[2] for _, last, _, _ in samples if len(last) > 3]
+
+        self._time('prefix name', lambda q: prefix_search(users, q), name_queries)
+        self._time('prefix email', lambda q: prefix_search(users, q), email_queries)
+        self._time('prefix phone', lambda q: prefix_search(users, q), phone_queries)
+        self._time('fuzzy (typo)', lambda q: fuzzy_search(users, q), typo_queries)
+
+        if skip_baseline:
+            return
+        for label, queries in (('icontains name', name_queries), ('icontains email', email_queries)):
+            self._time(label, lambda q: users.filter(
+                Q(email__icontains=q) | Q(username__icontains=q) |
+                Q(first_name__icontains=q) | Q(last_name__icontains=q)
+            ), queries)
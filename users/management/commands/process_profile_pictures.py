@@ -0,0 +1,35 @@
+# users/management/commands/process_profile_pictures.py
+from django.core.management.base import BaseCommand
+
+from users.images import process_profile_picture
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Normalize existing profile pictures and generate their avatar crops'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                User.objects.filter(id__gt=last_id).exclude(profile_picture='')
+                .exclude(profile_picture__isnull=True).order_by('id')
+                .values_list('id', 'profile_picture', 'profile_picture_variants')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            for user_id, name, variants in batch:
+                if variants.get('source') == name:
+                    continue
+                try:
+                    process_profile_picture(user_id)
+                    processed += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'User {user_id}: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} profile picture(s), {failed} failed.'))
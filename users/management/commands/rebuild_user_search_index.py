@@ -0,0 +1,15 @@
+# users/management/commands/rebuild_user_search_index.py
+from django.core.management.base import BaseCommand
+
+from users.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the user search token and trigram index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} user(s).'))
@@ -0,0 +1,121 @@
+# Generated by Django 5.2 on 2026-10-18 22:34
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# A frozen copy of users.search's tokenizer as of this migration, so the
+# migration keeps its meaning when that module changes; later tokenizer
+# changes are applied with the rebuild_user_search_index command.
+SEARCH_FIELDS = ('email', 'username', 'first_name', 'last_name', 'phone_number')
+MAX_TOKEN_LENGTH = 64
+MIN_PREFIX_LENGTH = 2
+CHUNK_SIZE = 2000
+
+_WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+_NON_DIGITS = re.compile(r'\D+')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold().strip()
+
+
+def build_tokens(email='', username='', first_name='', last_name='', phone_number=''):
+    tokens = set()
+    for value in (first_name, last_name, username):
+        value = normalize(value)
+        tokens.add(value)
+        tokens.update(_WORD_SPLIT.split(value))
+
+    email = normalize(email)
+    if email:
+        tokens.add(email)
+        local, _, domain = email.partition('@')
+        tokens.add(local)
+        tokens.add(domain)
+        tokens.update(_WORD_SPLIT.split(local))
+
+    digits = _NON_DIGITS.sub('', phone_number or '')
+    if digits:
+        tokens.add(digits)
+        tokens.add(digits[-10:])
+
+    return {token[:MAX_TOKEN_LENGTH] for token in tokens if len(token) >= MIN_PREFIX_LENGTH}
+
+
+def build_trigrams(tokens):
+    trigrams = set()
+    for token in tokens:
+        if not token.isalnum():
+            continue
+        padded = f'${token}$'
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def build_search_index(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserSearchToken = apps.get_model('users', 'UserSearchToken')
+    UserSearchTrigram = apps.get_model('users', 'UserSearchTrigram')
+
+    tokens = []
+    trigrams = []
+
+    def flush():
+        UserSearchToken.objects.bulk_create(tokens)
+        UserSearchTrigram.objects.bulk_create(trigrams)
+        tokens.clear()
+        trigrams.clear()
+
+    # Written a chunk of users at a time so memory stays flat on a large user base
+    users = User.objects.order_by('id').values('id', *SEARCH_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+    for count, values in enumerate(users, 1):
+        user_id = values.pop('id')
+        user_tokens = build_tokens(**values)
+        tokens.extend(UserSearchToken(user_id=user_id, token=token) for token in user_tokens)
+        trigrams.extend(
+            UserSearchTrigram(user_id=user_id, trigram=trigram)
+            for trigram in build_trigrams(user_tokens)
+        )
+        if count % CHUNK_SIZE == 0:
+            flush()
+    flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'user'], name='usersearchtoken_token_idx')],
+                'unique_together': {('user', 'token')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trigram', 'user'], name='usersearchtrigram_trigram_idx')],
+                'unique_together': {('user', 'trigram')},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
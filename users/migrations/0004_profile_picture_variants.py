@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 22:55
+
+import users.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_image_meta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, upload_to='profile_pictures/', validators=[users.validators.validate_profile_picture_size]),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.db.models.functions import Collate
+
+# Prefix search runs LIKE 'term%', which SQLite only matches against an index
+# with NOCASE collation. Other backends have no NOCASE collation and use the
+# (token, user) index for LIKE. The index is in migration state (and
+# Meta.indexes) everywhere; only the database side is SQLite-only.
+NOCASE_INDEX = models.Index(Collate('token', 'NOCASE'), 'user', name='usersearchtoken_nocase_idx')
+
+
+def add_nocase_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.add_index(apps.get_model('users', 'UserSearchToken'), NOCASE_INDEX)
+
+
+def remove_nocase_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.remove_index(apps.get_model('users', 'UserSearchToken'), NOCASE_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='usersearchtoken', index=NOCASE_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_nocase_index, remove_nocase_index),
+            ],
+        ),
+    ]
@@ -1,16 +1,26 @@
 # users/models.py
 from django.db import models
+from django.db.models.functions import Collate
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 from core.models import TimestampedModel
 
+from .validators import validate_profile_picture_size
+
 class User(AbstractUser):
     """
     Custom User model with email as the primary identifier
     """
     email = models.EmailField(_('email address'), unique=True)
     phone_number = models.CharField(max_length=15, blank=True)
-    profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    profile_picture = models.ImageField(
+        upload_to='profile_pictures/', blank=True, null=True,
+        validators=[validate_profile_picture_size]
+    )
+    # Dimensions, size, dominant colour and blur placeholder, filled in by the background worker
+    profile_picture_meta = models.JSONField(default=dict, blank=True, editable=False)
+    # Normalized picture and avatar crops, filled in by users.images.process_profile_picture
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     # Fields for email verification
     is_email_verified = models.BooleanField(default=False)
@@ -65,4 +75,42 @@ class Address(TimestampedModel):
                 address_type__in=[self.address_type, 'both'],
                 is_default=True
             ).exclude(pk=self.pk).update(is_default=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class UserSearchToken(models.Model):
+    """
+    Normalized search tokens (names, email parts, phone digits) for prefix search
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=64)
+    
+    class Meta:
+        unique_together = ('user', 'token')
+        indexes = [
+            models.Index(fields=['token', 'user'], name='usersearchtoken_token_idx'),
+            # SQLite's LIKE is case-insensitive, so prefix matches can only use a
+            # NOCASE index; tokens are casefolded, so nothing matches differently.
+            # Only built on SQLite (users 0005); change it via SeparateDatabaseAndState.
+            models.Index(Collate('token', 'NOCASE'), 'user', name='usersearchtoken_nocase_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.token} -> {self.user_id}"
+
+
+class UserSearchTrigram(models.Model):
+    """
+    Trigrams of the search tokens for typo-tolerant (fuzzy) search
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+    
+    class Meta:
+        unique_together = ('user', 'trigram')
+        indexes = [
+            models.Index(fields=['trigram', 'user'], name='usersearchtrigram_trigram_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.trigram} -> {self.user_id}"
@@ -0,0 +1,210 @@
+# users/search.py
+import math
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, IntegerField, When
+
+from .models import User, UserSearchToken, UserSearchTrigram
+
+SEARCH_FIELDS = ('email', 'username', 'first_name', 'last_name', 'phone_number')
+MAX_TOKEN_LENGTH = 64
+MIN_PREFIX_LENGTH = 2
+# Share of the query trigrams a user must have to count as a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_CANDIDATE_LIMIT = 200
+
+_WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+_NON_DIGITS = re.compile(r'\D+')
+_PHONE_LIKE = re.compile(r'[+(]*\d[\d().-]*')
+
+
+def normalize(text):
+    """
+    Lowercase and strip accents so 'Zoë' and 'zoe' index the same way
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold().strip()
+
+
+def build_tokens(email='', username='', first_name='', last_name='', phone_number=''):
+    """
+    Search tokens for a user's searchable fields
+    """
+    tokens = set()
+    for value in (first_name, last_name, username):
+        value = normalize(value)
+        tokens.add(value)
+        tokens.update(_WORD_SPLIT.split(value))
+
+    email = normalize(email)
+    if email:
+        tokens.add(email)
+        local, _, domain = email.partition('@')
+        tokens.add(local)
+        tokens.add(domain)
+        tokens.update(_WORD_SPLIT.split(local))
+
+    digits = _NON_DIGITS.sub('', phone_number or '')
+    if digits:
+        tokens.add(digits)
+        # National number without a country code, so local prefixes match too
+        tokens.add(digits[-10:])
+
+    return {token[:MAX_TOKEN_LENGTH] for token in tokens if len(token) >= MIN_PREFIX_LENGTH}
+
+
+def build_trigrams(tokens):
+    """
+    Padded trigrams of the alphanumeric tokens ('$jo', 'joh', 'ohn', 'hn$')
+    """
+    trigrams = set()
+    for token in tokens:
+        if not token.isalnum():
+            continue
+        padded = f'${token}$'
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def user_tokens(user):
+    return build_tokens(**{field: getattr(user, field) for field in SEARCH_FIELDS})
+
+
+def index_user(user, force=False):
+    """
+    (Re)build the search index rows for one user; skipped when nothing changed
+    """
+    tokens = user_tokens(user)
+    if not force:
+        existing = set(UserSearchToken.objects.filter(user=user).values_list('token', flat=True))
+        if existing == tokens:
+            return False
+    with transaction.atomic():
+        UserSearchToken.objects.filter(user=user).delete()
+        UserSearchTrigram.objects.filter(user=user).delete()
+        UserSearchToken.objects.bulk_create(
+            [UserSearchToken(user=user, token=token) for token in tokens]
+        )
+        UserSearchTrigram.objects.bulk_create(
+            [UserSearchTrigram(user=user, trigram=trigram) for trigram in build_trigrams(tokens)]
+        )
+    return True
+
+
+def _insert_rows(model, columns, rows, batch_size):
+    """
+    Plain executemany insert; skips model instantiation, which dominates bulk_create
+    at tens of index rows per user
+    """
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(column) for column in columns),
+        ', '.join(['%s'] * len(columns))
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+
+def index_users(users, batch_size=5000):
+    """
+    Bulk (re)index a batch of users; used by the rebuild command and benchmarks
+    """
+    users = list(users)
+    user_ids = [user.pk for user in users]
+    tokens = []
+    trigrams = []
+    for user in users:
+        user_token_set = user_tokens(user)
+        tokens.extend((user.pk, token) for token in user_token_set)
+        trigrams.extend((user.pk, trigram) for trigram in build_trigrams(user_token_set))
+    with transaction.atomic():
+        UserSearchToken.objects.filter(user_id__in=user_ids).delete()
+        UserSearchTrigram.objects.filter(user_id__in=user_ids).delete()
+        _insert_rows(UserSearchToken, ('user_id', 'token'), tokens, batch_size)
+        _insert_rows(UserSearchTrigram, ('user_id', 'trigram'), trigrams, batch_size)
+
+
+def _query_terms(query):
+    terms = []
+    for term in normalize(query).split():
+        # Phone numbers are indexed as bare digits
+        if _PHONE_LIKE.fullmatch(term):
+            term = _NON_DIGITS.sub('', term)
+        if len(term) >= MIN_PREFIX_LENGTH:
+            terms.append(term[:MAX_TOKEN_LENGTH])
+    return terms
+
+
+def prefix_search(queryset, query):
+    """
+    Users with a token starting with every query term.
+
+    Each term is a LIKE 'term%' on the token index: (token, user) on MySQL,
+    the NOCASE one on SQLite, whose LIKE ignores case.
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return queryset.none() if query.strip() else queryset
+    for term in terms:
+        queryset = queryset.filter(
+            id__in=UserSearchToken.objects.filter(token__startswith=term).values('user_id')
+        )
+    return queryset
+
+
+def fuzzy_search(queryset, query, limit=FUZZY_CANDIDATE_LIMIT):
+    """
+    Users whose tokens share enough trigrams with the query, best matches first
+    """
+    trigrams = build_trigrams(_WORD_SPLIT.split(normalize(query)))
+    if not trigrams:
+        return queryset.none()
+    min_hits = max(1, math.ceil(len(trigrams) * FUZZY_MIN_SIMILARITY))
+    candidates = list(
+        UserSearchTrigram.objects.filter(trigram__in=trigrams)
+        .values('user_id').annotate(hits=Count('id'))
+        .filter(hits__gte=min_hits).order_by('-hits', 'user_id')
+        .values_list('user_id', flat=True)[:limit]
+    )
+    if not candidates:
+        return queryset.none()
+    rank = Case(
+        *[When(id=user_id, then=position) for position, user_id in enumerate(candidates)],
+        output_field=IntegerField()
+    )
+    return queryset.filter(id__in=candidates).annotate(search_rank=rank).order_by('search_rank')
+
+
+def search_users(queryset, query, fuzzy=False):
+    """
+    Search users by name, username, email or phone.
+
+    Prefix matches are returned when there are any; with fuzzy=True the
+    trigram index is used as a fallback for misspelled queries.
+    """
+    results = prefix_search(queryset, query)
+    if fuzzy and not results.exists():
+        return fuzzy_search(queryset, query)
+    return results
+
+
+def rebuild_search_index(batch_size=2000):
+    """
+    Rebuild the index for every user in id order; returns the number of users indexed
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        users = list(
+            User.objects.filter(id__gt=last_id).order_by('id').only('id', *SEARCH_FIELDS)[:batch_size]
+        )
+        if not users:
+            break
+        index_users(users)
+        indexed += len(users)
+        last_id = users[-1].id
+    return indexed
@@ -2,6 +2,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from core.images import current_metadata
+from core.media_urls import MediaURLSerializerMixin
+
+from .images import avatar_urls
 from .models import Address
 
 User = get_user_model()
@@ -44,14 +48,26 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(MediaURLSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for user profile (update and retrieve)
     """
+    profile_picture_meta = serializers.SerializerMethodField()
+    avatar_urls = serializers.SerializerMethodField()
+    
     class Meta:
         model = User
-        fields = ('id', 'email', 'username', 'first_name', 'last_name', 'phone_number', 'profile_picture', 'date_joined')
+        fields = (
+            'id', 'email', 'username', 'first_name', 'last_name', 'phone_number',
+            'profile_picture', 'profile_picture_meta', 'avatar_urls', 'date_joined'
+        )
         read_only_fields = ('email', 'date_joined')
+    
+    def get_profile_picture_meta(self, obj):
+        return current_metadata(obj.profile_picture, obj.profile_picture_meta)
+    
+    def get_avatar_urls(self, obj):
+        return avatar_urls(obj, self.context.get('request'))
 
 
 class UserPasswordChangeSerializer(serializers.Serializer):
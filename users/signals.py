@@ -0,0 +1,25 @@
+# users/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .images import schedule_profile_picture_processing
+from .models import User
+from .search import SEARCH_FIELDS, index_user
+
+
+@receiver(post_save, sender=User)
+def update_user_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep the user search index in step with searchable field changes
+    """
+    if update_fields is not None and not set(SEARCH_FIELDS).intersection(update_fields):
+        return
+    index_user(instance, force=created)
+
+
+@receiver(post_save, sender=User)
+def queue_profile_picture_processing(sender, instance, **kwargs):
+    """
+    Normalize new or replaced profile pictures in the background
+    """
+    schedule_profile_picture_processing(instance)
@@ -0,0 +1,13 @@
+# users/validators.py
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+
+
+def validate_profile_picture_size(field_file):
+    """
+    Reject profile pictures over PROFILE_PICTURE_MAX_UPLOAD_BYTES before they are stored
+    """
+    limit = settings.PROFILE_PICTURE_MAX_UPLOAD_BYTES
+    if field_file and field_file.size > limit:
+        raise ValidationError(f'Profile pictures are limited to {filesizeformat(limit)}.')